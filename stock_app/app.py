@@ -1,14 +1,37 @@
+import hashlib
+import hmac
+import json
+import time
+import uuid
+
 from dotenv import load_dotenv
-from flask import Flask, jsonify, make_response, Response, request
+from flask import Flask, jsonify, make_response, Response, request, stream_with_context
 from werkzeug.exceptions import BadRequest, Unauthorized
 # from flask_cors import CORS
 
 from config import ProductionConfig
+from stock_app.clients.mongo_client import sessions_collection
+from stock_app.clients.redis_client import redis_client
 from stock_app.db import db
 from stock_app.models.portfolio_model import PortfolioModel
 from stock_app.models.stock_model import *
-from stock_app.models.mongo_session_model import login_user, logout_user
+from stock_app.models.history_store_model import HistoryStore
+from stock_app.models.holdings_index_model import holdings_index
+from stock_app.models.mongo_session_model import login_user, logout_user, stock_document
+from stock_app.models.order_book_model import OrderBook, PriceMovedError, StandingOrder
+from stock_app.models.performance_model import portfolio_performance
+from stock_app.models.price_refresh_model import PriceRefreshScheduler
+from stock_app.models.redis_state_model import RedisPortfolioStore, UserLoggedInError
+from stock_app.models.risk_model import RiskSimulator, parse_shocks, portfolio_risk
+from stock_app.models.session_analytics_model import SessionAnalytics
+from stock_app.models.symbol_index_model import SymbolGuard, SymbolIndex
+from stock_app.models.price_stream_model import PriceStreamer
 from stock_app.models.user_model import Users
+from stock_app.utils.cache import NegativeCache, StaleWhileRevalidateCache
+from stock_app.utils.export import EXPORT_FORMATS, export_available, iter_csv, to_arrow_ipc, to_parquet
+from stock_app.utils.http_cache import ResponseCache, conditional_json, conditional_ndjson, conditional_response
+from stock_app.utils.json_provider import FastJSONProvider, StandardJSONProvider
+from stock_app.utils.rate_limiter import RateLimiter
 
 from alpha_vantage.timeseries import TimeSeries
 from alpha_vantage.fundamentaldata import FundamentalData
@@ -21,12 +44,179 @@ out_fd = FundamentalData(_API_KEY)
 def create_app(config_class=ProductionConfig):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    # Both providers write a Stock's lots, kept in a deque, as lists.
+    app.json = FastJSONProvider(app) if app.config['FAST_JSON_ENABLED'] else StandardJSONProvider(app)
 
     db.init_app(app)  # Initialize db with app
     with app.app_context():
         db.create_all()  # Recreate all tables
 
     portfolio_model = PortfolioModel()
+    portfolio_store = RedisPortfolioStore(redis_client, retries=app.config['REDIS_STATE_RETRIES']) \
+        if app.config['REDIS_STATE_ENABLED'] else None
+
+    def update_portfolio(action, prepare=None):
+        """
+        Applies a change to the portfolio, committing it to the shared state when enabled.
+
+        `prepare` fetches the quotes the change needs before any lock is taken, and `action`
+        gets them and applies the change locally.
+        """
+        if portfolio_store is None:
+            return action(prepare()) if prepare is not None else action()
+        return portfolio_store.update(portfolio_model, action, prepare)
+
+    @app.before_request
+    def sync_portfolio():
+        """Picks up changes other workers made to the shared portfolio before serving a request."""
+        if portfolio_store is not None and request.endpoint != 'healthcheck':
+            portfolio_store.sync(portfolio_model)
+
+    def execute_standing_order(order: StandingOrder, price: float) -> None:
+        """
+        Fills a triggered limit order through the portfolio of the logged-in user, at a fresh
+        quote that must still cross the order's threshold.
+        """
+        if portfolio_store is not None:
+            portfolio_store.sync(portfolio_model)
+        if portfolio_model.userID != order.user_id:
+            raise ValueError(f"User {order.user_id} is not logged in.")
+
+        def check_fill(fill_price: float) -> None:
+            if not order.crossed_by(fill_price):
+                raise PriceMovedError(f"{order.symbol} is at {fill_price:.2f}, no longer "
+                                      f"{order.direction} {order.threshold:.2f}.")
+
+        def buy(quote):
+            check_fill(quote[0])
+            return portfolio_model.buy_stock(order.symbol, order.quantity, quote)
+
+        def sell(fill_price):
+            check_fill(fill_price)
+            return portfolio_model.sell_stock(order.symbol, order.quantity, fill_price)
+
+        if order.kind == 'buy':
+            update_portfolio(buy, lambda: portfolio_model.quote_buy(order.symbol))
+        else:
+            update_portfolio(sell, lambda: portfolio_model.quote_sell(order.symbol, order.quantity))
+
+    def apply_quote(symbol: str, price: float) -> None:
+        """
+        Applies a streamed, refreshed or observed quote to the portfolio. With the shared state
+        enabled it is committed like a trade, so every worker serves the same price.
+        """
+        if portfolio_store is None:
+            holdings_index.apply_quote(symbol, price)
+        else:
+            update_portfolio(lambda: portfolio_model.apply_price(symbol, price))
+
+    order_book = OrderBook(execute_standing_order)
+    if portfolio_store is not None:
+        app.logger.warning("Standing orders are kept per worker and are not shared through Redis; "
+                           "run a single worker to use them.")
+    price_streamer = PriceStreamer(out_ts, interval=app.config['PRICE_STREAM_INTERVAL'])
+    refresh_interval = app.config['PRICE_REFRESH_INTERVAL']
+    price_refresher = PriceRefreshScheduler(
+        out_ts,
+        interval=refresh_interval,
+        budget=app.config['PRICE_REFRESH_BUDGET'],
+        watched=order_book.symbol_counts,
+        apply_quote=apply_quote,
+        # Workers sharing the state elect one of them to poll, so the budget is not multiplied.
+        leader=None if portfolio_store is None else lambda: portfolio_store.lead('price-refresh', 2 * refresh_interval),
+    )
+    # Streamed quotes update holdings too and count as fresh for the scheduler.
+    price_streamer.add_listener(price_refresher.record_quote)
+    # Every quote from the stream, the scheduler or a request is checked against the standing orders.
+    price_refresher.add_listener(order_book.on_quote)
+    if app.config['PRICE_REFRESH_ENABLED']:
+        price_refresher.start()
+
+    market_data_cache = StaleWhileRevalidateCache(max_entries=app.config['MARKET_DATA_CACHE_SIZE'])
+    # Quotes from the stream and the scheduler keep the cached latest prices fresh.
+    price_refresher.add_listener(lambda symbol, price: market_data_cache.put(('price', symbol.upper()), price))
+
+    def observe_quote(symbol: str, price: float) -> None:
+        """
+        Passes a quote fetched for a request to the scheduler's listeners, so standing orders
+        trigger on it even when the background refresh is off. Call it outside `update_portfolio`;
+        the quote and any triggered orders commit their own updates.
+        """
+        price_refresher.record_quote(symbol.upper(), price)
+
+    def cached_market_data(kind: str, key: tuple, loader):
+        """Serves market data through the cache using the per-endpoint staleness settings."""
+        fresh_for, max_stale = app.config['MARKET_DATA_STALENESS'][kind]
+        return market_data_cache.get((kind,) + key, loader, fresh_for, max_stale)
+
+    history_store = HistoryStore(
+        out_ts, market_data_cache,
+        RateLimiter(app.config['UPSTREAM_CALLS_PER_MINUTE'], per=60.0),
+        *app.config['MARKET_DATA_STALENESS']['history'],
+        workers=app.config['HISTORY_FETCH_WORKERS'],
+    )
+    risk_simulator = RiskSimulator(workers=app.config['RISK_WORKERS'],
+                                   min_parallel_paths=app.config['RISK_PARALLEL_MIN_PATHS'])
+
+    symbol_index = SymbolIndex()
+    if app.config['SYMBOL_LISTING_FILE']:
+        symbol_index.load_listing(app.config['SYMBOL_LISTING_FILE'])
+
+    symbol_guard = SymbolGuard(symbol_index, NegativeCache(ttl=app.config['UNKNOWN_SYMBOL_TTL'],
+                                                           max_entries=app.config['UNKNOWN_SYMBOL_CACHE_SIZE']))
+
+    def unknown_symbol(symbol: str):
+        """Rejects a malformed, unlisted or recently unknown symbol before any upstream call is made."""
+        error = symbol_guard.check(symbol)
+        if error:
+            app.logger.info(f"Rejected symbol without an upstream call: {error}")
+            return make_response(jsonify({'error': error, 'suggestions': symbol_index.suggest(symbol)}), 400)
+        return None
+
+    session_analytics = SessionAnalytics(sessions_collection, refresh_interval=app.config['ANALYTICS_REFRESH_INTERVAL'])
+
+    def admin_denied():
+        """Rejects a request without the configured admin token; admin routes are off without one."""
+        token = app.config['ADMIN_TOKEN']
+        if not token:
+            return make_response(jsonify({'error': 'Admin analytics are disabled'}), 403)
+        if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token):
+            return make_response(jsonify({'error': 'Invalid admin token'}), 403)
+        return None
+
+    # ETags embed a per-process token so validators from before a restart never match.
+    etag_epoch = uuid.uuid4().hex[:8]
+    response_cache = ResponseCache(max_entries=app.config['RESPONSE_CACHE_SIZE'])
+
+    def portfolio_response(name: str, render) -> Response:
+        """Serves a view of the portfolio as a conditional response keyed by its version."""
+        def state():
+            etag = f"{name}-{etag_epoch}-{portfolio_model.userID}-{portfolio_model.version}"
+            return etag, portfolio_model.modified_at
+        return conditional_json(response_cache, state, render, lock=portfolio_model.lock)
+
+    def position_document(stock: Stock) -> dict:
+        """
+        Copies a position into a plain document with every field of the Stock. Call it from a
+        `portfolio_response` render, under the lock, so the body is serialized after the lock
+        is released from a copy no trade can change.
+        """
+        return dict(stock_document(stock), cost_basis=stock.cost_basis)
+
+    def page_args():
+        """Parses the holdings paging parameters, or returns None if none were given."""
+        names = ('limit', 'cursor', 'sort', 'order', 'sector')
+        if not any(name in request.args for name in names):
+            return None
+        limit = request.args.get('limit', app.config['HOLDINGS_PAGE_SIZE'], type=int)
+        if not 1 <= limit <= app.config['HOLDINGS_PAGE_MAX_SIZE']:
+            raise ValueError(f"Limit must be between 1 and {app.config['HOLDINGS_PAGE_MAX_SIZE']}")
+        return {'sort': request.args.get('sort', 'value'), 'order': request.args.get('order'),
+                'sector': request.args.get('sector'), 'limit': limit, 'cursor': request.args.get('cursor')}
+
+    def page_key(paging: dict) -> str:
+        """Digest of the paging parameters, safe to embed in an ETag whatever the sector or cursor."""
+        return hashlib.sha1(json.dumps(paging, sort_keys=True).encode('utf-8')).hexdigest()[:16]
 
     ####################################################
     #
@@ -174,6 +364,7 @@ def create_app(config_class=ProductionConfig):
         Raises:
             400 error if input validation fails.
             401 error if authentication fails (invalid username or password).
+            409 error if another user is logged in on the shared portfolio.
             500 error for any unexpected server-side issues.
         """
         data = request.get_json()
@@ -193,14 +384,26 @@ def create_app(config_class=ProductionConfig):
             # Get user ID
             user_id = Users.get_id_by_username(username)
     
-            # Load user's combatants into the battle model
-            login_user(user_id, portfolio_model)
+            # Load user's combatants into the battle model; hold the lock so
+            # concurrent trades never see a half-restored portfolio.
+            def load():
+                with portfolio_model.lock:
+                    login_user(user_id, portfolio_model)
+
+            # Publish the restored portfolio to the other workers, or adopt theirs if already shared.
+            if portfolio_store is None:
+                load()
+            else:
+                portfolio_store.attach(portfolio_model, user_id, load)
 
             app.logger.info("User %s logged in successfully.", username)
             return jsonify({"message": f"User {username} logged in successfully."}), 200
 
         except Unauthorized as e:
             return jsonify({"error": str(e)}), 401
+        except UserLoggedInError as e:
+            app.logger.warning("Login refused for username %s: %s", username, str(e))
+            return jsonify({"error": str(e)}), 409
         except Exception as e:
             app.logger.error("Error during login for username %s: %s", username, str(e))
             return jsonify({"error": "An unexpected error occurred." }), 500
@@ -218,7 +421,7 @@ def create_app(config_class=ProductionConfig):
             JSON response indicating the success of the logout.
 
         Raises:
-            400 error if input validation fails or user is not found in MongoDB.
+            400 error if input validation fails, user is not found in MongoDB or is not the logged-in user.
             500 error for any unexpected server-side issues.
         """
         data = request.get_json()
@@ -233,7 +436,14 @@ def create_app(config_class=ProductionConfig):
             user_id = Users.get_id_by_username(username)
 
             # Save user's combatants and clear the battle model
-            logout_user(user_id, portfolio_model)
+            def save():
+                with portfolio_model.lock:
+                    logout_user(user_id, portfolio_model)
+
+            if portfolio_store is None:
+                save()
+            else:
+                portfolio_store.release(portfolio_model, user_id, save)
 
             app.logger.info("User %s logged out successfully.", username)
             return jsonify({"message": f"User {username} logged out successfully."}), 200
@@ -265,10 +475,17 @@ def create_app(config_class=ProductionConfig):
             # Check if the symbol is provided
             if not symbol:
                 return make_response(jsonify({'error': 'Stock symbol is required'}), 400)
-
-            # Call the lookup_stock function
-            stock = lookup_stock(symbol, out_ts, out_fd)
-            return make_response(jsonify({'status': 'success', 'stock': stock}), 200)
+            rejection = unknown_symbol(symbol)
+            if rejection:
+                return rejection
+
+            # Serve the cached lookup, revalidating it in the background once stale
+            stock, age = cached_market_data('stock', (symbol.upper(),),
+                                            symbol_guard.guarded(symbol, lambda: lookup_stock(symbol, out_ts, out_fd)))
+            # Fetched overviews make their companies searchable
+            if stock.get('symbol') and stock.get('name'):
+                symbol_index.add(stock['symbol'], stock['name'])
+            return make_response(jsonify({'status': 'success', 'stock': stock, 'age': round(age, 3)}), 200)
 
         except ValueError as ve:
             app.logger.error(f"Validation error: {ve}")
@@ -286,31 +503,129 @@ def create_app(config_class=ProductionConfig):
         Query Parameters:
             - symbol (str): The stock ticker's symbol.
             - size (str): The size of the data (e.g., "full" or "compact").
+            - format (str, optional): "json" (default), "ndjson" for one row per line, or a file
+              export: "csv", "arrow" (IPC stream) or "parquet". Arrow and Parquet need pyarrow.
 
         Returns:
-            JSON response with the stock data or error message.
+            JSON or NDJSON response with the stock data or error message. Rows are parsed and
+            written as the response streams, so long histories are never held as one document.
+            The data's age in seconds is sent in the Age header; 304 if it matches the
+            request's If-None-Match/If-Modified-Since.
 
         Raises:
-            400 error if no input is provided.
+            400 error if no input is provided, the symbol is invalid, not listed or unknown, or the
+            format is unknown.
+            501 error if the format needs pyarrow and it is not installed.
             500 error if there is an issue retrieving stock info.
         """
         try:
             # Retrieve query parameters
             symbol = request.args.get('symbol')
             size = request.args.get('size')
+            output = request.args.get('format', 'json')
 
             app.logger.info(f"Retrieving stock historical data for symbol: {symbol}, size: {size}")
 
             # Validate input
             if not symbol or not size:
                 return make_response(jsonify({'error': 'Both symbol and size are required'}), 400)
+            rejection = unknown_symbol(symbol)
+            if rejection:
+                return rejection
+            if output not in ('json', 'ndjson') and output not in EXPORT_FORMATS:
+                return make_response(jsonify({'error': f"Unsupported format: {output}"}), 400)
+            if not export_available(output):
+                return make_response(jsonify({'error': f"The {output} format requires pyarrow on the server"}), 501)
+
+            # Serve the stored raw series, revalidating it in the background once stale
+            bars, fetched_at = history_store.raw(symbol, size)
+
+            def state():
+                return f"history-{output}-{etag_epoch}-{symbol.upper()}-{size}-{fetched_at!r}", fetched_at
+
+            def rows():
+                # Short histories are materialized so their serialized body can be cached
+                if len(bars) < app.config['JSON_STREAM_MIN_ITEMS']:
+                    return list(iter_daily_bars(bars))
+                return iter_daily_bars(bars)
+
+            def export():
+                # Exports are built from columns, never from per-row dicts
+                mimetype, extension = EXPORT_FORMATS[output]
+                history = daily_bar_columns(symbol.upper(), bars)
+                if output == 'csv':
+                    body = iter_csv(history)
+                elif output == 'arrow':
+                    body = to_arrow_ipc(history)
+                else:
+                    body = to_parquet(history)
+                response = app.response_class(body, mimetype=mimetype)
+                response.headers['Content-Disposition'] = f'attachment; filename="{symbol.upper()}_{size}.{extension}"'
+                return response
+
+            if output == 'ndjson':
+                response = conditional_ndjson(state, lambda: iter_daily_bars(bars))
+            elif output in EXPORT_FORMATS:
+                response = conditional_response(state, export)
+            else:
+                response = conditional_json(response_cache, state, lambda: {'status': 'success', 'data': rows()},
+                                            stream_key='data')
+            response.headers['Age'] = str(int(max(0.0, time.time() - fetched_at)))
+            return response
+
+        except UnknownSymbolError as e:
+            symbol_guard.report_unknown(symbol)
+            app.logger.error(f"Unknown symbol: {e}")
+            return make_response(jsonify({'error': str(e)}), 400)
+        except Exception as e:
+            app.logger.error(f"Error retrieving stock historical data: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
+
+    @app.route('/api/retrieve-historical-matrix', methods=['GET'])
+    def retrieve_historical_matrix() -> Response:
+        """
+        Route to retrieve one price field for many stocks, aligned on a common date index.
+
+        Stored series are served locally; missing ones are fetched concurrently within the
+        upstream rate limit. Symbols that cannot be loaded are reported under `errors`.
+
+        Query Parameters:
+            - symbols (str): Comma-separated stock ticker symbols.
+            - size (str): The size of the data ("full" or "compact").
+            - field (str, optional): open, high, low or close (default).
+            - join (str, optional): "inner" (default) for dates all symbols share, or
+              "outer" for every date with gaps as null.
+
+        Returns:
+            JSON response with `symbols`, `dates` (oldest first) and `values`, one row
+            of prices per date, or error message.
+
+        Raises:
+            400 error if the input is missing or invalid.
+            500 error if there is an issue retrieving the data.
+        """
+        try:
+            symbols = [symbol.strip() for symbol in request.args.get('symbols', '').split(',') if symbol.strip()]
+            size = request.args.get('size')
+            field = request.args.get('field', 'close')
+            join = request.args.get('join', 'inner')
+
+            app.logger.info(f"Retrieving historical matrix for {len(symbols)} symbols, size: {size}")
+
+            if not symbols or not size:
+                return make_response(jsonify({'error': 'Both symbols and size are required'}), 400)
+            if len(symbols) > app.config['HISTORY_MATRIX_MAX_SYMBOLS']:
+                return make_response(jsonify({
+                    'error': f"At most {app.config['HISTORY_MATRIX_MAX_SYMBOLS']} symbols are allowed"}), 400)
 
-            # Call the function to fetch historical data
-            data = stock_historical_data(symbol, out_ts, size)  # Replace with your function to get historical data
-            return make_response(jsonify({'status': 'success', 'data': data}), 200)
+            matrix = history_store.matrix(symbols, size, field=field, join=join)
+            return make_response(jsonify({'status': 'success', **matrix}), 200)
 
+        except ValueError as ve:
+            app.logger.error(f"Validation error: {ve}")
+            return make_response(jsonify({'error': str(ve)}), 400)
         except Exception as e:
-            app.logger.error(f"Error retrieving stock historical data: {e}")
+            app.logger.error(f"Error retrieving historical matrix: {e}")
             return make_response(jsonify({'error': str(e)}), 500)
 
     @app.route('/api/fetch-latest-price', methods=['GET'])
@@ -322,10 +637,10 @@ def create_app(config_class=ProductionConfig):
             - symbol (str): The stock ticker's symbol.
 
         Returns:
-            JSON response with the stock price or error message.
+            JSON response with the stock price and its age in seconds, or error message.
 
         Raises:
-            400 error if no input is provided.
+            400 error if no input is provided or the symbol is invalid, not listed or unknown.
             500 error if there is an issue retrieving the stock info.
         """
         try:
@@ -337,15 +652,125 @@ def create_app(config_class=ProductionConfig):
             # Validate input
             if not symbol:
                 return make_response(jsonify({'error': 'Stock symbol is required'}), 400)
+            rejection = unknown_symbol(symbol)
+            if rejection:
+                return rejection
+
+            def load_price() -> float:
+                price = get_latest_price(symbol, out_ts)
+                observe_quote(symbol, price)
+                return price
+
+            # Serve the cached price, revalidating it in the background once stale
+            price, age = cached_market_data('price', (symbol.upper(),), symbol_guard.guarded(symbol, load_price))
+            return make_response(jsonify({'status': 'success', 'price': price, 'age': round(age, 3)}), 200)
+
+        except UnknownSymbolError as e:
+            app.logger.error(f"Unknown symbol: {e}")
+            return make_response(jsonify({'error': str(e)}), 400)
+        except Exception as e:
+            app.logger.error(f"Error retrieving latest stock price for {symbol}: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
 
-            # Fetch the latest price (replace with the actual function to get price)
-            price = get_latest_price(symbol, out_ts)  # Ensure `fetch_latest_price` is implemented
-            return make_response(jsonify({'status': 'success', 'price': price}), 200)
+
+    @app.route('/api/search-symbols', methods=['GET'])
+    def search_symbols() -> Response:
+        """
+        Route to search symbols and company names for autocomplete, served from the local index.
+
+        Query Parameters:
+            - q (str): Symbol or company name prefix, e.g. "AAP" or "apple in".
+            - limit (int, optional): Maximum number of results (default 10).
+
+        Returns:
+            JSON response with `results`, each with `symbol`, `name` and `exchange`, symbol
+            matches first, and whether the index holds a `complete` listing.
+
+        Raises:
+            400 error if no query is provided or the limit is out of range.
+            500 error if there is an issue searching.
+        """
+        try:
+            query = request.args.get('q', '')
+            limit = request.args.get('limit', 10, type=int)
+
+            if not query.strip():
+                return make_response(jsonify({'error': 'Search query is required'}), 400)
+            if not 1 <= limit <= app.config['SYMBOL_SEARCH_MAX_RESULTS']:
+                return make_response(jsonify({
+                    'error': f"Limit must be between 1 and {app.config['SYMBOL_SEARCH_MAX_RESULTS']}"}), 400)
+
+            results = symbol_index.search(query, limit)
+            return make_response(jsonify({'status': 'success', 'results': results,
+                                          'complete': symbol_index.complete}), 200)
 
         except Exception as e:
-            app.logger.error(f"Error retrieving latest stock price for {symbol}: {e}")
+            app.logger.error(f"Error searching symbols: {e}")
             return make_response(jsonify({'error': str(e)}), 500)
-        
+
+
+    @app.route('/api/symbol-validation-stats', methods=['GET'])
+    def symbol_validation_stats() -> Response:
+        """
+        Route to report the upstream calls saved by rejecting symbols locally.
+
+        Returns:
+            JSON response with `saved_calls` in total and `saved_by_reason` (malformed,
+            unlisted or recently_unknown), the number of symbols the API reported unknown,
+            and how many of them are remembered.
+        """
+        app.logger.info('Retrieving symbol validation stats')
+        return make_response(jsonify({'status': 'success', **symbol_guard.stats()}), 200)
+
+
+    @app.route('/api/stream-prices', methods=['GET'])
+    def stream_prices() -> Response:
+        """
+        Route to stream live prices for a set of stocks as Server-Sent Events.
+
+        Each symbol is polled upstream by a single shared background poller, no matter
+        how many clients are subscribed to it.
+
+        Query Parameter:
+            - symbols (str): Comma-separated stock ticker symbols.
+
+        Returns:
+            An event stream of `price` events with {"symbol", "price", "timestamp"} data
+            (or {"symbol", "error", "timestamp"} when a poll fails).
+
+        Raises:
+            400 error if no symbols, too many symbols or an invalid, unlisted or unknown symbol is provided.
+        """
+        symbols = {s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()}
+        if not symbols:
+            return make_response(jsonify({'error': 'At least one stock symbol is required'}), 400)
+        max_symbols = app.config['PRICE_STREAM_MAX_SYMBOLS']
+        if len(symbols) > max_symbols:
+            return make_response(jsonify({'error': f'At most {max_symbols} symbols can be streamed'}), 400)
+        for symbol in sorted(symbols):
+            rejection = unknown_symbol(symbol)
+            if rejection:
+                return rejection
+
+        app.logger.info(f"Streaming prices for symbols: {sorted(symbols)}")
+        subscription = price_streamer.subscribe(symbols)
+
+        def generate():
+            try:
+                for event in subscription.events(timeout=app.config['PRICE_STREAM_HEARTBEAT']):
+                    if event is None:
+                        yield ": keep-alive\n\n"
+                    else:
+                        yield f"event: price\ndata: {json.dumps(event)}\n\n"
+            finally:
+                price_streamer.unsubscribe(subscription)
+                app.logger.info(f"Price stream closed for symbols: {sorted(symbols)}")
+
+        response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+
 
     ####################################################
     #
@@ -374,7 +799,7 @@ def create_app(config_class=ProductionConfig):
                 return make_response(jsonify({'error': 'Value must be a positive number'}), 400)
 
             app.logger.info(f"Adding {value} to the user's funds...")
-            portfolio_model.profile_charge_funds(value)
+            update_portfolio(lambda: portfolio_model.profile_charge_funds(value))
             app.logger.info('Funds added successfully.')
             return make_response(jsonify({'status': 'success'}), 200)
 
@@ -388,22 +813,155 @@ def create_app(config_class=ProductionConfig):
         """
         Route to show user's portfolio
 
+        Passing any paging parameter returns one page of rows, served from sort indexes
+        maintained on every trade and price update.
+
+        Query Parameters:
+            - limit (int, optional): Rows per page (default HOLDINGS_PAGE_SIZE).
+            - cursor (str, optional): The `next_cursor` of the previous page.
+            - sort (str, optional): "value" (default), "weight" or "symbol".
+            - order (str, optional): "asc" or "desc"; defaults to descending for value and weight.
+            - sector (str, optional): Only holdings in this sector.
+
         Returns:
-            JSON response with the user portfolio.
+            JSON response with the user portfolio, or 304 if it is unchanged since the
+            request's If-None-Match/If-Modified-Since.
 
         Raises:
+            400 error if a paging parameter is invalid.
             500 error if there is an issue showing the portfolio.
         """
         try:
             app.logger.info(f"Retrieving portfolio...")   
-            portfolio = portfolio_model.display_portfolio()
-            return make_response(jsonify({'status': 'success', 'portfolio': portfolio}), 200)
-        
+            paging = page_args()
+            if paging is None:
+                return portfolio_response('portfolio', lambda: {'status': 'success', 'portfolio': portfolio_model.display_portfolio()})
+            return portfolio_response(f"portfolio-page-{page_key(paging)}", lambda: {
+                'status': 'success', 'portfolio': portfolio_model.display_portfolio_page(**paging)})
+
+        except ValueError as ve:
+            app.logger.error(f"Validation error: {ve}")
+            return make_response(jsonify({'error': str(ve)}), 400)
         except Exception as e:
             app.logger.error(f"Error retrieving portfolio: {e}")
             return make_response(jsonify({'error': str(e)}), 500)
 
 
+    @app.route('/api/portfolio-exposure', methods=['GET'])
+    def portfolio_exposure() -> Response:
+        """
+        Route to show the weights of the holdings grouped by sector, industry and market-cap bucket.
+
+        Group totals are maintained as trades and prices change, so polling this is cheap.
+
+        Returns:
+            JSON response with the exposure, or 304 if the portfolio is unchanged since the
+            request's If-None-Match/If-Modified-Since.
+
+        Raises:
+            500 error if there is an issue computing the exposure.
+        """
+        try:
+            app.logger.info("Retrieving portfolio exposure...")
+            return portfolio_response('exposure', lambda: {'status': 'success', 'exposure': portfolio_model.get_exposure()})
+
+        except Exception as e:
+            app.logger.error(f"Error retrieving portfolio exposure: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
+
+
+    @app.route('/api/portfolio-performance', methods=['GET'])
+    def get_portfolio_performance() -> Response:
+        """
+        Route to get the portfolio's daily equity curve, returns, drawdown and volatility.
+
+        Query Parameters:
+            - size (str, optional): History window, "compact" (default) or "full".
+            - start (str, optional): First date of the curve, as YYYY-MM-DD.
+
+        Returns:
+            JSON response with the performance figures.
+
+        Raises:
+            400 error if the input is invalid or a symbol's history cannot be loaded.
+            500 error if there is an issue computing the performance.
+        """
+        try:
+            size = request.args.get('size', 'compact')
+            start = request.args.get('start')
+            app.logger.info(f"Computing portfolio performance, size: {size}, start: {start}")
+
+            if size not in ('compact', 'full'):
+                return make_response(jsonify({'error': 'Size must be compact or full'}), 400)
+
+            performance = portfolio_performance(portfolio_model, history_store, size=size, start=start)
+            return make_response(jsonify({'status': 'success', 'performance': performance}), 200)
+
+        except ValueError as ve:
+            app.logger.error(f"Validation error: {ve}")
+            return make_response(jsonify({'error': str(ve)}), 400)
+        except Exception as e:
+            app.logger.error(f"Error computing portfolio performance: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
+
+
+    @app.route('/api/portfolio-risk', methods=['GET'])
+    def get_portfolio_risk() -> Response:
+        """
+        Route to estimate the value at risk and expected shortfall of the current holdings.
+
+        Simulates Monte Carlo paths of the holdings' joint daily returns, estimated from the
+        stored daily closes, across the risk worker processes.
+
+        Query Parameters:
+            - paths (int, optional): Simulated paths, up to RISK_MAX_PATHS (default 10000).
+            - horizon (int, optional): Horizon in trading days, up to RISK_MAX_HORIZON (default 1).
+            - confidence (float, optional): Confidence level, at least 0.5 and below 1 (default 0.95).
+            - method (str, optional): "bootstrap" (default) or "normal".
+            - seed (int, optional): Seed for reproducible results.
+            - shocks (str, optional): What-if returns, e.g. "AAPL:-0.2,MSFT:-0.1".
+
+        Returns:
+            JSON response with the risk figures.
+
+        Raises:
+            400 error if the input is invalid or a symbol's history cannot be loaded.
+            500 error if there is an issue running the simulation.
+        """
+        try:
+            try:
+                paths = int(request.args.get('paths', 10000))
+                horizon = int(request.args.get('horizon', 1))
+                confidence = float(request.args.get('confidence', 0.95))
+                seed = request.args.get('seed', type=int)
+            except ValueError:
+                return make_response(jsonify({'error': 'paths and horizon must be integers, confidence a number'}), 400)
+            method = request.args.get('method', 'bootstrap')
+            shocks = parse_shocks(request.args.get('shocks'))
+            app.logger.info(f"Simulating portfolio risk, paths: {paths}, horizon: {horizon}, method: {method}")
+
+            if not 1 <= paths <= app.config['RISK_MAX_PATHS']:
+                return make_response(jsonify({
+                    'error': f"paths must be between 1 and {app.config['RISK_MAX_PATHS']}"}), 400)
+            if not 1 <= horizon <= app.config['RISK_MAX_HORIZON']:
+                return make_response(jsonify({
+                    'error': f"horizon must be between 1 and {app.config['RISK_MAX_HORIZON']}"}), 400)
+            if not 0.5 <= confidence < 1:
+                return make_response(jsonify({'error': 'confidence must be at least 0.5 and below 1'}), 400)
+
+            risk = portfolio_risk(portfolio_model, history_store, risk_simulator, paths=paths, horizon=horizon,
+                                  confidence=confidence, method=method, lookback=app.config['RISK_LOOKBACK_DAYS'],
+                                  seed=seed, shocks=shocks)
+            return make_response(jsonify({'status': 'success', 'risk': risk}), 200)
+
+        except ValueError as ve:
+            app.logger.error(f"Validation error: {ve}")
+            return make_response(jsonify({'error': str(ve)}), 400)
+        except Exception as e:
+            app.logger.error(f"Error simulating portfolio risk: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
+
+
     @app.route('/api/update-latest-price', methods=['PUT'])
     def update_latest_price() -> Response:
         """
@@ -426,7 +984,9 @@ def create_app(config_class=ProductionConfig):
                 return make_response(jsonify({'error': 'Stock symbol is required'}), 400)
 
             app.logger.info(f"Updating latest price for stock {symbol}...")
-            price = portfolio_model.update_latest_price(symbol)
+            price = update_portfolio(lambda price: portfolio_model.update_latest_price(symbol, price),
+                                     lambda: get_latest_price(symbol, out_ts))
+            observe_quote(symbol, price)
             return make_response(jsonify({'status': 'success', 'new_price': price}), 200)
 
         except Exception as e:
@@ -493,7 +1053,7 @@ def create_app(config_class=ProductionConfig):
             JSON response with purchase success.
 
         Raises:
-            400 error if quantity < 1 or input is invalid.
+            400 error if quantity < 1, input is invalid or the symbol is not listed or unknown.
             500 error if there is an issue buying the stock.
         """
         try:
@@ -502,11 +1062,20 @@ def create_app(config_class=ProductionConfig):
 
             if not symbol or not quantity or quantity < 1:
                 return make_response(jsonify({'error': 'Symbol and positive quantity are required'}), 400)
+            rejection = unknown_symbol(symbol)
+            if rejection:
+                return rejection
 
             app.logger.info(f"Buying {quantity} shares of {symbol}...")
-            portfolio_model.buy_stock(symbol, quantity)
+            price = update_portfolio(lambda quote: portfolio_model.buy_stock(symbol, quantity, quote),
+                                     lambda: portfolio_model.quote_buy(symbol))
+            observe_quote(symbol, price)
             return make_response(jsonify({'status': 'success'}), 200)
 
+        except UnknownSymbolError as e:
+            symbol_guard.report_unknown(symbol)
+            app.logger.error(f"Unknown symbol: {e}")
+            return make_response(jsonify({'error': str(e)}), 400)
         except Exception as e:
             app.logger.error(f"Error buying stock: {e}")
             return make_response(jsonify({'error': str(e)}), 500)
@@ -536,7 +1105,9 @@ def create_app(config_class=ProductionConfig):
                 return make_response(jsonify({'error': 'Symbol and positive quantity are required'}), 400)
 
             app.logger.info(f"Selling {quantity} shares of {symbol}...")
-            portfolio_model.sell_stock(symbol, quantity)
+            price = update_portfolio(lambda price: portfolio_model.sell_stock(symbol, quantity, price),
+                                     lambda: portfolio_model.quote_sell(symbol, quantity))
+            observe_quote(symbol, price)
             return make_response(jsonify({'status': 'success'}), 200)
 
         except Exception as e:
@@ -544,6 +1115,141 @@ def create_app(config_class=ProductionConfig):
             return make_response(jsonify({'error': str(e)}), 500)
 
 
+    @app.route('/api/execute-orders', methods=['POST'])
+    def execute_orders() -> Response:
+        """
+        Route to execute a basket of buy and sell orders atomically.
+
+        Expected JSON Input:
+            - orders (list): Orders of the form {"action": "buy"|"sell", "symbol": str, "quantity": int}.
+
+        Returns:
+            JSON response with the executed orders, net cash flow and remaining funds.
+
+        Raises:
+            400 error if the basket is invalid or cannot be covered; no order is applied.
+            500 error if there is an issue executing the orders.
+        """
+        try:
+            data = request.get_json(silent=True)
+            orders = data.get('orders') if isinstance(data, dict) else None
+
+            if not isinstance(orders, list) or not orders:
+                return make_response(jsonify({'error': 'A non-empty list of orders is required'}), 400)
+
+            app.logger.info(f"Executing batch of {len(orders)} orders...")
+            result = update_portfolio(lambda quotes: portfolio_model.execute_batch(orders, quotes),
+                                      lambda: portfolio_model.quote_batch(orders))
+            return make_response(jsonify({'status': 'success', **result}), 200)
+
+        except ValueError as ve:
+            app.logger.error(f"Rejected order batch: {ve}")
+            return make_response(jsonify({'error': str(ve)}), 400)
+        except Exception as e:
+            app.logger.error(f"Error executing orders: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
+
+
+    @app.route('/api/place-standing-order', methods=['POST'])
+    def place_standing_order() -> Response:
+        """
+        Route to place a limit order or price alert, evaluated server-side on every incoming quote.
+
+        Query Parameters:
+            - symbol (str): The stock symbol.
+            - kind (str): "buy" or "sell" to trade when triggered, or "alert" to only be notified.
+            - threshold (float): The trigger price.
+            - quantity (int): Shares to trade; not needed for alerts.
+            - direction (str, optional): "below" (trigger at or below the threshold) or "above";
+              defaults to below for buys and above for sells, required for alerts.
+
+        Returns:
+            JSON response with the placed order.
+
+        Raises:
+            400 error if the input or symbol is invalid or no user is logged in.
+            500 error if there is an issue placing the order.
+        """
+        try:
+            symbol = request.args.get('symbol')
+            kind = request.args.get('kind')
+            threshold = request.args.get('threshold', type=float)
+            quantity = request.args.get('quantity', 0, type=int)
+            direction = request.args.get('direction')
+
+            if not symbol or not kind or threshold is None:
+                return make_response(jsonify({'error': 'Symbol, kind and threshold are required'}), 400)
+            if portfolio_model.userID is None:
+                return make_response(jsonify({'error': 'Log in to place standing orders'}), 400)
+            rejection = unknown_symbol(symbol)
+            if rejection:
+                return rejection
+
+            app.logger.info(f"Placing {kind} order for {symbol} {direction or ''} {threshold}")
+            order = order_book.place(portfolio_model.userID, symbol, kind, threshold, quantity, direction)
+            return make_response(jsonify({'status': 'success', 'order': order}), 200)
+
+        except ValueError as ve:
+            app.logger.error(f"Validation error: {ve}")
+            return make_response(jsonify({'error': str(ve)}), 400)
+        except Exception as e:
+            app.logger.error(f"Error placing standing order: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
+
+
+    @app.route('/api/cancel-standing-order', methods=['DELETE'])
+    def cancel_standing_order() -> Response:
+        """
+        Route to cancel one of the user's open limit orders or alerts.
+
+        Query Parameters:
+            - order_id (int): The order to cancel.
+
+        Returns:
+            JSON response with the cancelled order.
+
+        Raises:
+            400 error if the order is not an open order of the user.
+            500 error if there is an issue cancelling the order.
+        """
+        try:
+            order_id = request.args.get('order_id', type=int)
+            if order_id is None:
+                return make_response(jsonify({'error': 'order_id is required'}), 400)
+
+            app.logger.info(f"Cancelling standing order {order_id}")
+            order = order_book.cancel(order_id, user_id=portfolio_model.userID)
+            return make_response(jsonify({'status': 'success', 'order': order}), 200)
+
+        except ValueError as ve:
+            app.logger.error(f"Validation error: {ve}")
+            return make_response(jsonify({'error': str(ve)}), 400)
+        except Exception as e:
+            app.logger.error(f"Error cancelling standing order: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
+
+
+    @app.route('/api/standing-orders', methods=['GET'])
+    def get_standing_orders() -> Response:
+        """
+        Route to list the user's open orders and alerts, followed by recently triggered,
+        executed, failed and cancelled ones.
+
+        Returns:
+            JSON response with the orders.
+
+        Raises:
+            500 error if there is an issue listing the orders.
+        """
+        try:
+            app.logger.info("Listing standing orders")
+            return make_response(jsonify({'status': 'success',
+                                          'orders': order_book.orders(portfolio_model.userID)}), 200)
+        except Exception as e:
+            app.logger.error(f"Error listing standing orders: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
+
+
     @app.route('/api/add-interested-stock', methods=['POST'])
     def add_interested_stock() -> Response:
         """
@@ -566,7 +1272,8 @@ def create_app(config_class=ProductionConfig):
                 return make_response(jsonify({'error': 'Stock symbol is required'}), 400)
 
             app.logger.info(f"Favoriting stock {symbol}...")
-            portfolio_model.add_interested_stock(symbol)
+            update_portfolio(lambda quote: portfolio_model.add_interested_stock(symbol, quote),
+                             lambda: portfolio_model.quote_buy(symbol))
             return make_response(jsonify({'status': 'success'}), 200)
 
         except Exception as e:
@@ -596,7 +1303,8 @@ def create_app(config_class=ProductionConfig):
                 return make_response(jsonify({'error': 'Stock symbol is required'}), 400)
             
             app.logger.info(f"Deleting " + symbol + " from portfolio...")
-            portfolio_model.remove_interested_stock(symbol)
+            update_portfolio(lambda price: portfolio_model.remove_interested_stock(symbol, price),
+                             lambda: portfolio_model.quote_removal(symbol))
             return make_response(jsonify({'status': 'success'}), 200)
         
         except ValueError:
@@ -621,7 +1329,7 @@ def create_app(config_class=ProductionConfig):
         
         try:       
             app.logger.info(f"Clearing portfolio...")
-            portfolio_model.clear_all_stocks()
+            update_portfolio(portfolio_model.clear_all_stocks)
             return make_response(jsonify({'status': 'success'}), 200)
         
         except Exception as e:
@@ -634,21 +1342,92 @@ def create_app(config_class=ProductionConfig):
         """
         Route to get user's stock holdings
 
+        Passing any paging parameter returns one page of holdings as an ordered list, served
+        from sort indexes maintained on every trade and price update.
+
+        Query Parameters:
+            - min_market_cap (str, optional): Only holdings with at least this market cap, in
+              dollars or with a K/M/B/T suffix, e.g. "10B".
+            - max_market_cap (str, optional): Only holdings with at most this market cap.
+            - limit (int, optional): Holdings per page (default HOLDINGS_PAGE_SIZE).
+            - cursor (str, optional): The `next_cursor` of the previous page.
+            - sort (str, optional): "value" (default), "weight" or "symbol".
+            - order (str, optional): "asc" or "desc"; defaults to descending for value and weight.
+            - sector (str, optional): Only holdings in this sector.
+
         Returns:
-            JSON response with stock holdings
+            JSON response with stock holdings, or 304 if unchanged
 
         Raises:
+            400 error if a market cap bound or paging parameter is invalid, or both are given
             500 error if there is an issue accessing holdings
         """
         
         try:
+            min_market_cap = request.args.get('min_market_cap')
+            max_market_cap = request.args.get('max_market_cap')
             app.logger.info(f"Getting user holdings...")
-            holdings = portfolio_model.get_stock_holdings()
-            return make_response(jsonify({'status': 'success', 'holdings': holdings}), 200)
+            paging = page_args()
+            if paging is not None:
+                if min_market_cap is not None or max_market_cap is not None:
+                    return make_response(jsonify({'error': 'Market cap bounds cannot be combined with paging'}), 400)
+                def render_page():
+                    page = portfolio_model.get_holdings_page(**paging)
+                    return {'status': 'success', **page, 'holdings': [position_document(stock) for stock in page['holdings']]}
+                return portfolio_response(f"holdings-page-{page_key(paging)}", render_page)
+            if min_market_cap is None and max_market_cap is None:
+                return portfolio_response('holdings', lambda: {'status': 'success', 'holdings': {
+                    symbol: position_document(stock) for symbol, stock in portfolio_model.get_stock_holdings().items()}})
+
+            bounds = [parse_market_cap(bound) if bound is not None else None for bound in (min_market_cap, max_market_cap)]
+            for bound, value in zip((min_market_cap, max_market_cap), bounds):
+                if bound is not None and value is None:
+                    return make_response(jsonify({'error': f"Invalid market cap: {bound}"}), 400)
+            return portfolio_response(f"holdings-cap-{bounds[0]}-{bounds[1]}", lambda: {
+                'status': 'success', 'holdings': {symbol: position_document(stock) for symbol, stock
+                                                  in portfolio_model.get_holdings_by_market_cap(*bounds).items()}})
         
+        except ValueError as ve:
+            app.logger.error(f"Validation error: {ve}")
+            return make_response(jsonify({'error': str(ve)}), 400)
         except Exception as e:
             app.logger.error(f"Error getting stock holdings: {e}")
             return make_response(jsonify({'error': str(e)}), 500)
+
+    @app.route('/api/get-symbol-holders', methods=['GET'])
+    def get_symbol_holders() -> Response:
+        """
+        Route to list the logged-in portfolios holding or watching a stock.
+
+        Query Parameter:
+            - symbol (str): The stock symbol.
+
+        Returns:
+            JSON response with the user ID and quantity of every position in the symbol.
+
+        Raises:
+            400 error if symbol is not provided.
+            500 error if there is an issue reading the holdings index.
+        """
+        try:
+            symbol = request.args.get('symbol')
+
+            if not symbol:
+                return make_response(jsonify({'error': 'Stock symbol is required'}), 400)
+            # Holdings are keyed by upper-case symbol.
+            symbol = symbol.upper()
+
+            app.logger.info(f"Getting holders of {symbol}...")
+            holders = []
+            for portfolio in holdings_index.holders(symbol):
+                stock = portfolio.get_stock_holdings().get(symbol)
+                if stock is not None:
+                    holders.append({'user_id': portfolio.userID, 'quantity': stock.quantity})
+            return make_response(jsonify({'status': 'success', 'symbol': symbol, 'holders': holders}), 200)
+
+        except Exception as e:
+            app.logger.error(f"Error getting holders of {symbol}: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
         
     @app.route('/api/get-funds', methods=['GET'])
     def get_funds() -> Response:
@@ -656,7 +1435,7 @@ def create_app(config_class=ProductionConfig):
         Route to get user's curre t funds
 
         Returns:
-            JSON response with current funds
+            JSON response with current funds, or 304 if unchanged
 
         Raises:
             500 error if there is an issue accessing curren t funds
@@ -664,13 +1443,91 @@ def create_app(config_class=ProductionConfig):
         
         try:
             app.logger.info(f"Getting user funds...")
-            funds = portfolio_model.get_funds()
-            return make_response(jsonify({'status': 'success', 'funds': funds}), 200)
+            return portfolio_response('funds', lambda: {'status': 'success', 'funds': portfolio_model.get_funds()})
         
         except Exception as e:
             app.logger.error(f"Error getting user funds: {e}")
             return make_response(jsonify({'error': str(e)}), 500)
 
+    ####################################################
+    #
+    # Admin
+    #
+    ####################################################
+
+
+    @app.route('/api/admin-summary', methods=['GET'])
+    def admin_summary() -> Response:
+        """
+        Route to report assets under management and the most-held symbols across all saved sessions.
+
+        Computed by a MongoDB aggregation and cached until a session is saved.
+
+        Query Parameter:
+            - top (int, optional): Number of most-held symbols (default 10).
+
+        Returns:
+            JSON response with the number of users, their funds, holdings value and AUM,
+            and the top symbols with their holders, shares and value.
+
+        Raises:
+            400 error if top is invalid.
+            403 error if the admin token is missing or wrong.
+            500 error if there is an issue querying the sessions.
+        """
+        denied = admin_denied()
+        if denied:
+            return denied
+        try:
+            top = request.args.get('top', 10, type=int)
+            if not 1 <= top <= app.config['ANALYTICS_MAX_TOP_SYMBOLS']:
+                return make_response(jsonify({'error': f"top must be between 1 and {app.config['ANALYTICS_MAX_TOP_SYMBOLS']}"}), 400)
+
+            app.logger.info(f"Computing admin summary for top {top} symbols...")
+            return make_response(jsonify({'status': 'success', **session_analytics.summary(top)}), 200)
+
+        except Exception as e:
+            app.logger.error(f"Error computing admin summary: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
+
+
+    @app.route('/api/admin-symbol-holders', methods=['GET'])
+    def admin_symbol_holders() -> Response:
+        """
+        Route to list the users whose saved session holds a stock, logged in or not.
+
+        Query Parameters:
+            - symbol (str): The stock symbol.
+            - limit (int, optional): Maximum number of user IDs (default 100).
+
+        Returns:
+            JSON response with the number of holders and their user IDs in ascending order.
+
+        Raises:
+            400 error if symbol is not provided or limit is invalid.
+            403 error if the admin token is missing or wrong.
+            500 error if there is an issue querying the sessions.
+        """
+        denied = admin_denied()
+        if denied:
+            return denied
+        try:
+            symbol = request.args.get('symbol')
+            limit = request.args.get('limit', 100, type=int)
+
+            if not symbol:
+                return make_response(jsonify({'error': 'Stock symbol is required'}), 400)
+
+            app.logger.info(f"Finding saved sessions holding {symbol}...")
+            return make_response(jsonify({'status': 'success', **session_analytics.holders(symbol, limit)}), 200)
+
+        except ValueError as ve:
+            app.logger.error(f"Validation error: {ve}")
+            return make_response(jsonify({'error': str(ve)}), 400)
+        except Exception as e:
+            app.logger.error(f"Error finding holders of {symbol}: {e}")
+            return make_response(jsonify({'error': str(e)}), 500)
+
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,61 @@
+"""
+Backtest parameter sweep benchmark.
+
+Loads full histories for many symbols through the history store from the stand-in
+provider, then sweeps a moving-average crossover grid in this process and across a
+process pool, and reports the wall time and backtests per second of each.
+
+Usage (from the stock_app directory):
+    PYTHONPATH=$(pwd) python -m benchmarks.backtest_sweep --symbols 50 --days 2520 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.stand_in import StandInTimeSeries
+from stock_app.models.backtest_model import load_closes, sweep
+from stock_app.models.history_store_model import HistoryStore
+from stock_app.utils.cache import StaleWhileRevalidateCache
+from stock_app.utils.rate_limiter import RateLimiter
+
+
+GRID = {"fast": [5, 10, 20, 30], "slow": [50, 100, 150, 200]}
+
+
+def run(symbols: int, days: int, workers: int) -> Dict[str, Dict[str, float]]:
+    store = HistoryStore(StandInTimeSeries(full_days=days), StaleWhileRevalidateCache(), RateLimiter(1e6),
+                         fresh_for=3600, max_stale=86400)
+    _, _, closes = load_closes(store, [f"SYM{i}" for i in range(symbols)], "full")
+    combinations = len(GRID["fast"]) * len(GRID["slow"])
+
+    results = {}
+    for name, pool_size in (("serial", 1), (f"{workers} processes", workers)):
+        start = time.perf_counter()
+        sweep(closes, "sma_crossover", GRID, workers=pool_size)
+        elapsed = time.perf_counter() - start
+        results[name] = {"seconds": elapsed, "backtests_per_second": combinations / elapsed}
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=50, help="number of symbols traded")
+    parser.add_argument("--days", type=int, default=2520, help="daily bars per symbol")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="sweep worker processes")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    results = run(args.symbols, args.days, args.workers)
+    print(f"{args.symbols} symbols x {args.days} days, {len(GRID['fast']) * len(GRID['slow'])} parameter sets")
+    print(f"{'mode':<16}{'seconds':>10}{'backtests/s':>14}")
+    for name, result in results.items():
+        print(f"{name:<16}{result['seconds']:>10.2f}{result['backtests_per_second']:>14.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
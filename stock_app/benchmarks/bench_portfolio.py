@@ -0,0 +1,162 @@
+"""
+Micro-benchmarks for PortfolioModel and session serialization hot paths.
+
+Each benchmark is parametrized by portfolio size (and user count for the
+session round-trips), runs without network access, and records peak and
+retained allocations from `tracemalloc` in the benchmark's extra info so
+model optimizations can be compared run over run.
+
+Usage (from the stock_app directory):
+    PYTHONPATH=$(pwd) python -m pytest benchmarks/bench_portfolio.py
+    PYTHONPATH=$(pwd) python -m pytest benchmarks/bench_portfolio.py --benchmark-autosave --benchmark-compare
+"""
+import logging
+import os
+import tracemalloc
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+os.environ.setdefault("ALPHAVANTAGE_API_KEY", "stand-in")
+
+from stock_app.models import mongo_session_model
+from stock_app.models.mongo_session_model import login_user, logout_user
+from stock_app.models.portfolio_model import PortfolioModel
+from stock_app.models.stock_model import Stock
+
+
+PORTFOLIO_SIZES = [10, 1000, 10000, 100000]
+USER_COUNTS = [1, 10]
+
+
+@pytest.fixture(autouse=True)
+def quiet_logging():
+    """Measure the model itself rather than the stderr log handlers."""
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def make_stocks(size: int) -> list:
+    return [
+        Stock(
+            symbol=f"S{i:06d}", name=f"Company {i}", current_price=10.0 + i % 500,
+            description="", sector=f"SECTOR{i % 11}", industry=f"INDUSTRY{i % 67}",
+            market_cap=str(1000000 * (i + 1)), quantity=1 + i % 100,
+        )
+        for i in range(size)
+    ]
+
+
+def make_portfolio(size: int) -> PortfolioModel:
+    portfolio = PortfolioModel(funds=1000000.0, userid=1)
+    for stock in make_stocks(size):
+        portfolio.load_stock(stock)
+    return portfolio
+
+
+def session_document(user_id: int, size: int) -> dict:
+    return {
+        "user_id": user_id,
+        "funds": 1000000.0,
+        "stock_holdings": {
+            stock.symbol: {
+                "symbol": stock.symbol,
+                "name": stock.name,
+                "current_price": stock.current_price,
+                "description": stock.description,
+                "sector": stock.sector,
+                "industry": stock.industry,
+                "market_cap": stock.market_cap,
+                "quantity": stock.quantity,
+            }
+            for stock in make_stocks(size)
+        },
+    }
+
+
+def record_allocations(benchmark, func, *args) -> None:
+    """Run `func` once under tracemalloc and attach peak/retained bytes to the benchmark."""
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    benchmark.extra_info["alloc_peak_bytes"] = peak
+    benchmark.extra_info["alloc_retained_bytes"] = current
+
+
+@pytest.mark.parametrize("size", PORTFOLIO_SIZES)
+def test_display_portfolio(benchmark, size):
+    portfolio = make_portfolio(size)
+    record_allocations(benchmark, portfolio.display_portfolio)
+    result = benchmark(portfolio.display_portfolio)
+    assert len(result["portfolio"]) == size
+
+
+@pytest.mark.parametrize("size", PORTFOLIO_SIZES)
+def test_calculate_portfolio_value(benchmark, size):
+    portfolio = make_portfolio(size)
+    record_allocations(benchmark, portfolio.calculate_portfolio_value)
+    benchmark(portfolio.calculate_portfolio_value)
+
+
+@pytest.mark.parametrize("size", PORTFOLIO_SIZES)
+def test_load_stock(benchmark, size):
+    def load_all(stocks):
+        portfolio = PortfolioModel(funds=0.0, userid=1)
+        for stock in stocks:
+            portfolio.load_stock(stock)
+        return portfolio
+
+    record_allocations(benchmark, load_all, make_stocks(size))
+    portfolio = benchmark.pedantic(load_all, setup=lambda: ((make_stocks(size),), {}), rounds=5)
+    assert len(portfolio.holding_stocks) == size
+
+
+@pytest.mark.parametrize("users", USER_COUNTS)
+@pytest.mark.parametrize("size", PORTFOLIO_SIZES)
+def test_logout_user_serialization(benchmark, monkeypatch, size, users):
+    collection = MagicMock()
+    collection.update_one.return_value = MagicMock(matched_count=1)
+    monkeypatch.setattr(mongo_session_model, "sessions_collection", collection)
+    stocks = make_stocks(size)
+
+    def setup():
+        portfolios = []
+        for _ in range(users):
+            portfolio = PortfolioModel(funds=1000.0, userid=1)
+            portfolio.holding_stocks = {stock.symbol: stock for stock in stocks}
+            portfolios.append(portfolio)
+        return (portfolios,), {}
+
+    def logout_all(portfolios):
+        for user_id, portfolio in enumerate(portfolios):
+            logout_user(user_id, portfolio)
+        collection.reset_mock()
+
+    record_allocations(benchmark, logout_all, *setup()[0])
+    benchmark.pedantic(logout_all, setup=setup, rounds=5)
+
+
+@pytest.mark.parametrize("users", USER_COUNTS)
+@pytest.mark.parametrize("size", PORTFOLIO_SIZES)
+def test_login_user_deserialization(benchmark, monkeypatch, size, users):
+    documents = {user_id: session_document(user_id, size) for user_id in range(users)}
+    collection = MagicMock()
+    collection.find_one.side_effect = lambda query: documents[query["user_id"]]
+    monkeypatch.setattr(mongo_session_model, "sessions_collection", collection)
+    portfolio = PortfolioModel(funds=0.0, userid=1)
+
+    def login_all():
+        for user_id in documents:
+            login_user(user_id, portfolio)
+        return portfolio
+
+    record_allocations(benchmark, login_all)
+    benchmark(login_all)
+    assert len(portfolio.holding_stocks) == size
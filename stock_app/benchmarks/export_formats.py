@@ -0,0 +1,67 @@
+"""
+Export format benchmark for bulk history extraction.
+
+Encodes the same full-history series as JSON (the default route output, built from
+per-row dicts) and as CSV, Arrow and Parquet (built from columns), and reports the
+bytes per format and the CPU time from raw upstream payload to finished body.
+
+Usage (from the stock_app directory):
+    PYTHONPATH=$(pwd) python -m benchmarks.export_formats --rows 25000 --symbols 20
+"""
+import argparse
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from flask import Flask
+
+from benchmarks.stand_in import StandInTimeSeries
+from stock_app.models.stock_model import daily_bar_columns, fetch_daily_bars, iter_daily_bars
+from stock_app.utils.export import export_available, iter_csv, to_arrow_ipc, to_parquet
+from stock_app.utils.json_provider import FastJSONProvider
+
+
+def run(rows: int, symbols: int) -> Dict[str, Dict[str, float]]:
+    app = Flask("export-benchmark")
+    provider = FastJSONProvider(app)
+    series = {f"SYM{i}": fetch_daily_bars(f"SYM{i}", StandInTimeSeries(full_days=rows), "full")
+              for i in range(symbols)}
+
+    encoders: Dict[str, Callable[[str, Dict], bytes]] = {
+        "json": lambda symbol, bars: provider.dumps_bytes({"status": "success", "data": list(iter_daily_bars(bars))}),
+        "csv": lambda symbol, bars: b"".join(iter_csv(daily_bar_columns(symbol, bars))),
+        "arrow": lambda symbol, bars: to_arrow_ipc(daily_bar_columns(symbol, bars)),
+        "parquet": lambda symbol, bars: to_parquet(daily_bar_columns(symbol, bars)),
+    }
+    results = {}
+    for name, encode in encoders.items():
+        if not export_available(name):
+            print(f"skipping {name}: pyarrow is not installed")
+            continue
+        start = time.process_time()
+        size = sum(len(encode(symbol, bars)) for symbol, bars in series.items())
+        results[name] = {"bytes": size, "cpu_seconds": time.process_time() - start}
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=25000, help="daily bars per symbol")
+    parser.add_argument("--symbols", type=int, default=20, help="number of symbols extracted")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    results = run(args.rows, args.symbols)
+    json_result = results["json"]
+    print(f"{args.symbols} symbols x {args.rows} rows")
+    print(f"{'format':<10}{'MB':>10}{'CPU s':>10}{'bytes vs json':>16}{'CPU vs json':>14}")
+    for name, result in results.items():
+        print(f"{name:<10}{result['bytes'] / 1e6:>10.2f}{result['cpu_seconds']:>10.2f}"
+              f"{result['bytes'] / json_result['bytes']:>16.2f}{result['cpu_seconds'] / json_result['cpu_seconds']:>14.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
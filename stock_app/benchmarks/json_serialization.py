@@ -0,0 +1,105 @@
+"""
+JSON serialization benchmark for large responses.
+
+Serializes a full-history payload (as returned by `stock_historical_data`) through
+Flask's default JSON provider and through `FastJSONProvider`, each as one body and as
+a chunked stream, and reports throughput plus peak traced memory per strategy.
+
+Usage (from the stock_app directory):
+    PYTHONPATH=$(pwd) python -m benchmarks.json_serialization --rows 25000
+    PYTHONPATH=$(pwd) python -m benchmarks.json_serialization --rows 100000 --repeat 5 --output result.json
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from benchmarks.stand_in import StandInTimeSeries
+from stock_app.models.stock_model import stock_historical_data
+from stock_app.utils.json_provider import FastJSONProvider, iter_json_list, orjson
+
+
+def whole_body(provider: DefaultJSONProvider, payload: Dict) -> int:
+    """Builds the response the way a route returning `jsonify(payload)` does."""
+    return len(provider.response(payload).get_data())
+
+
+def streamed_body(provider: DefaultJSONProvider, payload: Dict) -> int:
+    """Consumes the chunked encoding without ever holding the whole document."""
+    envelope = {key: value for key, value in payload.items() if key != "data"}
+    return sum(len(chunk) for chunk in iter_json_list(provider, envelope, "data", payload["data"]))
+
+
+def measure(serialize: Callable[[DefaultJSONProvider, Dict], int], provider: DefaultJSONProvider,
+            payload: Dict, repeat: int) -> Dict[str, float]:
+    """Times `repeat` serializations, then measures peak traced memory of one more."""
+    size = serialize(provider, payload)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        serialize(provider, payload)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        serialize(provider, payload)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "bytes": size,
+        "seconds_per_payload": elapsed / repeat,
+        "payloads_per_sec": repeat / elapsed,
+        "mb_per_sec": size * repeat / elapsed / 1e6,
+        "peak_kib": peak / 1024.0,
+    }
+
+
+def run(rows: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    payload = {"status": "success", "data": stock_historical_data("IBM", StandInTimeSeries(full_days=rows), "full")}
+    apps = [Flask("default-json"), Flask("fast-json")]  # providers only hold weak references
+    default, fast = DefaultJSONProvider(apps[0]), FastJSONProvider(apps[1])
+    strategies = {
+        "default": (whole_body, default),
+        "default-streamed": (streamed_body, default),
+        "fast": (whole_body, fast),
+        "fast-streamed": (streamed_body, fast),
+    }
+    return {name: measure(serialize, provider, payload, repeat) for name, (serialize, provider) in strategies.items()}
+
+
+def print_report(results: Dict[str, Dict[str, float]], rows: int) -> None:
+    print(f"{rows} rows, orjson {'available' if orjson is not None else 'NOT installed'}")
+    print(f"{'strategy':<18}{'MB':>8}{'ms/payload':>12}{'payloads/s':>12}{'MB/s':>10}{'peak KiB':>12}")
+    baseline = results["default"]["seconds_per_payload"]
+    for name, result in results.items():
+        print(f"{name:<18}{result['bytes'] / 1e6:>8.2f}{result['seconds_per_payload'] * 1000:>12.1f}"
+              f"{result['payloads_per_sec']:>12.1f}{result['mb_per_sec']:>10.1f}{result['peak_kib']:>12.0f}"
+              f"   x{baseline / result['seconds_per_payload']:.1f}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=25000, help="daily bars in the history payload")
+    parser.add_argument("--repeat", type=int, default=10, help="timed serializations per strategy")
+    parser.add_argument("--output", help="write the JSON result to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    results = run(args.rows, args.repeat)
+    print_report(results, args.rows)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rows": args.rows, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
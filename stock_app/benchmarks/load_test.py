@@ -0,0 +1,380 @@
+"""
+Load-testing harness for the HTTP API.
+
+Drives a weighted mix of logins, buys, sells, portfolio displays and history
+fetches at a configurable concurrency and reports throughput plus p50/p95/p99
+latency per endpoint. By default the app runs in-process against the offline
+stand-in provider and an in-memory mongomock sessions collection; pass
+`--base-url` to drive an already running server instead.
+
+The app logs at WARNING during the run (see `--log-level`): at DEBUG, every login
+writes a line per restored stock, and the logging dominates the latencies.
+
+Latencies depend on the machine, so a baseline is only comparable with runs on the
+machine and with the settings it was recorded with. Both are stored in the baseline;
+`--compare` refuses a baseline recorded with other settings and warns about one
+recorded on another machine. Re-record it on the machine that runs the comparison,
+with the settings the comparison uses, before relying on `--compare`. Each metric is
+the best of `--repeat` runs, which damps the noise of a shared machine.
+
+Usage (from the stock_app directory):
+    PYTHONPATH=$(pwd) python -m benchmarks.load_test --requests 2000 --concurrency 8
+    PYTHONPATH=$(pwd) python -m benchmarks.load_test --compare      # check against stored baseline
+    PYTHONPATH=$(pwd) python -m benchmarks.load_test --compare --tolerance 0.4
+    PYTHONPATH=$(pwd) python -m benchmarks.load_test --save-baseline
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.stand_in import (
+    StandInFundamentalData,
+    StandInTimeSeries,
+    install_mongomock,
+    install_stand_in_provider,
+)
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "load_test.json")
+
+SYMBOLS = ["AAPL", "MSFT", "IBM", "SBUX", "GOOG", "AMZN", "NVDA", "TSLA"]
+USERNAME = "loadtest"
+PASSWORD = "loadtest-password"
+
+# Run settings that must match for a run to be compared with a baseline.
+SETTINGS = ("requests", "concurrency", "seed", "history_size", "weights", "latency", "base_url", "repeat")
+
+# Relative frequency of each operation in the mixed workload.
+DEFAULT_WEIGHTS = {
+    "login": 1,
+    "buy": 4,
+    "sell": 3,
+    "display": 6,
+    "history": 2,
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, int(round(pct / 100.0 * len(samples) + 0.5)) - 1))
+    return samples[rank]
+
+
+class InProcessTransport:
+    """Sends requests through Flask test clients, one per worker thread."""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, json_body: Optional[Dict] = None) -> int:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        return client.open(path, method=method, json=json_body).status_code
+
+
+class HttpTransport:
+    """Sends requests to a running server, one `requests.Session` per worker thread."""
+
+    def __init__(self, base_url: str):
+        import requests
+
+        self._requests = requests
+        self.base_url = base_url.rstrip("/")
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, json_body: Optional[Dict] = None) -> int:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._requests.Session()
+        return session.request(method, self.base_url + path, json=json_body).status_code
+
+
+def build_operations(history_size: str) -> Dict[str, Callable[[random.Random], Tuple[str, str, Optional[Dict]]]]:
+    """Map each workload operation to a function producing (method, path, json body)."""
+    credentials = {"username": USERNAME, "password": PASSWORD}
+    return {
+        "login": lambda rng: ("POST", "/api/login", credentials),
+        "buy": lambda rng: ("POST", f"/api/buy-stock?symbol={rng.choice(SYMBOLS)}&quantity=1", None),
+        "sell": lambda rng: ("PUT", f"/api/sell-stock?symbol={rng.choice(SYMBOLS)}&quantity=1", None),
+        "display": lambda rng: ("GET", "/api/display-portfolio", None),
+        "history": lambda rng: (
+            "GET", f"/api/retrieve-stock-historical-data?symbol={rng.choice(SYMBOLS)}&size={history_size}", None),
+    }
+
+
+def prepare_account(transport, funds: float) -> None:
+    """Create the benchmark user with enough funds and shares for sells to succeed."""
+    transport.request("POST", "/api/create-user", {"username": USERNAME, "password": PASSWORD})
+    transport.request("POST", "/api/login", {"username": USERNAME, "password": PASSWORD})
+    transport.request("PUT", f"/api/profile-charge-funds?value={funds}")
+    for symbol in SYMBOLS:
+        transport.request("POST", f"/api/buy-stock?symbol={symbol}&quantity=100000")
+    # Persist the seeded session so every login in the workload restores it.
+    transport.request("POST", "/api/logout", {"username": USERNAME})
+    transport.request("POST", "/api/login", {"username": USERNAME, "password": PASSWORD})
+
+
+def run_workload(transport, total_requests: int, concurrency: int, weights: Dict[str, int],
+                 history_size: str, seed: int) -> Dict:
+    """
+    Execute the mixed workload and collect latency samples per operation.
+
+    Returns:
+        dict: Summary with overall throughput and per-endpoint statistics.
+    """
+    operations = build_operations(history_size)
+    names = [name for name in weights if weights[name] > 0]
+    name_weights = [weights[name] for name in names]
+
+    samples: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    lock = threading.Lock()
+
+    per_worker = [total_requests // concurrency] * concurrency
+    for i in range(total_requests % concurrency):
+        per_worker[i] += 1
+
+    def worker(worker_id: int, count: int) -> None:
+        rng = random.Random(seed + worker_id)
+        local_samples = defaultdict(list)
+        local_errors = defaultdict(int)
+        for _ in range(count):
+            name = rng.choices(names, weights=name_weights)[0]
+            method, path, body = operations[name](rng)
+            start = time.perf_counter()
+            status = transport.request(method, path, body)
+            local_samples[name].append(time.perf_counter() - start)
+            if status >= 400:
+                local_errors[name] += 1
+        with lock:
+            for name, values in local_samples.items():
+                samples[name].extend(values)
+            for name, value in local_errors.items():
+                errors[name] += value
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(worker, i, n) for i, n in enumerate(per_worker)]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for name in sorted(samples):
+        values = sorted(samples[name])
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": errors.get(name, 0),
+            "throughput_rps": len(values) / elapsed,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+        }
+
+    return {
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "throughput_rps": total_requests / elapsed,
+        "endpoints": endpoints,
+    }
+
+
+def best_of(results: List[Dict]) -> Dict:
+    """
+    Combine repeated runs of the workload, keeping each metric's best value.
+
+    Noise on a shared machine only ever slows a run down, so the best of a few runs is far
+    more stable than any single one, especially in the tail latencies.
+    """
+    best = dict(results[0], elapsed_s=min(r["elapsed_s"] for r in results),
+                throughput_rps=max(r["throughput_rps"] for r in results), endpoints={})
+    for name in results[0]["endpoints"]:
+        runs = [r["endpoints"][name] for r in results if name in r["endpoints"]]
+        best["endpoints"][name] = dict(
+            runs[0],
+            errors=max(run["errors"] for run in runs),
+            throughput_rps=max(run["throughput_rps"] for run in runs),
+            **{key: min(run[key] for run in runs) for key in ("p50_ms", "p95_ms", "p99_ms")},
+        )
+    return best
+
+
+def machine_info() -> Dict:
+    """Describe the machine a run was recorded on."""
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+
+def baseline_mismatches(result: Dict, baseline: Dict) -> Tuple[List[str], List[str]]:
+    """
+    Check that a baseline was recorded like this run.
+
+    Returns:
+        tuple: Settings that differ, which make the comparison meaningless, and machine
+        properties that differ, which make it only indicative.
+    """
+    settings = result.get("settings", {})
+    # Older baselines only record the request count and concurrency, at the top level.
+    recorded = baseline.get("settings") or {key: baseline[key] for key in ("requests", "concurrency") if key in baseline}
+    differing_settings = [f"{key} {recorded.get(key)!r} != {settings.get(key)!r}"
+                          for key in SETTINGS if key in recorded and recorded[key] != settings.get(key)]
+    machine, recorded_machine = result.get("machine", {}), baseline.get("machine")
+    if recorded_machine is None:
+        return differing_settings, ["the baseline does not record its machine"]
+    differing_machine = [f"{key} {recorded_machine.get(key)!r} != {machine.get(key)!r}"
+                         for key in machine if recorded_machine.get(key) != machine.get(key)]
+    return differing_settings, differing_machine
+
+
+def compare_to_baseline(result: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Compare a run against a stored baseline.
+
+    A run regresses when its overall throughput is more than `tolerance` below the
+    baseline's, or an endpoint's p95 or p99 latency is more than `tolerance` above it.
+
+    Returns:
+        list[str]: Human-readable regressions; empty when within tolerance.
+    """
+    regressions = []
+    if result["throughput_rps"] < baseline["throughput_rps"] * (1 - tolerance):
+        regressions.append(
+            f"overall throughput {result['throughput_rps']:.1f} rps < baseline {baseline['throughput_rps']:.1f} rps")
+    for name, stats in baseline.get("endpoints", {}).items():
+        current = result["endpoints"].get(name)
+        if current is None:
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            if current[key] > stats[key] * (1 + tolerance):
+                regressions.append(f"{name} {key} {current[key]:.2f} > baseline {stats[key]:.2f}")
+    return regressions
+
+
+def print_report(result: Dict) -> None:
+    repeat = result.get("settings", {}).get("repeat", 1)
+    print(f"{result['requests']} requests, concurrency {result['concurrency']}, "
+          f"{result['elapsed_s']:.2f}s, {result['throughput_rps']:.1f} req/s"
+          + (f" (best of {repeat} runs)" if repeat > 1 else ""))
+    print(f"{'endpoint':<10} {'requests':>8} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, stats in result["endpoints"].items():
+        print(f"{name:<10} {stats['requests']:>8} {stats['errors']:>7} {stats['throughput_rps']:>9.1f} "
+              f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+
+
+def create_in_process_transport(latency: float, local_mongo: bool) -> InProcessTransport:
+    """Build the app with the stand-in provider and in-memory storage."""
+    import app as app_module
+    from config import TestConfig
+
+    install_stand_in_provider(app_module, StandInTimeSeries(latency=latency), StandInFundamentalData(latency=latency))
+    if not local_mongo:
+        install_mongomock()
+    return InProcessTransport(app_module.create_app(TestConfig))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="total number of requests")
+    parser.add_argument("--concurrency", type=int, default=8, help="number of concurrent clients")
+    parser.add_argument("--seed", type=int, default=411)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs of the workload; each metric reports its best run, which damps machine noise")
+    parser.add_argument("--history-size", choices=["compact", "full"], default="compact")
+    parser.add_argument("--weights", type=json.loads, default=DEFAULT_WEIGHTS,
+                        help='JSON operation weights, e.g. \'{"buy": 1, "display": 5}\'')
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="simulated upstream latency in seconds (in-process mode only)")
+    parser.add_argument("--base-url", help="drive a running server instead of an in-process app")
+    parser.add_argument("--local-mongo", action="store_true",
+                        help="use the configured MongoDB instead of mongomock (in-process mode only)")
+    parser.add_argument("--output", help="write the JSON result to this path")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="fail if the run regresses against the baseline")
+    parser.add_argument("--tolerance", type=float, default=float(os.getenv("LOAD_TEST_TOLERANCE", "0.25")),
+                        help="allowed relative regression of throughput and p95/p99 latency, e.g. 0.25 for 25%%; "
+                             "defaults to $LOAD_TEST_TOLERANCE or 0.25")
+    parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], default="WARNING",
+                        help="lowest level the app logs during the run")
+    args = parser.parse_args(argv)
+    if args.tolerance < 0:
+        parser.error("--tolerance must not be negative")
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    # Every app logger is set to DEBUG; cap them all so log writes do not skew the latencies.
+    logging.disable(getattr(logging, args.log_level) - 1)
+    try:
+        if args.base_url:
+            transport = HttpTransport(args.base_url)
+        else:
+            transport = create_in_process_transport(args.latency, args.local_mongo)
+
+        prepare_account(transport, funds=1e9)
+        result = best_of([run_workload(transport, args.requests, args.concurrency, args.weights, args.history_size,
+                                       args.seed) for _ in range(args.repeat)])
+    finally:
+        logging.disable(logging.NOTSET)
+    result["settings"] = {key: getattr(args, key) for key in SETTINGS}
+    result["machine"] = machine_info()
+    print_report(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        differing_settings, differing_machine = baseline_mismatches(result, baseline)
+        if differing_settings:
+            print("The baseline was recorded with other settings; rerun with them or re-record it with --save-baseline:")
+            for line in differing_settings:
+                print(f"  - {line}")
+            return 2
+        if differing_machine:
+            print("Warning: the baseline was recorded on another machine, so the comparison is only indicative; "
+                  "re-record it here with --save-baseline:")
+            for line in differing_machine:
+                print(f"  - {line}")
+        regressions = compare_to_baseline(result, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Monte Carlo risk simulation benchmark.
+
+Builds a year of daily returns for a portfolio from the stand-in provider's histories,
+then simulates paths with each method on 1, 2, ... up to --workers processes and reports
+paths per second in total and per core. Pools are warmed up before timing, so process
+start-up is not counted.
+
+Usage (from the stock_app directory):
+    PYTHONPATH=$(pwd) python -m benchmarks.risk_simulation --symbols 50 --paths 500000 --horizon 10 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.stand_in import StandInTimeSeries
+from stock_app.models.backtest_model import load_closes
+from stock_app.models.history_store_model import HistoryStore
+from stock_app.models.risk_model import METHODS, RiskSimulator, log_returns
+from stock_app.utils.cache import StaleWhileRevalidateCache
+from stock_app.utils.rate_limiter import RateLimiter
+
+
+def run(symbols: int, paths: int, horizon: int, workers: int) -> Dict[str, Dict[int, float]]:
+    store = HistoryStore(StandInTimeSeries(), StaleWhileRevalidateCache(), RateLimiter(1e6),
+                         fresh_for=3600, max_stale=86400)
+    _, _, closes = load_closes(store, [f"SYM{i}" for i in range(symbols)], "full")
+    returns = log_returns(closes, 252)
+    values = np.full(symbols, 10000.0)
+
+    results: Dict[str, Dict[int, float]] = {method: {} for method in METHODS}
+    for count in range(1, workers + 1):
+        simulator = RiskSimulator(workers=count, min_parallel_paths=1)
+        try:
+            simulator.simulate(returns, values, paths=paths, horizon=horizon, seed=0)
+            for method in METHODS:
+                start = time.perf_counter()
+                simulator.simulate(returns, values, method=method, paths=paths, horizon=horizon, seed=0)
+                results[method][count] = paths / (time.perf_counter() - start)
+        finally:
+            simulator.shutdown()
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=50, help="positions in the portfolio")
+    parser.add_argument("--paths", type=int, default=500000, help="paths per simulation")
+    parser.add_argument("--horizon", type=int, default=10, help="days per path")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="largest worker count measured")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    results = run(args.symbols, args.paths, args.horizon, args.workers)
+    print(f"{args.symbols} positions, {args.paths} paths of {args.horizon} days")
+    print(f"{'method':<12}{'workers':>8}{'paths/s':>14}{'paths/s/core':>14}")
+    for method, by_workers in results.items():
+        for count, rate in by_workers.items():
+            print(f"{method:<12}{count:>8}{rate:>14,.0f}{rate / count:>14,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
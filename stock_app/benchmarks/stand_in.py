@@ -0,0 +1,119 @@
+"""
+Offline stand-ins for the Alpha Vantage clients and MongoDB used by the benchmarks.
+
+The stand-in provider mimics the tuple-shaped responses returned by
+`alpha_vantage.timeseries.TimeSeries` and `alpha_vantage.fundamentaldata.FundamentalData`
+so the application code runs unchanged, without network access or API quota.
+"""
+import datetime
+import os
+import time
+import zlib
+from typing import Dict, Tuple
+
+# PortfolioModel refuses to import without an API key; the stand-in never uses it.
+os.environ.setdefault("ALPHAVANTAGE_API_KEY", "stand-in")
+
+
+def _base_price(symbol: str) -> float:
+    """Deterministic per-symbol price between 10 and 510."""
+    return 10.0 + (zlib.crc32(symbol.encode()) % 50000) / 100.0
+
+
+class StandInTimeSeries:
+    """
+    Deterministic replacement for `TimeSeries`.
+
+    Args:
+        latency (float): Seconds to sleep per call, to imitate upstream round-trips.
+        full_days (int): Number of daily bars returned for `outputsize="full"`.
+    """
+
+    def __init__(self, latency: float = 0.0, full_days: int = 5000):
+        self.latency = latency
+        self.full_days = full_days
+        self.calls = 0
+
+    def _wait(self) -> None:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_quote_endpoint(self, symbol: str) -> Tuple[Dict, None]:
+        self._wait()
+        return {"01. symbol": symbol, "05. price": f"{_base_price(symbol):.4f}"}, None
+
+    def get_daily(self, symbol: str, outputsize: str = "compact") -> Tuple[Dict, None]:
+        self._wait()
+        days = self.full_days if outputsize == "full" else 100
+        price = _base_price(symbol)
+        today = datetime.date(2024, 12, 31)
+        data = {}
+        for i in range(days):
+            close = price * (1.0 + 0.01 * ((i * 7919) % 21 - 10) / 10.0)
+            data[(today - datetime.timedelta(days=i)).isoformat()] = {
+                "1. open": f"{close * 0.995:.4f}",
+                "2. high": f"{close * 1.01:.4f}",
+                "3. low": f"{close * 0.99:.4f}",
+                "4. close": f"{close:.4f}",
+                "5. volume": str(1000000 + i),
+            }
+        return data, None
+
+
+class StandInFundamentalData:
+    """Deterministic replacement for `FundamentalData`."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def get_company_overview(self, symbol: str) -> Tuple[Dict, None]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return {
+            "Symbol": symbol,
+            "Name": f"{symbol} Corp.",
+            "Description": f"Stand-in company for {symbol}.",
+            "Sector": "TECHNOLOGY",
+            "Industry": "SOFTWARE",
+            "MarketCapitalization": str(int(_base_price(symbol) * 1e9)),
+        }, None
+
+
+def install_stand_in_provider(app_module, ts: StandInTimeSeries, fd: StandInFundamentalData) -> None:
+    """
+    Point the application module and `PortfolioModel` at the stand-in clients.
+
+    Args:
+        app_module: The imported `app` module (routes read `out_ts`/`out_fd` from it).
+        ts (StandInTimeSeries): Time series stand-in.
+        fd (StandInFundamentalData): Fundamental data stand-in.
+    """
+    from stock_app.models.portfolio_model import PortfolioModel
+
+    app_module.out_ts = ts
+    app_module.out_fd = fd
+    PortfolioModel.ts = ts
+    PortfolioModel.fd = fd
+
+
+def install_mongomock() -> None:
+    """
+    Replace the sessions collection with an in-memory mongomock collection.
+
+    Raises:
+        RuntimeError: If mongomock is not installed.
+    """
+    try:
+        import mongomock
+    except ImportError as e:
+        raise RuntimeError("mongomock is not installed; install it or run with --local-mongo") from e
+
+    from stock_app.clients import mongo_client
+    from stock_app.models import mongo_session_model
+
+    collection = mongomock.MongoClient()["stock_app"]["sessions"]
+    mongo_client.sessions_collection = collection
+    mongo_session_model.sessions_collection = collection
@@ -7,8 +7,72 @@ class ProductionConfig():
                                            # But we are doing unnecessarily complicated Redis
                                            # write-throughs
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:////app/db/app.db')  # Production database URI from environment
+    PRICE_STREAM_INTERVAL = float(os.getenv('PRICE_STREAM_INTERVAL', 15))  # Seconds between upstream polls per symbol
+    PRICE_STREAM_HEARTBEAT = 15  # Seconds of silence before a keep-alive comment is sent
+    PRICE_STREAM_MAX_SYMBOLS = 10  # Symbols allowed per stream subscription
+    PRICE_REFRESH_ENABLED = os.getenv('PRICE_REFRESH_ENABLED', 'false').lower() == 'true'  # Off by default: the free API tier allows 25 calls a day
+    PRICE_REFRESH_INTERVAL = float(os.getenv('PRICE_REFRESH_INTERVAL', 300))  # Seconds between refresh cycles
+    PRICE_REFRESH_BUDGET = int(os.getenv('PRICE_REFRESH_BUDGET', 5))  # Upstream quote calls per cycle
+    MARKET_DATA_CACHE_SIZE = 1024  # Cached market-data responses kept in memory
+    RESPONSE_CACHE_SIZE = 64  # Serialized read responses kept by ETag
+    FAST_JSON_ENABLED = True  # Serialize with orjson when installed
+    JSON_STREAM_MIN_ITEMS = 5000  # Lists at least this long are streamed in chunks instead of cached whole
+    UPSTREAM_CALLS_PER_MINUTE = float(os.getenv('UPSTREAM_CALLS_PER_MINUTE', 75))  # Alpha Vantage plan limit for history fetches
+    HISTORY_FETCH_WORKERS = int(os.getenv('HISTORY_FETCH_WORKERS', 4))  # Concurrent upstream history fetches
+    HISTORY_MATRIX_MAX_SYMBOLS = 100  # Symbols allowed per historical matrix request
+    RISK_WORKERS = int(os.getenv('RISK_WORKERS', os.cpu_count() or 1))  # Worker processes for Monte Carlo risk
+    RISK_MAX_PATHS = int(os.getenv('RISK_MAX_PATHS', 1000000))  # Paths allowed per risk request
+    RISK_MAX_HORIZON = int(os.getenv('RISK_MAX_HORIZON', 252))  # Trading days allowed per risk request
+    RISK_PARALLEL_MIN_PATHS = 20000  # Smaller simulations run in the request thread
+    RISK_LOOKBACK_DAYS = 252  # Daily returns the risk simulation samples from
+    SYMBOL_LISTING_FILE = os.getenv('SYMBOL_LISTING_FILE')  # CSV of listed symbols; unknown symbols are rejected once loaded
+    SYMBOL_SEARCH_MAX_RESULTS = 50  # Results allowed per symbol search
+    UNKNOWN_SYMBOL_TTL = float(os.getenv('UNKNOWN_SYMBOL_TTL', 3600))  # Seconds a symbol the API did not know is rejected locally
+    UNKNOWN_SYMBOL_CACHE_SIZE = 10000  # Unknown symbols remembered
+    HOLDINGS_PAGE_SIZE = 50  # Holdings per page when paging parameters are given without a limit
+    HOLDINGS_PAGE_MAX_SIZE = 1000  # Holdings allowed per page
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')  # Required in X-Admin-Token by the admin analytics routes; unset disables them
+    ANALYTICS_REFRESH_INTERVAL = float(os.getenv('ANALYTICS_REFRESH_INTERVAL', 60))  # Seconds an analytics result is served before checking for session changes
+    ANALYTICS_MAX_TOP_SYMBOLS = 100  # Most-held symbols allowed per analytics request
+    REDIS_STATE_ENABLED = os.getenv('REDIS_STATE_ENABLED', 'false').lower() == 'true'  # Share the logged-in portfolio between workers through Redis; standing orders still need a single worker
+    REDIS_STATE_RETRIES = 3  # Times a trade that conflicted with another worker is run again
+    MARKET_DATA_STALENESS = {  # Per endpoint: (seconds served as fresh, max seconds served while revalidating)
+        'price': (float(os.getenv('PRICE_FRESH_FOR', 60)), float(os.getenv('PRICE_MAX_STALE', 900))),
+        'stock': (float(os.getenv('STOCK_INFO_FRESH_FOR', 3600)), float(os.getenv('STOCK_INFO_MAX_STALE', 86400))),
+        'history': (float(os.getenv('HISTORY_FRESH_FOR', 3600)), float(os.getenv('HISTORY_MAX_STALE', 86400))),
+    }
 class TestConfig():
     """Testing configuration."""
     TESTING = True
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'  # Use in-memory database for tests
+    PRICE_STREAM_INTERVAL = 0.05
+    PRICE_STREAM_HEARTBEAT = 0.05
+    PRICE_STREAM_MAX_SYMBOLS = 10
+    PRICE_REFRESH_ENABLED = False
+    PRICE_REFRESH_INTERVAL = 300
+    PRICE_REFRESH_BUDGET = 5
+    MARKET_DATA_CACHE_SIZE = 16
+    RESPONSE_CACHE_SIZE = 16
+    FAST_JSON_ENABLED = True
+    JSON_STREAM_MIN_ITEMS = 5000
+    MARKET_DATA_STALENESS = {'price': (0, 0), 'stock': (0, 0), 'history': (0, 0)}
+    UPSTREAM_CALLS_PER_MINUTE = 6000
+    HISTORY_FETCH_WORKERS = 4
+    HISTORY_MATRIX_MAX_SYMBOLS = 100
+    RISK_WORKERS = 1
+    RISK_MAX_PATHS = 100000
+    RISK_MAX_HORIZON = 252
+    RISK_PARALLEL_MIN_PATHS = 20000
+    RISK_LOOKBACK_DAYS = 252
+    SYMBOL_LISTING_FILE = None
+    SYMBOL_SEARCH_MAX_RESULTS = 50
+    UNKNOWN_SYMBOL_TTL = 3600
+    UNKNOWN_SYMBOL_CACHE_SIZE = 10000
+    HOLDINGS_PAGE_SIZE = 50
+    HOLDINGS_PAGE_MAX_SIZE = 1000
+    ADMIN_TOKEN = None
+    ANALYTICS_REFRESH_INTERVAL = 0
+    ANALYTICS_MAX_TOP_SYMBOLS = 100
+    REDIS_STATE_ENABLED = False
+    REDIS_STATE_RETRIES = 3
@@ -7,6 +7,8 @@ CREATE TABLE stocks (
     sector TEXT,
     industry TEXT,
     market_cap TEXT,
+    market_cap_value REAL,
     quantity INTEGER NOT NULL,
     PRIMARY KEY (symbol)
-);
\ No newline at end of file
+);
+CREATE INDEX idx_stocks_market_cap_value ON stocks (market_cap_value);
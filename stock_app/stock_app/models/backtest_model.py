@@ -0,0 +1,286 @@
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from stock_app.models.history_store_model import HistoryStore
+from stock_app.models.performance_model import TRADING_DAYS_PER_YEAR, align_closes, fill_gaps
+from stock_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# A strategy maps a dates x symbols close matrix and its parameters to target weights of the
+# same shape: the fraction of equity to hold in each symbol at each date's close.
+Strategy = Callable[..., np.ndarray]
+
+
+def rolling_mean(closes: np.ndarray, window: int) -> np.ndarray:
+    """
+    Args:
+        closes (np.ndarray): Dates x symbols prices.
+        window (int): Number of dates averaged.
+
+    Returns:
+        np.ndarray: The trailing mean of each column, NaN until `window` dates are available.
+    """
+    if window < 1:
+        raise ValueError("Window must be at least 1.")
+    sums = np.cumsum(closes, axis=0)
+    means = np.full(closes.shape, np.nan)
+    if window <= len(closes):
+        means[window - 1:] = sums[window - 1:]
+        means[window:] -= sums[:-window]
+        means[window - 1:] /= window
+    return means
+
+
+def sma_crossover(closes: np.ndarray, fast: int = 20, slow: int = 50) -> np.ndarray:
+    """
+    Holds an equal share of equity in every symbol whose fast moving average is above its slow one.
+
+    Args:
+        closes (np.ndarray): Dates x symbols prices.
+        fast (int, optional): Fast window in dates.
+        slow (int, optional): Slow window in dates.
+
+    Returns:
+        np.ndarray: Target weights.
+    """
+    if fast >= slow:
+        raise ValueError("The fast window must be shorter than the slow one.")
+    with np.errstate(invalid="ignore"):
+        long = rolling_mean(closes, fast) > rolling_mean(closes, slow)
+    return long / closes.shape[1]
+
+
+def momentum(closes: np.ndarray, lookback: int = 60) -> np.ndarray:
+    """
+    Holds an equal share of equity in every symbol that gained over the lookback window.
+
+    Args:
+        closes (np.ndarray): Dates x symbols prices.
+        lookback (int, optional): Window in dates.
+
+    Returns:
+        np.ndarray: Target weights.
+    """
+    if lookback < 1:
+        raise ValueError("Lookback must be at least 1.")
+    long = np.zeros(closes.shape, dtype=bool)
+    long[lookback:] = closes[lookback:] > closes[:-lookback]
+    return long / closes.shape[1]
+
+
+STRATEGIES: Dict[str, Strategy] = {
+    "sma_crossover": sma_crossover,
+    "momentum": momentum,
+}
+
+
+def resolve_strategy(strategy: Union[str, Strategy]) -> Strategy:
+    """
+    Args:
+        strategy (str or callable): A name from `STRATEGIES`, or a strategy function.
+
+    Returns:
+        Strategy: The strategy function.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if callable(strategy):
+        return strategy
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}. Expected one of {', '.join(STRATEGIES)}.")
+    return STRATEGIES[strategy]
+
+
+def simulate(closes: np.ndarray, weights: np.ndarray, funds: float) -> Dict[str, Any]:
+    """
+    Rebalances a portfolio to the target weights at every close, following the trading rules
+    of `PortfolioModel`: whole shares only, no short positions, and buys limited to the
+    available funds.
+
+    Orders for all symbols are computed together for each date; only the walk over dates
+    is sequential, since each date's funds depend on the fills before it. Sells fill
+    before buys, and when the buys cost more than the funds left they are all scaled
+    down and rounded down to whole shares.
+
+    Args:
+        closes (np.ndarray): Dates x symbols prices; symbols without a price (0 or NaN)
+            are not traded that day.
+        weights (np.ndarray): Target weights, same shape as `closes`.
+        funds (float): Starting funds.
+
+    Returns:
+        dict: The daily `equity`, final `shares` per symbol and `funds`, and the number
+        of `trades` (orders filled).
+    """
+    n_dates, n_symbols = closes.shape
+    prices = np.nan_to_num(closes, nan=0.0)
+    tradable = prices > 0
+    weights = np.where(tradable, np.nan_to_num(weights, nan=0.0), 0.0)
+
+    shares = np.zeros(n_symbols, dtype=np.int64)
+    cash = float(funds)
+    equity = np.empty(n_dates)
+    trades = 0
+    for t in range(n_dates):
+        price, can_trade = prices[t], tradable[t]
+        value = cash + shares @ price
+        safe_price = np.where(can_trade, price, 1.0)
+        target = np.where(can_trade, np.floor(weights[t] * value / safe_price), shares).astype(np.int64)
+        delta = target - shares
+
+        sells = np.minimum(delta, 0)
+        cash -= sells @ price
+        shares += sells
+
+        buys = np.maximum(delta, 0)
+        cost = buys @ price
+        if cost > cash:
+            buys = np.floor(buys * (cash / cost)).astype(np.int64)
+            cost = buys @ price
+        cash -= cost
+        shares += buys
+
+        trades += int(np.count_nonzero(sells) + np.count_nonzero(buys))
+        equity[t] = cash + shares @ price
+
+    return {"equity": equity, "shares": shares, "funds": cash, "trades": trades}
+
+
+def summarize(equity: np.ndarray) -> Dict[str, float]:
+    """
+    Args:
+        equity (np.ndarray): Daily equity, oldest first.
+
+    Returns:
+        dict: `total_return`, `max_drawdown` and annualized `volatility`.
+    """
+    if len(equity) == 0 or equity[0] <= 0:
+        return {"total_return": 0.0, "max_drawdown": 0.0, "volatility": 0.0}
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+    returns = equity[1:] / equity[:-1] - 1.0
+    volatility = float(returns.std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)) if len(returns) > 1 else 0.0
+    return {
+        "total_return": float(equity[-1] / equity[0] - 1.0),
+        "max_drawdown": float(drawdown.min()),
+        "volatility": volatility,
+    }
+
+
+def load_closes(store: HistoryStore, symbols: List[str], size: str = "full") -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Loads aligned daily closes for a backtest from the history store the app serves.
+
+    Args:
+        store (HistoryStore): The history store.
+        symbols (List[str]): The stock ticker symbols; duplicates are ignored.
+        size (str, optional): 'compact' or 'full'.
+
+    Returns:
+        tuple: The symbols (columns), the dates (datetime64[D], oldest first) and the
+        dates x symbols close matrix, gaps filled with the last known close.
+
+    Raises:
+        ValueError: If no symbols are given or a symbol's history cannot be loaded.
+    """
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols if symbol))
+    if not symbols:
+        raise ValueError("At least one symbol is required.")
+    histories, errors = store.load_many(symbols, size)
+    if errors:
+        raise ValueError(f"Could not load history for: {', '.join(sorted(errors))}")
+    days, closes = align_closes([histories[symbol] for symbol in symbols])
+    return symbols, days, fill_gaps(closes)
+
+
+def backtest(closes: np.ndarray, strategy: Union[str, Strategy], params: Optional[Dict[str, Any]] = None,
+             funds: float = 10000.0) -> Dict[str, Any]:
+    """
+    Runs a strategy over a close matrix.
+
+    Args:
+        closes (np.ndarray): Dates x symbols prices, e.g. from `load_closes`.
+        strategy (str or callable): A name from `STRATEGIES`, or a strategy function.
+        params (dict, optional): Keyword arguments for the strategy.
+        funds (float, optional): Starting funds.
+
+    Returns:
+        dict: The output of `simulate` and `summarize`, plus the `params` used.
+
+    Raises:
+        ValueError: If the strategy or its parameters are invalid.
+    """
+    params = dict(params or {})
+    weights = resolve_strategy(strategy)(closes, **params)
+    if weights.shape != closes.shape:
+        raise ValueError(f"Strategy returned weights of shape {weights.shape}, expected {closes.shape}.")
+    result = simulate(closes, weights, funds)
+    return {**result, **summarize(result["equity"]), "params": params}
+
+
+def _summary_row(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Drops the per-date arrays from a backtest result."""
+    return {"params": result["params"], "total_return": result["total_return"],
+            "max_drawdown": result["max_drawdown"], "volatility": result["volatility"],
+            "trades": result["trades"], "final_equity": float(result["equity"][-1]) if len(result["equity"]) else 0.0}
+
+
+# Per-process state of sweep workers, set once by the pool initializer so the close
+# matrix is sent to each worker once rather than with every task.
+_sweep_closes: Optional[np.ndarray] = None
+_sweep_funds: float = 0.0
+
+
+def _init_sweep_worker(closes: np.ndarray, funds: float) -> None:
+    global _sweep_closes, _sweep_funds
+    _sweep_closes, _sweep_funds = closes, funds
+
+
+def _run_sweep_task(task: Tuple[Union[str, Strategy], Dict[str, Any]]) -> Dict[str, Any]:
+    strategy, params = task
+    return _summary_row(backtest(_sweep_closes, strategy, params, _sweep_funds))
+
+
+def sweep(closes: np.ndarray, strategy: Union[str, Strategy], grid: Dict[str, List[Any]],
+          funds: float = 10000.0, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Backtests every combination of parameters in a grid, in parallel across processes.
+
+    Combinations are independent, so they are spread over a process pool; each worker
+    receives the close matrix once. Strategies given as functions must be defined at
+    module level so they can be sent to the workers.
+
+    Args:
+        closes (np.ndarray): Dates x symbols prices, e.g. from `load_closes`.
+        strategy (str or callable): A name from `STRATEGIES`, or a strategy function.
+        grid (Dict[str, List]): Candidate values per strategy parameter.
+        funds (float, optional): Starting funds.
+        workers (int, optional): Worker processes; defaults to the CPU count. 1 runs in
+            this process.
+
+    Returns:
+        List[dict]: One summary per combination, in grid order, with its `params`,
+        `total_return`, `max_drawdown`, `volatility`, `trades` and `final_equity`.
+
+    Raises:
+        ValueError: If the strategy or a parameter combination is invalid.
+    """
+    resolve_strategy(strategy)
+    names = list(grid)
+    tasks = [(strategy, dict(zip(names, values))) for values in itertools.product(*(grid[name] for name in names))]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    logger.info("Sweeping %d parameter combinations over %d worker(s).", len(tasks), max(workers, 1))
+
+    if workers <= 1:
+        return [_summary_row(backtest(closes, strategy, params, funds)) for _, params in tasks]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_sweep_worker,
+                             initargs=(closes, funds)) as pool:
+        return list(pool.map(_run_sweep_task, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
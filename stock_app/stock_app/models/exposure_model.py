@@ -0,0 +1,120 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from stock_app.models.stock_model import Stock
+from stock_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+DIMENSIONS = ("sector", "industry", "market_cap")
+# Lower bounds of the market-cap buckets in dollars, largest first.
+MARKET_CAP_BUCKETS = ((200e9, "mega"), (10e9, "large"), (2e9, "mid"), (300e6, "small"), (0.0, "micro"))
+UNKNOWN = "Unknown"
+
+
+def market_cap_bucket(market_cap_value: Optional[float]) -> str:
+    """
+    Args:
+        market_cap_value (float, optional): Market capitalization in dollars, or None if unknown.
+
+    Returns:
+        str: "mega", "large", "mid", "small", "micro", or "Unknown".
+    """
+    if market_cap_value is None:
+        return UNKNOWN
+    return next(bucket for bound, bucket in MARKET_CAP_BUCKETS if market_cap_value >= bound)
+
+
+class ExposureTotals:
+    """
+    Position values summed per sector, industry and market-cap bucket.
+
+    Totals are adjusted by each position's change in value whenever it is bought, sold,
+    repriced or removed, so reading the exposure costs O(groups) rather than a regroup of
+    every holding. A group is dropped when its last position leaves, which also discards
+    any rounding drift left in its total.
+
+    Attributes:
+        total (float): Value of all positions.
+    """
+
+    def __init__(self):
+        self.total = 0.0
+        self._positions: Dict[str, Tuple[float, Tuple[str, ...]]] = {}
+        self._values: Dict[str, Dict[str, float]] = {dimension: {} for dimension in DIMENSIONS}
+        self._counts: Dict[str, Dict[str, int]] = {dimension: {} for dimension in DIMENSIONS}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    @staticmethod
+    def groups(stock: Stock) -> Tuple[str, ...]:
+        """
+        Args:
+            stock (Stock): A position.
+
+        Returns:
+            tuple: The position's sector, industry and market-cap bucket.
+        """
+        return stock.sector or UNKNOWN, stock.industry or UNKNOWN, market_cap_bucket(stock.market_cap_value)
+
+    def update(self, symbol: str, stock: Stock) -> None:
+        """
+        Sets a position's contribution from its current quantity and price. Positions
+        without shares contribute nothing.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            stock (Stock): The position.
+        """
+        self.remove(symbol)
+        if stock.quantity <= 0:
+            return
+        value = stock.current_price * stock.quantity
+        groups = self.groups(stock)
+        self._positions[symbol] = (value, groups)
+        self.total += value
+        for dimension, group in zip(DIMENSIONS, groups):
+            values, counts = self._values[dimension], self._counts[dimension]
+            values[group] = values.get(group, 0.0) + value
+            counts[group] = counts.get(group, 0) + 1
+
+    def remove(self, symbol: str) -> None:
+        """
+        Drops a position's contribution, if any.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+        """
+        position = self._positions.pop(symbol, None)
+        if position is None:
+            return
+        value, groups = position
+        self.total = self.total - value if self._positions else 0.0
+        for dimension, group in zip(DIMENSIONS, groups):
+            values, counts = self._values[dimension], self._counts[dimension]
+            counts[group] -= 1
+            if counts[group]:
+                values[group] -= value
+            else:
+                del counts[group], values[group]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: The `total_value`, and per dimension the groups with their `value`,
+            `weight` in the total and number of `positions`, largest first.
+        """
+        exposure: Dict[str, Any] = {"total_value": self.total}
+        for dimension in DIMENSIONS:
+            counts = self._counts[dimension]
+            rows: List[Dict[str, Any]] = [
+                {"group": group, "value": value, "weight": value / self.total if self.total else 0.0,
+                 "positions": counts[group]}
+                for group, value in self._values[dimension].items()
+            ]
+            rows.sort(key=lambda row: (-row["value"], row["group"]))
+            exposure[dimension] = rows
+        return exposure
@@ -0,0 +1,182 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from alpha_vantage.timeseries import TimeSeries
+
+from stock_app.models.stock_model import PriceHistory, daily_bar_columns, fetch_daily_bars
+from stock_app.utils.cache import StaleWhileRevalidateCache
+from stock_app.utils.logger import configure_logger
+from stock_app.utils.rate_limiter import RateLimiter
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class HistoryStore:
+    """
+    Shared store of daily price histories serving single- and multi-symbol requests.
+
+    Raw series live in the market-data cache under the same keys the single-symbol
+    history endpoint uses, so either endpoint warms the other. Missing series are
+    fetched concurrently, every upstream call passing through the shared rate limiter,
+    and parsed columns are memoized per fetched series.
+
+    Attributes:
+        ts (TimeSeries): TimeSeries object used to fetch daily series.
+        cache (StaleWhileRevalidateCache): Cache holding the raw series.
+        limiter (RateLimiter): Limiter for upstream calls.
+        fresh_for (float): Seconds a series is served without revalidation.
+        max_stale (float): Maximum age in seconds a series is served at.
+        workers (int): Maximum concurrent upstream fetches.
+    """
+
+    FIELDS = PriceHistory.PRICE_FIELDS
+    JOINS = ("inner", "outer")
+
+    def __init__(self, ts: TimeSeries, cache: StaleWhileRevalidateCache, limiter: RateLimiter,
+                 fresh_for: float, max_stale: float, workers: int = 4, max_columns: int = 256):
+        self.ts = ts
+        self.cache = cache
+        self.limiter = limiter
+        self.fresh_for = fresh_for
+        self.max_stale = max_stale
+        self.workers = workers
+        self.max_columns = max_columns
+        self._lock = threading.Lock()
+        self._columns: "OrderedDict[Tuple[str, str], Tuple[float, PriceHistory]]" = OrderedDict()
+
+    def loader(self, symbol: str, size: str):
+        """
+        Returns a cache loader fetching a raw series through the rate limiter.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            size (str): 'compact' or 'full'.
+        """
+        def load() -> Dict[str, Dict[str, str]]:
+            self.limiter.acquire()
+            return fetch_daily_bars(symbol, self.ts, size)
+        return load
+
+    def raw(self, symbol: str, size: str) -> Tuple[Dict[str, Dict[str, str]], float]:
+        """
+        Args:
+            symbol (str): The stock ticker symbol.
+            size (str): 'compact' or 'full'.
+
+        Returns:
+            tuple: The raw series and the time it was fetched.
+
+        Raises:
+            ValueError: If the series cannot be fetched and nothing servable is cached.
+        """
+        symbol = symbol.upper()
+        return self.cache.get_entry(('history', symbol, size), self.loader(symbol, size),
+                                    self.fresh_for, self.max_stale)
+
+    def columns(self, symbol: str, size: str) -> PriceHistory:
+        """
+        Args:
+            symbol (str): The stock ticker symbol.
+            size (str): 'compact' or 'full'.
+
+        Returns:
+            PriceHistory: The series parsed into columns, newest first.
+        """
+        symbol = symbol.upper()
+        bars, fetched_at = self.raw(symbol, size)
+        key = (symbol, size)
+        with self._lock:
+            memo = self._columns.get(key)
+            if memo is not None and memo[0] == fetched_at:
+                self._columns.move_to_end(key)
+                return memo[1]
+        history = daily_bar_columns(symbol, bars)
+        with self._lock:
+            self._columns[key] = (fetched_at, history)
+            self._columns.move_to_end(key)
+            while len(self._columns) > self.max_columns:
+                self._columns.popitem(last=False)
+        return history
+
+    def load_many(self, symbols: List[str], size: str) -> Tuple[Dict[str, PriceHistory], Dict[str, str]]:
+        """
+        Loads several series, fetching the missing ones concurrently.
+
+        Args:
+            symbols (List[str]): The stock ticker symbols.
+            size (str): 'compact' or 'full'.
+
+        Returns:
+            tuple: Histories by symbol, and error messages for symbols that could not be loaded.
+        """
+        def load(symbol: str) -> Tuple[Optional[PriceHistory], Optional[str]]:
+            try:
+                return self.columns(symbol, size), None
+            except Exception as e:
+                logger.error("Error loading history for %s: %s", symbol, e)
+                return None, str(e)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(symbols)))) as pool:
+            results = dict(zip(symbols, pool.map(load, symbols)))
+        histories = {symbol: history for symbol, (history, _) in results.items() if history is not None}
+        errors = {symbol: error for symbol, (_, error) in results.items() if error is not None}
+        return histories, errors
+
+    def matrix(self, symbols: List[str], size: str, field: str = "close", join: str = "inner") -> Dict[str, Any]:
+        """
+        Loads several series and aligns one price field on a common date index.
+
+        Args:
+            symbols (List[str]): The stock ticker symbols; duplicates are ignored.
+            size (str): 'compact' or 'full'.
+            field (str, optional): One of open, high, low, close.
+            join (str, optional): "inner" keeps dates every loaded symbol has; "outer" keeps
+                all dates and fills gaps with None.
+
+        Returns:
+            dict: `symbols` (columns, in request order, loaded ones only), `dates` (rows,
+            oldest first), `values` (one row of prices per date) and `errors` by symbol.
+
+        Raises:
+            ValueError: If no symbols are given, or the field or join is unknown.
+        """
+        if field not in self.FIELDS:
+            raise ValueError(f"Unknown field: {field}. Expected one of {', '.join(self.FIELDS)}.")
+        if join not in self.JOINS:
+            raise ValueError(f"Unknown join: {join}. Expected one of {', '.join(self.JOINS)}.")
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols if symbol))
+        if not symbols:
+            raise ValueError("At least one symbol is required.")
+
+        histories, errors = self.load_many(symbols, size)
+        loaded = [symbol for symbol in symbols if symbol in histories]
+        positions = {symbol: {date: i for i, date in enumerate(histories[symbol].date)} for symbol in loaded}
+
+        if not loaded:
+            dates = []
+        elif join == "inner":
+            common = set(positions[loaded[0]])
+            for symbol in loaded[1:]:
+                common.intersection_update(positions[symbol])
+            dates = sorted(common)
+        else:
+            dates = sorted(set().union(*positions.values()))
+
+        columns = []
+        for symbol in loaded:
+            prices = getattr(histories[symbol], field)
+            index = positions[symbol]
+            columns.append([prices[index[date]] if date in index else None for date in dates])
+
+        return {
+            "symbols": loaded,
+            "field": field,
+            "dates": dates,
+            "values": [list(row) for row in zip(*columns)] if columns else [],
+            "errors": errors,
+        }
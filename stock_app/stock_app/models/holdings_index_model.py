@@ -0,0 +1,101 @@
+import logging
+import threading
+import weakref
+from typing import Dict, List
+
+from stock_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class HoldingsIndex:
+    """
+    Reverse index from ticker symbol to the portfolios holding or watching it.
+
+    Portfolios register and unregister themselves as symbols enter and leave their
+    holdings, so propagating a quote or answering "who holds X" touches only the
+    affected portfolios instead of scanning all of them. Symbols are indexed in upper
+    case, whatever case they are given in. Portfolios are referenced weakly and drop out
+    of the index once garbage collected.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._holders: Dict[str, "weakref.WeakSet"] = {}
+
+    def add(self, symbol: str, portfolio) -> None:
+        """
+        Records that a portfolio holds a symbol.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            portfolio (PortfolioModel): The holding portfolio.
+        """
+        symbol = symbol.upper()
+        with self._lock:
+            holders = self._holders.get(symbol)
+            if holders is None:
+                holders = self._holders[symbol] = weakref.WeakSet()
+            holders.add(portfolio)
+
+    def remove(self, symbol: str, portfolio) -> None:
+        """
+        Records that a portfolio no longer holds a symbol.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            portfolio (PortfolioModel): The portfolio.
+        """
+        symbol = symbol.upper()
+        with self._lock:
+            holders = self._holders.get(symbol)
+            if holders is None:
+                return
+            holders.discard(portfolio)
+            if not holders:
+                del self._holders[symbol]
+
+    def holders(self, symbol: str) -> List:
+        """
+        Args:
+            symbol (str): The stock ticker symbol.
+
+        Returns:
+            List[PortfolioModel]: Portfolios currently holding or watching the symbol.
+        """
+        symbol = symbol.upper()
+        with self._lock:
+            return list(self._holders.get(symbol, ()))
+
+    def holder_counts(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: Number of portfolios holding or watching each symbol.
+        """
+        with self._lock:
+            counts = {symbol: len(holders) for symbol, holders in self._holders.items()}
+        return {symbol: count for symbol, count in counts.items() if count}
+
+    def apply_quote(self, symbol: str, price: float) -> int:
+        """
+        Propagates a new price to every position in the symbol.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            price (float): The latest price.
+
+        Returns:
+            int: The number of positions updated.
+        """
+        updated = 0
+        for portfolio in self.holders(symbol):
+            if portfolio.apply_price(symbol, price):
+                updated += 1
+        logger.debug("Applied %s quote %.2f to %d positions.", symbol, price, updated)
+        return updated
+
+
+# Process-wide index shared by every PortfolioModel unless one is passed explicitly.
+holdings_index = HoldingsIndex()
@@ -0,0 +1,173 @@
+import base64
+import binascii
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from stock_app.models.stock_model import Stock
+from stock_app.utils.logger import configure_logger
+from stock_app.utils.sorted_index import SortedIndex
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# Weights are values over the portfolio's total, so they sort exactly like values.
+SORTS = ("value", "weight", "symbol")
+ORDERS = ("asc", "desc")
+DEFAULT_ORDERS = {"value": "desc", "weight": "desc", "symbol": "asc"}
+UNKNOWN_SECTOR = "Unknown"
+
+
+def encode_cursor(sort: str, sector: Optional[str], entry: Tuple[Any, str]) -> str:
+    """
+    Args:
+        sort (str): The sort the page was taken in.
+        sector (str, optional): The sector filter, if any.
+        entry (tuple): The (key, symbol) entry the page ended on.
+
+    Returns:
+        str: An opaque, URL-safe cursor for the next page.
+    """
+    payload = json.dumps([sort, sector, entry[0], entry[1]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, sort: str, sector: Optional[str]) -> Tuple[Any, str]:
+    """
+    Args:
+        cursor (str): A cursor from `encode_cursor`.
+        sort (str): The sort of the requested page.
+        sector (str, optional): The sector filter of the requested page.
+
+    Returns:
+        tuple: The (key, symbol) entry the previous page ended on.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort or filter.
+    """
+    try:
+        cursor_sort, cursor_sector, key, symbol = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError("Invalid cursor.")
+    if cursor_sort != sort or cursor_sector != sector:
+        raise ValueError("The cursor was issued for a different sort or sector.")
+    return key, symbol
+
+
+class HoldingsPages:
+    """
+    Holdings kept ordered by value and by symbol, overall and per sector, for paging.
+
+    Positions are re-keyed whenever they are bought, sold or repriced, so a page is a
+    bisect and a slice, O(log n + page size), instead of a sort of every holding. Total
+    value and cost basis are maintained alongside, so weights and portfolio totals do not
+    need a scan either.
+
+    Cursors are positional: a position whose value changes between two requests may be
+    skipped or repeated, as with any keyset pagination over live data.
+
+    Attributes:
+        total_value (float): Market value of all positions.
+        total_cost (float): Cost basis of all positions.
+    """
+
+    def __init__(self):
+        self.total_value = 0.0
+        self.total_cost = 0.0
+        self._positions: Dict[str, Tuple[float, float, str]] = {}
+        self._indexes: Dict[Tuple[str, Optional[str]], SortedIndex] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _index(self, sort: str, sector: Optional[str]) -> SortedIndex:
+        index = self._indexes.get((sort, sector))
+        if index is None:
+            index = self._indexes[(sort, sector)] = SortedIndex()
+        return index
+
+    def update(self, symbol: str, stock: Stock) -> None:
+        """
+        Sets a position's sort keys and contribution to the totals from its current state.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            stock (Stock): The position.
+        """
+        previous = self._positions.get(symbol)
+        value, cost, sector = stock.current_price * stock.quantity, stock.cost_basis, stock.sector or UNKNOWN_SECTOR
+        if previous is not None:
+            if previous[2] != sector:
+                self.remove(symbol)
+                previous = None
+            else:
+                self.total_value -= previous[0]
+                self.total_cost -= previous[1]
+        self._positions[symbol] = (value, cost, sector)
+        self.total_value += value
+        self.total_cost += cost
+        for scope in (None, sector):
+            self._index("value", scope).add(value, symbol)
+            if previous is None:
+                self._index("symbol", scope).add(symbol, symbol)
+
+    def remove(self, symbol: str) -> None:
+        """
+        Drops a position, if present.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+        """
+        position = self._positions.pop(symbol, None)
+        if position is None:
+            return
+        value, cost, sector = position
+        if self._positions:
+            self.total_value -= value
+            self.total_cost -= cost
+        else:
+            self.total_value = self.total_cost = 0.0
+        for scope in (None, sector):
+            for sort in ("value", "symbol"):
+                index = self._index(sort, scope)
+                index.remove(symbol)
+                if not index and scope is not None:
+                    del self._indexes[(sort, scope)]
+
+    def page(self, sort: str = "value", order: Optional[str] = None, sector: Optional[str] = None,
+             limit: int = 50, cursor: Optional[str] = None) -> Tuple[List[str], Optional[str], int]:
+        """
+        Args:
+            sort (str, optional): "value", "weight" or "symbol".
+            order (str, optional): "asc" or "desc"; defaults to descending for value and weight.
+            sector (str, optional): Only positions in this sector.
+            limit (int, optional): Maximum number of positions.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: The page's symbols, the cursor of the next page (None on the last page),
+            and the number of positions matching the filter.
+
+        Raises:
+            ValueError: If the sort, order, limit or cursor is invalid.
+        """
+        if sort not in SORTS:
+            raise ValueError(f"Unknown sort: {sort}. Expected one of {', '.join(SORTS)}.")
+        order = order or DEFAULT_ORDERS[sort]
+        if order not in ORDERS:
+            raise ValueError(f"Unknown order: {order}. Expected one of {', '.join(ORDERS)}.")
+        if limit < 1:
+            raise ValueError("Limit must be at least 1.")
+        key_sort = "symbol" if sort == "symbol" else "value"
+        # The cursor also pins the direction, so a page cannot be continued in the other one.
+        cursor_sort = f"{sort}-{order}"
+        after = decode_cursor(cursor, cursor_sort, sector) if cursor else None
+
+        index = self._indexes.get((key_sort, sector))
+        if index is None:
+            return [], None, 0
+        # One extra entry tells whether another page follows.
+        entries = index.page(limit + 1, after, reverse=order == "desc")
+        next_cursor = encode_cursor(cursor_sort, sector, entries[limit - 1]) if len(entries) > limit else None
+        return [symbol for _, symbol in entries[:limit]], next_cursor, len(index)
@@ -1,5 +1,7 @@
 import logging
-from typing import Any, List
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List
 
 from stock_app.clients.mongo_client import sessions_collection
 from stock_app.utils.logger import configure_logger
@@ -11,12 +13,59 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+def stock_document(stock: Stock) -> Dict[str, Any]:
+    """
+    Args:
+        stock (Stock): A position.
+
+    Returns:
+        dict: The position as saved in a session, with its purchase lots and realized P&L.
+    """
+    return {
+        "symbol": stock.symbol,
+        "name": stock.name,
+        "current_price": stock.current_price,
+        "description": stock.description,
+        "sector": stock.sector,
+        "industry": stock.industry,
+        "market_cap": stock.market_cap,
+        "market_cap_value": stock.market_cap_value,
+        "quantity": stock.quantity,
+        "lots": [list(lot) for lot in stock.lots],
+        "realized_pnl": stock.realized_pnl,
+    }
+
+
+def stock_from_document(stock_data: Dict[str, Any]) -> Stock:
+    """
+    Args:
+        stock_data (dict): A position saved by `stock_document`, or by an older version
+            without lots or realized P&L.
+
+    Returns:
+        Stock: The position.
+    """
+    return Stock(
+        symbol=stock_data["symbol"],
+        name=stock_data["name"],
+        current_price=stock_data["current_price"],
+        description=stock_data["description"],
+        sector=stock_data["sector"],
+        industry=stock_data["industry"],
+        market_cap=stock_data["market_cap"],
+        quantity=stock_data["quantity"],
+        lots=stock_data.get("lots", []),
+        realized_pnl=stock_data.get("realized_pnl", 0.0),
+    )
+
+
 def login_user(user_id: int, portfolio_model) -> None:
     """
     Logs in a user by loading their session data from MongoDB.
 
     If a session document exists for the given `user_id`, it loads the user's 
-    portfolio data (stock holdings and funds) into the provided `portfolio_model`. 
+    portfolio data (stock holdings with their purchase lots, funds, realized P&L
+    and trade journal) into the provided `portfolio_model`. 
     If no session is found, a new session document is created in MongoDB with 
     an empty stock holdings list and zero funds.
 
@@ -28,6 +77,7 @@ def login_user(user_id: int, portfolio_model) -> None:
         ValueError: If an error occurs while interacting with MongoDB.
     """
     logger.info("Attempting to log in user with ID %d.", user_id)
+    portfolio_model.userID = user_id
     session = sessions_collection.find_one({"user_id": user_id})
 
     if session:
@@ -37,35 +87,30 @@ def login_user(user_id: int, portfolio_model) -> None:
         funds = session.get("funds", 0.0)
         portfolio_model.profile_charge_funds(funds)
 
-        for symbol, stock_data in session.get("stock_holdings", {}):
+        for symbol, stock_data in session.get("stock_holdings", {}).items():
             logger.debug("Preparing stock: %s (%s)", symbol, stock_data)
 
-            stock = Stock(
-                symbol=stock_data["symbol"],
-                name=stock_data["name"],
-                current_price=stock_data["current_price"],
-                description=stock_data["description"],
-                sector=stock_data["sector"],
-                industry=stock_data["industry"],
-                market_cap=stock_data["market_cap"],
-                quantity=stock_data["quantity"],
-            )
-            
-            portfolio_model.load_stock(stock)
-        
+            portfolio_model.load_stock(stock_from_document(stock_data))
+
+        # Restoring funds above is not a deposit; the saved journal replaces what it recorded.
+        portfolio_model.load_journal(session.get("journal", []))
+        portfolio_model.load_realized_pnl(session.get("realized_pnl", 0.0))
 
         logger.info("Stocks successfully loaded for user ID %d.", user_id)
     else:
         logger.info("No session found for user ID %d. Creating a new session with empty stock holding list.", user_id)
-        sessions_collection.insert_one({"user_id": user_id, "stock_holdings": {}, "funds": 0.0})
+        sessions_collection.insert_one({"user_id": user_id, "stock_holdings": {}, "funds": 0.0,
+                                        "held_symbols": [], "updated_at": time.time()})
         logger.info("New session created for user ID %d.", user_id)
 
 def logout_user(user_id: int, portfolio_model) -> None:
     """
     Logs out a user by saving their portfolio data to MongoDB.
 
-    Retrieves the user's current portfolio (stocks and funds) from the 
-    `portfolio_model` and updates the corresponding MongoDB session document. 
+    Retrieves the user's current portfolio (stocks with their purchase lots, funds,
+    realized P&L and trade journal) from the 
+    `portfolio_model` and updates the corresponding MongoDB session document,
+    along with the symbols held and the time of the update for the admin analytics.
     Clears the user's portfolio in `portfolio_model` after saving.
 
     Args:
@@ -79,21 +124,13 @@ def logout_user(user_id: int, portfolio_model) -> None:
 
     stocks_data = portfolio_model.get_stock_holdings()
 
-    stocks_dict = {
-        symbol: {
-            "symbol": stock.symbol,
-            "name": stock.name,
-            "current_price": stock.current_price,
-            "description": stock.description,
-            "sector": stock.sector,
-            "industry": stock.industry,
-            "market_cap": stock.market_cap,
-            "quantity": stock.quantity,
-        }
-        for symbol, stock in stocks_data
-    }
+    stocks_dict = {symbol: stock_document(stock) for symbol, stock in stocks_data.items()}
 
+    # Indexed for the cross-user analytics, which find holders by upper-case symbol without reading the holdings.
+    held_symbols = sorted({symbol.upper() for symbol, stock in stocks_data.items() if stock.quantity > 0})
     funds = portfolio_model.get_funds()
+    journal = [asdict(entry) for entry in portfolio_model.get_journal()]
+    realized_pnl = portfolio_model.get_realized_pnl()
 
     logger.debug("Serialized stock holdings for user ID %d: %s", user_id, stocks_dict)
     logger.debug("Serialized funds for user ID %d: %f", user_id, funds)
@@ -103,7 +140,11 @@ def logout_user(user_id: int, portfolio_model) -> None:
         {
             "$set": {
                 "stock_holdings": stocks_dict,
-                "funds": funds
+                "funds": funds,
+                "journal": journal,
+                "realized_pnl": realized_pnl,
+                "held_symbols": held_symbols,
+                "updated_at": time.time(),
             }
         },
         upsert=False
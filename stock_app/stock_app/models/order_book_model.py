@@ -0,0 +1,276 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from stock_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class PriceMovedError(ValueError):
+    """Raised by an executor when the fill price no longer crosses the order's threshold."""
+
+
+@dataclass
+class StandingOrder:
+    """Represents a limit order or price alert waiting for its threshold.
+
+    Attributes:
+        order_id (int): Identifier assigned by the book.
+        user_id (int): The user who placed it.
+        symbol (str): The stock ticker symbol.
+        kind (str): "buy" or "sell" to trade `quantity` shares, or "alert" to only notify.
+        direction (str): "below" triggers at a price at or below `threshold`, "above" at or above it.
+        threshold (float): The trigger price.
+        quantity (int): Shares to trade; 0 for alerts.
+        created_at (float): Time the order was placed.
+        status (str): "open", "triggered", "executed", "failed" or "cancelled".
+        triggered_price (float, optional): The quote that triggered it.
+        triggered_at (float, optional): Time it was triggered.
+        error (str, optional): Why the execution failed.
+    """
+    order_id: int
+    user_id: int
+    symbol: str
+    kind: str
+    direction: str
+    threshold: float
+    quantity: int
+    created_at: float
+    status: str = "open"
+    triggered_price: Optional[float] = None
+    triggered_at: Optional[float] = None
+    error: Optional[str] = None
+
+    def crossed_by(self, price: float) -> bool:
+        """
+        Args:
+            price (float): A quote or fill price.
+
+        Returns:
+            bool: True if the price is at or beyond the threshold in the order's direction.
+        """
+        return price <= self.threshold if self.direction == "below" else price >= self.threshold
+
+
+class OrderBook:
+    """
+    Standing limit orders and price alerts, indexed by symbol and threshold.
+
+    Each symbol has two heaps: orders triggering at or below their threshold, highest
+    threshold on top, and orders triggering at or above it, lowest on top. A quote only
+    looks at the tops, so it costs O(1) when nothing triggers and O(log n) per triggered
+    order otherwise, however many orders are standing. Cancelled orders are dropped lazily
+    when they reach the top, and a symbol's heaps are rebuilt once most of their entries
+    are cancelled.
+
+    Triggered trades are executed outside the lock through `executor`, a callable taking
+    the order and the triggering price. The executor fills at a fresh quote and raises
+    PriceMovedError if that quote no longer crosses the threshold; the order is then put
+    back in the book. Any other exception marks the order failed.
+
+    The book lives in the process that created it and is not persisted: orders are lost
+    on restart, and with several workers each serves, cancels and triggers only the
+    orders placed on it, even when the portfolio itself is shared through Redis.
+
+    Attributes:
+        executor (Callable[[StandingOrder, float], None]): Executes triggered buy and sell orders.
+        max_finished (int): Finished orders kept for reporting; older ones are forgotten.
+    """
+
+    KINDS = ("buy", "sell", "alert")
+    DIRECTIONS = ("below", "above")
+    # Direction a trade triggers in by default: buy on a dip, sell on a rise.
+    DEFAULT_DIRECTIONS = {"buy": "below", "sell": "above"}
+
+    def __init__(self, executor: Callable[[StandingOrder, float], None], max_finished: int = 1000):
+        self.executor = executor
+        self.max_finished = max_finished
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._open: Dict[int, StandingOrder] = {}
+        self._finished: "OrderedDict[int, StandingOrder]" = OrderedDict()
+        # symbol -> direction -> heap of (key, order_id); keys are negated thresholds for "below".
+        self._heaps: Dict[str, Dict[str, List[Tuple[float, int]]]] = {}
+        self._stale: Dict[str, int] = {}
+
+    def place(self, user_id: int, symbol: str, kind: str, threshold: float, quantity: int = 0,
+              direction: Optional[str] = None) -> StandingOrder:
+        """
+        Adds a standing order to the book.
+
+        Args:
+            user_id (int): The user placing it.
+            symbol (str): The stock ticker symbol.
+            kind (str): "buy", "sell" or "alert".
+            threshold (float): The trigger price.
+            quantity (int, optional): Shares to trade; ignored for alerts.
+            direction (str, optional): "below" or "above"; required for alerts, and defaults to
+                "below" for buys and "above" for sells.
+
+        Returns:
+            StandingOrder: The placed order.
+
+        Raises:
+            ValueError: If the kind, direction, threshold or quantity is invalid.
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown order kind: {kind}. Expected one of {', '.join(self.KINDS)}.")
+        direction = direction or self.DEFAULT_DIRECTIONS.get(kind)
+        if direction not in self.DIRECTIONS:
+            raise ValueError(f"Direction must be one of {', '.join(self.DIRECTIONS)}.")
+        if threshold <= 0:
+            raise ValueError("Threshold must be positive.")
+        if kind == "alert":
+            quantity = 0
+        elif quantity < 1:
+            raise ValueError("Quantity must be at least 1.")
+
+        symbol = symbol.upper()
+        with self._lock:
+            order = StandingOrder(next(self._ids), user_id, symbol, kind, direction, float(threshold),
+                                  quantity, time.time())
+            self._open[order.order_id] = order
+            self._push(order)
+        logger.info("Placed %s order %d: %s %s %.2f.", kind, order.order_id, symbol, direction, threshold)
+        return order
+
+    def cancel(self, order_id: int, user_id: Optional[int] = None) -> StandingOrder:
+        """
+        Cancels an open order. Its heap entry is dropped lazily.
+
+        Args:
+            order_id (int): The order to cancel.
+            user_id (int, optional): If given, the order must belong to this user.
+
+        Returns:
+            StandingOrder: The cancelled order.
+
+        Raises:
+            ValueError: If no open order with this ID exists for the user.
+        """
+        with self._lock:
+            order = self._open.get(order_id)
+            if order is None or (user_id is not None and order.user_id != user_id):
+                raise ValueError(f"No open order with ID {order_id}.")
+            del self._open[order_id]
+            order.status = "cancelled"
+            self._finish(order)
+            self._stale[order.symbol] = self._stale.get(order.symbol, 0) + 1
+            self._compact(order.symbol)
+        logger.info("Cancelled order %d.", order_id)
+        return order
+
+    def orders(self, user_id: Optional[int] = None) -> List[StandingOrder]:
+        """
+        Args:
+            user_id (int, optional): Only return this user's orders.
+
+        Returns:
+            List[StandingOrder]: Open orders followed by recently finished ones, oldest first.
+        """
+        with self._lock:
+            orders = list(self._open.values()) + list(self._finished.values())
+        return [order for order in orders if user_id is None or order.user_id == user_id]
+
+    def symbol_counts(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: Number of open orders per symbol.
+        """
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for order in self._open.values():
+                counts[order.symbol] = counts.get(order.symbol, 0) + 1
+        return counts
+
+    def on_quote(self, symbol: str, price: float) -> List[StandingOrder]:
+        """
+        Triggers the orders crossed by a quote and executes the triggered trades.
+
+        Suitable as a listener for the price stream and the refresh scheduler.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            price (float): The latest price.
+
+        Returns:
+            List[StandingOrder]: The orders triggered by this quote.
+        """
+        symbol = symbol.upper()
+        triggered = []
+        with self._lock:
+            heaps = self._heaps.get(symbol)
+            if heaps is None:
+                return []
+            below, above = heaps["below"], heaps["above"]
+            while below and -below[0][0] >= price:
+                triggered.append(heapq.heappop(below)[1])
+            while above and above[0][0] <= price:
+                triggered.append(heapq.heappop(above)[1])
+            orders = []
+            for order_id in triggered:
+                order = self._open.pop(order_id, None)
+                if order is None:
+                    self._stale[symbol] -= 1
+                    continue
+                order.status, order.triggered_price, order.triggered_at = "triggered", price, time.time()
+                orders.append(order)
+            if not below and not above:
+                del self._heaps[symbol]
+                self._stale.pop(symbol, None)
+
+        for order in orders:
+            self._execute(order, price)
+        return orders
+
+    def _push(self, order: StandingOrder) -> None:
+        """Adds an open order to its symbol's heap; callers hold the lock."""
+        heaps = self._heaps.setdefault(order.symbol, {"below": [], "above": []})
+        key = -order.threshold if order.direction == "below" else order.threshold
+        heapq.heappush(heaps[order.direction], (key, order.order_id))
+
+    def _execute(self, order: StandingOrder, price: float) -> None:
+        if order.kind != "alert":
+            try:
+                self.executor(order, price)
+                order.status = "executed"
+                logger.info("Executed %s order %d for %s at %.2f.", order.kind, order.order_id, order.symbol, price)
+            except PriceMovedError as e:
+                logger.info("Order %d for %s put back: %s", order.order_id, order.symbol, e)
+                with self._lock:
+                    order.status, order.triggered_price, order.triggered_at = "open", None, None
+                    self._open[order.order_id] = order
+                    self._push(order)
+                return
+            except Exception as e:
+                order.status, order.error = "failed", str(e)
+                logger.error("Order %d for %s failed: %s", order.order_id, order.symbol, e)
+        else:
+            logger.info("Alert %d: %s is %s %.2f at %.2f.", order.order_id, order.symbol,
+                        order.direction, order.threshold, price)
+        with self._lock:
+            self._finish(order)
+
+    def _finish(self, order: StandingOrder) -> None:
+        """Keeps a finished order for reporting; callers hold the lock."""
+        self._finished[order.order_id] = order
+        while len(self._finished) > self.max_finished:
+            self._finished.popitem(last=False)
+
+    def _compact(self, symbol: str) -> None:
+        """Rebuilds a symbol's heaps once most entries are cancelled; callers hold the lock."""
+        heaps = self._heaps.get(symbol)
+        if heaps is None or 2 * self._stale[symbol] <= len(heaps["below"]) + len(heaps["above"]):
+            return
+        for direction, heap in heaps.items():
+            heaps[direction] = [entry for entry in heap if entry[1] in self._open]
+            heapq.heapify(heaps[direction])
+        self._stale[symbol] = 0
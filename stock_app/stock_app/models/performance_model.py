@@ -0,0 +1,177 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from stock_app.models.history_store_model import HistoryStore
+from stock_app.models.portfolio_model import JournalEntry, PortfolioModel
+from stock_app.models.stock_model import PriceHistory
+from stock_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def fill_gaps(prices: np.ndarray) -> np.ndarray:
+    """
+    Fills missing (NaN) prices with the last known price of the same column, and
+    leading gaps with the first known one.
+
+    Args:
+        prices (np.ndarray): Dates x symbols price matrix.
+
+    Returns:
+        np.ndarray: The filled matrix; columns without any price stay NaN.
+    """
+    if prices.size == 0:
+        return prices
+    rows = np.arange(prices.shape[0])[:, None]
+    known = ~np.isnan(prices)
+    last = np.maximum.accumulate(np.where(known, rows, 0), axis=0)
+    filled = np.take_along_axis(prices, last, axis=0)
+    first = np.where(known.any(axis=0), known.argmax(axis=0), 0)
+    leading = rows < first
+    return np.where(leading, prices[first, np.arange(prices.shape[1])], filled)
+
+
+def align_closes(histories: List[PriceHistory]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Aligns the closing prices of several histories on the union of their dates.
+
+    Works directly on the histories' day and close buffers, without per-row objects.
+
+    Args:
+        histories (List[PriceHistory]): The histories, one per column.
+
+    Returns:
+        tuple: The dates (datetime64[D], oldest first) and the dates x histories close
+        matrix, NaN where a history has no bar.
+    """
+    days = [np.frombuffer(history.day, dtype=np.intc) for history in histories]
+    index = np.unique(np.concatenate(days)) if days else np.empty(0, dtype=np.intc)
+    closes = np.full((len(index), len(histories)), np.nan)
+    for j, (history_days, history) in enumerate(zip(days, histories)):
+        closes[np.searchsorted(index, history_days), j] = np.frombuffer(history.close, dtype=np.float64)
+    return index.astype("datetime64[D]"), closes
+
+
+def compute_performance(days: np.ndarray, symbols: List[str], closes: np.ndarray,
+                        holdings: Dict[str, int], funds: float, journal: List[JournalEntry]) -> Dict[str, Any]:
+    """
+    Computes the daily equity curve and risk figures of a portfolio.
+
+    Positions and cash before the first journal entry are reconstructed by reversing the
+    journal from the current holdings and funds; positions not explained by the journal
+    are assumed held over the whole period. Each entry takes effect at the close of the
+    first date on or after it.
+
+    Args:
+        days (np.ndarray): Dates as datetime64[D], oldest first.
+        symbols (List[str]): Column symbols of `closes`.
+        closes (np.ndarray): Dates x symbols closing prices; NaN where unknown.
+        holdings (Dict[str, int]): Current shares per symbol.
+        funds (float): Current funds.
+        journal (List[JournalEntry]): Trades and deposits, oldest first.
+
+    Returns:
+        dict: Daily ISO `dates`, `equity`, `returns` and `drawdown`, plus `total_return`,
+        `max_drawdown` and annualized `volatility`.
+    """
+    n_dates, n_symbols = len(days), len(symbols)
+    if n_dates == 0:
+        return {"dates": [], "equity": [], "returns": [], "drawdown": [],
+                "total_return": 0.0, "max_drawdown": 0.0, "volatility": 0.0}
+
+    column = {symbol: j for j, symbol in enumerate(symbols)}
+
+    # Per-date changes to shares, cash and external deposits, from the journal.
+    share_changes = np.zeros((n_dates, n_symbols))
+    cash_changes = np.zeros(n_dates)
+    deposits = np.zeros(n_dates)
+    if journal:
+        stamps = np.array([entry.timestamp for entry in journal]).astype("datetime64[s]").astype("datetime64[D]")
+        rows = np.minimum(np.searchsorted(days, stamps, side="left"), n_dates - 1)
+        cash = np.array([entry.cash for entry in journal])
+        np.add.at(cash_changes, rows, cash)
+        is_deposit = np.array([entry.action == "deposit" for entry in journal])
+        np.add.at(deposits, rows[is_deposit], cash[is_deposit])
+        traded = [(row, column[entry.symbol], entry.share_delta)
+                  for row, entry in zip(rows, journal) if entry.share_delta and entry.symbol in column]
+        if traded:
+            trade_rows, trade_columns, deltas = map(np.array, zip(*traded))
+            np.add.at(share_changes, (trade_rows, trade_columns), deltas)
+
+    current = np.array([holdings.get(symbol, 0) for symbol in symbols], dtype=float)
+    shares = current - share_changes.sum(axis=0) + np.cumsum(share_changes, axis=0)
+    cash_balance = funds - cash_changes.sum() + np.cumsum(cash_changes)
+
+    prices = np.nan_to_num(fill_gaps(closes), nan=0.0)
+    equity = cash_balance + (shares * prices).sum(axis=1)
+
+    # Time-weighted daily returns: deposits change the equity but are not performance.
+    previous = np.concatenate(([equity[0]], equity[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(previous > 0, (equity - deposits) / previous - 1.0, 0.0)
+    returns[0] = 0.0
+
+    growth = np.cumprod(1.0 + returns)
+    drawdown = growth / np.maximum.accumulate(growth) - 1.0
+    volatility = float(returns[1:].std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)) if n_dates > 2 else 0.0
+
+    return {
+        "dates": np.datetime_as_string(days).tolist(),
+        "equity": equity.tolist(),
+        "returns": returns.tolist(),
+        "drawdown": drawdown.tolist(),
+        "total_return": float(growth[-1] - 1.0),
+        "max_drawdown": float(drawdown.min()),
+        "volatility": volatility,
+    }
+
+
+def portfolio_performance(portfolio: PortfolioModel, store: HistoryStore, size: str = "compact",
+                          start: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Computes a portfolio's performance from its journal and the stored daily closes.
+
+    Args:
+        portfolio (PortfolioModel): The portfolio.
+        store (HistoryStore): Store serving aligned daily closes.
+        size (str, optional): History window to use, 'compact' (about 100 trading days) or 'full'.
+        start (str, optional): ISO date; earlier dates are dropped from the curve.
+
+    Returns:
+        dict: The output of `compute_performance`, plus the `symbols` involved.
+
+    Raises:
+        ValueError: If `start` is not an ISO date or a symbol's history cannot be loaded.
+    """
+    with portfolio.lock:
+        holdings = {symbol: stock.quantity for symbol, stock in portfolio.holding_stocks.items()}
+        funds = portfolio.funds
+        journal = list(portfolio.journal)
+    if start is not None:
+        try:
+            np.datetime64(start, "D")
+        except ValueError:
+            raise ValueError(f"Invalid start date: {start}. Expected YYYY-MM-DD.")
+
+    traded = {entry.symbol for entry in journal if entry.symbol}
+    symbols = sorted({symbol for symbol, quantity in holdings.items() if quantity > 0} | traded)
+    if not symbols:
+        return {**compute_performance(np.empty(0, dtype="datetime64[D]"), [], np.empty((0, 0)),
+                                      holdings, funds, journal), "symbols": []}
+
+    histories, errors = store.load_many(symbols, size)
+    if errors:
+        raise ValueError(f"Could not load history for: {', '.join(sorted(errors))}")
+    days, closes = align_closes([histories[symbol] for symbol in symbols])
+    if start is not None:
+        # Entries before the window still shape the opening state, via the reconstruction.
+        first = int(np.searchsorted(days, np.datetime64(start, "D")))
+        days, closes = days[first:], closes[first:]
+    logger.info("Computing performance over %d dates and %d symbols.", len(days), len(symbols))
+    return {**compute_performance(days, symbols, closes, holdings, funds, journal), "symbols": symbols}
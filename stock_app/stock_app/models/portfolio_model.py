@@ -1,18 +1,165 @@
 import logging
 import os
-from typing import List, Dict
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 
 from alpha_vantage.timeseries import TimeSeries
 from alpha_vantage.fundamentaldata import FundamentalData
+from stock_app.models.exposure_model import ExposureTotals
+from stock_app.models.holdings_index_model import HoldingsIndex, holdings_index
+from stock_app.models.holdings_page_model import HoldingsPages
 from stock_app.models.stock_model import Stock, lookup_stock, get_latest_price
 from stock_app.utils.logger import configure_logger
+from stock_app.utils.sorted_index import SortedIndex
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 load_dotenv()
 
+
+@dataclass
+class JournalEntry:
+    """One change to a portfolio's cash or shares, recorded as it is applied.
+
+    Attributes:
+        timestamp (float): When the change was applied, as returned by `time.time()`.
+        action (str): "buy", "sell" or "deposit".
+        symbol (str): The stock ticker symbol, or None for deposits.
+        quantity (int): Shares bought or sold; 0 for deposits.
+        price (float): Execution price per share; 0.0 for deposits.
+        cash (float): Signed change to the funds.
+    """
+    timestamp: float
+    action: str
+    symbol: Optional[str]
+    quantity: int
+    price: float
+    cash: float
+
+    @property
+    def share_delta(self) -> int:
+        """Signed change to the position in `symbol`."""
+        if self.action == "buy":
+            return self.quantity
+        if self.action == "sell":
+            return -self.quantity
+        return 0
+
+
+def compact_journal(entries: List[JournalEntry], limit: int) -> List[JournalEntry]:
+    """
+    Bounds a journal to `limit` entries while keeping what performance is computed from.
+
+    The newest half of the limit is kept as is. Older entries are merged into one entry per
+    day, action and symbol, with the summed shares and cash at their average price, which
+    leaves the daily equity curve unchanged. If the merged days still exceed a quarter of
+    the limit, the oldest are dropped; the curve before the first remaining entry is then
+    reconstructed from the current holdings, as for any portfolio with a partial journal.
+
+    Args:
+        entries (List[JournalEntry]): The journal, oldest first.
+        limit (int): Maximum number of entries.
+
+    Returns:
+        List[JournalEntry]: A new journal of at most three quarters of `limit` entries, or
+        `entries` itself if it is within the limit.
+    """
+    if len(entries) <= limit:
+        return entries
+    keep = limit // 2
+    recent = entries[len(entries) - keep:] if keep else []
+    merged: Dict[Tuple[int, str, Optional[str]], JournalEntry] = {}
+    for entry in entries[:len(entries) - keep]:
+        key = (int(entry.timestamp // 86400), entry.action, entry.symbol)
+        total = merged.get(key)
+        if total is None:
+            merged[key] = JournalEntry(entry.timestamp, entry.action, entry.symbol, entry.quantity, 0.0, entry.cash)
+        else:
+            total.quantity += entry.quantity
+            total.cash += entry.cash
+    older = sorted(merged.values(), key=lambda entry: entry.timestamp)
+    older = older[max(0, len(older) - limit // 4):]
+    for entry in older:
+        entry.price = abs(entry.cash) / entry.quantity if entry.quantity else 0.0
+    return older + recent
+
+
+class HoldingStocks(dict):
+    """
+    Symbol to Stock mapping that reports positions entering and leaving it to its portfolio.
+
+    Keeps the portfolio's indexes consistent even when the dict is mutated directly.
+    Replacing a symbol's Stock reports the old position as removed and the new one as added.
+    Symbols are keyed in upper case, as quotes, standing orders and saved sessions name
+    them, so a stock bought as "msft" is the same position as "MSFT".
+    """
+
+    def __init__(self, owner: "PortfolioModel", stocks: Dict[str, Stock]):
+        super().__init__()
+        self._owner = owner
+        self.update(stocks)
+
+    def __getitem__(self, symbol: str) -> Stock:
+        return dict.__getitem__(self, symbol.upper())
+
+    def __contains__(self, symbol) -> bool:
+        return isinstance(symbol, str) and dict.__contains__(self, symbol.upper())
+
+    def get(self, symbol: str, default: Stock = None):
+        return dict.get(self, symbol.upper(), default)
+
+    def __setitem__(self, symbol: str, stock: Stock) -> None:
+        symbol = symbol.upper()
+        old = dict.get(self, symbol)
+        dict.__setitem__(self, symbol, stock)
+        if old is not None:
+            self._owner._position_removed(symbol, old)
+        self._owner._position_added(symbol, stock)
+
+    def __delitem__(self, symbol: str) -> None:
+        symbol = symbol.upper()
+        stock = dict.pop(self, symbol)
+        self._owner._position_removed(symbol, stock)
+
+    def pop(self, symbol: str, *default):
+        symbol = symbol.upper()
+        if symbol not in self:
+            return dict.pop(self, symbol, *default)
+        stock = dict.pop(self, symbol)
+        self._owner._position_removed(symbol, stock)
+        return stock
+
+    def popitem(self):
+        symbol, stock = dict.popitem(self)
+        self._owner._position_removed(symbol, stock)
+        return symbol, stock
+
+    def setdefault(self, symbol: str, default: Stock = None):
+        if symbol not in self:
+            self[symbol] = default
+        return self[symbol]
+
+    def update(self, *args, **kwargs) -> None:
+        for symbol, stock in dict(*args, **kwargs).items():
+            self[symbol] = stock
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self) -> None:
+        positions = list(self.items())
+        dict.clear(self)
+        for symbol, stock in positions:
+            self._owner._position_removed(symbol, stock)
+
+
 class PortfolioModel:
     """
     Manages a user's stock portfolio.
@@ -26,8 +173,26 @@ class PortfolioModel:
         ts (TimeSeries): TimeSeries object for fetching stock price data.
         fd (FundamentalData): FundamentalData object for fetching company data.
         userID (str): User identifier.
-        holding_stocks (Dict[str, Stock]): Dictionary of stocks in the user's portfolio.
+        holding_stocks (Dict[str, Stock]): Dictionary of stocks in the user's portfolio, keyed by
+            upper-case symbol; every symbol in it is registered in `index`. Methods taking a
+            symbol accept it in any case.
+        index (HoldingsIndex): Reverse symbol-to-holders index the portfolio reports to.
+        exposure (ExposureTotals): Value of the holdings per sector, industry and market-cap
+            bucket, kept in step with every trade and price update.
+        market_caps (SortedIndex): Symbols of the positions with a known market cap, ordered by it.
+        pages (HoldingsPages): Positions ordered by value and symbol, overall and per sector,
+            with running totals, so pages of holdings are served without sorting.
         funds (float): Available funds in the portfolio.
+        realized_pnl (float): Gains realized by all sales, including those of positions
+            since removed.
+        cost_method (str): How sales are matched to purchase lots, "fifo" or "average".
+        journal (List[JournalEntry]): Trades and deposits since the portfolio was last cleared,
+            oldest first. Bounded by `journal_limit` through `compact_journal`.
+        journal_limit (int): Maximum number of journal entries.
+        version (int): Counter incremented on every change to funds or holdings.
+        modified_at (float): Time of the last change, as returned by `time.time()`.
+        lock (threading.RLock): Guards funds and holdings. Upstream quotes are always
+            fetched before it is taken, so slow API calls never serialize other requests.
 
     Raises:
         ValueError: If the API key is not found in the environment variables.
@@ -37,18 +202,84 @@ class PortfolioModel:
         raise ValueError("Retrieval of API key failed, check the environment variable")
     ts = TimeSeries(_API_KEY)
     fd = FundamentalData(_API_KEY)
+    quote_workers = int(os.getenv("QUOTE_FETCH_WORKERS", "8"))
+    cost_method = os.getenv("COST_BASIS_METHOD", "fifo")
+    journal_limit = int(os.getenv("JOURNAL_MAX_ENTRIES", "1000"))
 
-    def __init__(self, funds=0.0, userid=None):
+    def __init__(self, funds=0.0, userid=None, index: HoldingsIndex = None):
         """
         Initializes the PortfolioModel instance.
 
         Args:
             funds (float, optional): Initial funds for the portfolio. Defaults to None.
             userid (str, optional): User identifier. Defaults to None.
+            index (HoldingsIndex, optional): Symbol-to-holders index. Defaults to the shared one.
+
+        Raises:
+            ValueError: If `cost_method` is not a known cost basis method.
         """
+        if self.cost_method not in Stock.COST_METHODS:
+            raise ValueError(f"Unknown cost basis method: {self.cost_method}. "
+                             f"Expected one of {', '.join(Stock.COST_METHODS)}.")
         self.userID = userid
-        self.holding_stocks: Dict[str, Stock] = {}
+        self.index = holdings_index if index is None else index
+        self.lock = threading.RLock()
+        self.version = 0
+        self.modified_at = time.time()
+        self.exposure = ExposureTotals()
+        self.market_caps = SortedIndex()
+        self.pages = HoldingsPages()
+        self._holding_stocks = HoldingStocks(self, {})
         self.funds = funds
+        self.realized_pnl = 0.0
+        self.journal: List[JournalEntry] = []
+
+    @property
+    def holding_stocks(self) -> Dict[str, Stock]:
+        return self._holding_stocks
+
+    @holding_stocks.setter
+    def holding_stocks(self, stocks: Dict[str, Stock]) -> None:
+        stocks = dict(stocks)
+        with self.lock:
+            self._holding_stocks.clear()
+            self._holding_stocks.update(stocks)
+
+    def _position_added(self, symbol: str, stock: Stock) -> None:
+        """Called by `holding_stocks` when a position enters the portfolio."""
+        self.index.add(symbol, self)
+        self.exposure.update(symbol, stock)
+        self.pages.update(symbol, stock)
+        if stock.market_cap_value is not None:
+            self.market_caps.add(stock.market_cap_value, symbol)
+        self._touch()
+
+    def _position_removed(self, symbol: str, stock: Stock) -> None:
+        """Called by `holding_stocks` when a position leaves the portfolio."""
+        self.index.remove(symbol, self)
+        self.exposure.remove(symbol)
+        self.pages.remove(symbol)
+        self.market_caps.remove(symbol)
+        self._touch()
+
+    def _position_changed(self, symbol: str) -> None:
+        """Called after a held position's shares or price change; callers hold the lock."""
+        symbol = symbol.upper()
+        stock = self.holding_stocks[symbol]
+        self.exposure.update(symbol, stock)
+        self.pages.update(symbol, stock)
+
+    def _record(self, action: str, symbol: Optional[str], quantity: int, price: float, cash: float) -> None:
+        """Appends a journal entry, compacting the journal once it outgrows its limit; callers hold the lock."""
+        self.journal.append(JournalEntry(time.time(), action, symbol, quantity, price, cash))
+        if len(self.journal) > self.journal_limit:
+            # A new list, so the shared state replaces its copy rather than appending to it.
+            self.journal = compact_journal(self.journal, self.journal_limit)
+
+    def _touch(self) -> None:
+        """Records a change to funds or holdings; callers hold the lock."""
+        self.version += 1
+        self.modified_at = time.time()
 
 
     def profile_charge_funds(self, value: float) -> None:
@@ -63,32 +294,89 @@ class PortfolioModel:
         """
         if value < 0:
             raise ValueError("Funds to add must be non-negative.")
-        self.funds += value
+        with self.lock:
+            self.funds += value
+            self._record("deposit", None, 0, 0.0, value)
+            self._touch()
         logger.info(f"Funds charged: ${value:.2f}. Total funds: ${self.funds:.2f}")
 
+    @staticmethod
+    def _summary_row(stock: Stock) -> Dict[str, Any]:
+        """Summarizes one position for `display_portfolio`."""
+        return {
+            "symbol": stock.symbol,
+            "name": stock.name,
+            "quantity": stock.quantity,
+            "current_price": stock.current_price,
+            "total_value": stock.current_price * stock.quantity,
+            "average_cost": stock.average_cost,
+            "cost_basis": stock.cost_basis,
+            "unrealized_pnl": stock.unrealized_pnl,
+            "realized_pnl": stock.realized_pnl,
+        }
+
     def display_portfolio(self) -> List[Dict]:
         """
-        Displays the user's current stock holdings and total portfolio value.
+        Displays the user's current stock holdings, total portfolio value and profit and loss.
+
+        Cost bases are maintained on every trade, so this reads them without replaying history.
 
         Returns:
-            dict: A summary of the portfolio, including each stock's details and the total value.
+            dict: A summary of the portfolio, including each stock's details, cost basis and
+            P&L, the total value, and the realized and unrealized P&L of the whole portfolio.
         """
         portfolio_summary = []
-        total_portfolio_value = self.funds
 
-        for symbol, stock in self.holding_stocks.items():
-            stock_value = stock.current_price * stock.quantity
-            total_portfolio_value += stock_value
-            portfolio_summary.append({
-                "symbol": stock.symbol,
-                "name": stock.name,
-                "quantity": stock.quantity,
-                "current_price": stock.current_price,
-                "total_value": stock_value,
-            })
+        with self.lock:
+            total_portfolio_value = self.funds
+            unrealized_pnl = 0.0
+            for symbol, stock in self.holding_stocks.items():
+                row = self._summary_row(stock)
+                total_portfolio_value += row["total_value"]
+                unrealized_pnl += row["unrealized_pnl"]
+                portfolio_summary.append(row)
+            realized_pnl = self.realized_pnl
 
         logger.info("Portfolio displayed.")
-        return {"portfolio": portfolio_summary, "total_value": total_portfolio_value}
+        return {"portfolio": portfolio_summary, "total_value": total_portfolio_value,
+                "realized_pnl": realized_pnl, "unrealized_pnl": unrealized_pnl}
+
+    def display_portfolio_page(self, sort: str = "value", order: Optional[str] = None, sector: Optional[str] = None,
+                               limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Displays one page of the holdings, in the same form as `display_portfolio`.
+
+        Rows come from the maintained sort indexes and the portfolio totals from running
+        sums, so the cost is O(log n + limit) however many positions are held.
+
+        Args:
+            sort (str, optional): "value", "weight" or "symbol".
+            order (str, optional): "asc" or "desc"; defaults to descending for value and weight.
+            sector (str, optional): Only positions in this sector.
+            limit (int, optional): Maximum number of rows.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            dict: The page's rows, each with its `weight` in the value of all positions,
+            the portfolio totals as in `display_portfolio`, the `count` of positions matching
+            the filter and the `next_cursor` (None on the last page).
+
+        Raises:
+            ValueError: If the sort, order, limit or cursor is invalid.
+        """
+        with self.lock:
+            symbols, next_cursor, count = self.pages.page(sort, order, sector, limit, cursor)
+            invested = self.pages.total_value
+            rows = []
+            for symbol in symbols:
+                row = self._summary_row(self.holding_stocks[symbol])
+                row["weight"] = row["total_value"] / invested if invested else 0.0
+                rows.append(row)
+            summary = {"portfolio": rows, "total_value": self.funds + invested, "realized_pnl": self.realized_pnl,
+                       "unrealized_pnl": invested - self.pages.total_cost, "count": count,
+                       "next_cursor": next_cursor}
+        logger.info("Portfolio page of %d rows displayed.", len(rows))
+        return summary
 
     def look_up_stock(self, symbol: str) -> Dict:
         """
@@ -111,12 +399,13 @@ class PortfolioModel:
             logger.error(f"Error looking up stock {symbol}: {e}")
             raise
 
-    def update_latest_price(self, symbol: str) -> float:
+    def update_latest_price(self, symbol: str, price: Optional[float] = None) -> float:
         """
         Retrieves latest price of specified stock and updates the latest stock price in the user's holdings.
 
         Args:
             symbol (str): The stock ticker symbol.
+            price (float, optional): An already fetched latest price; retrieved if not given.
 
         Returns:
             float: The updated latest price of the stock.
@@ -124,16 +413,37 @@ class PortfolioModel:
         Raises:
             ValueError: If the stock price cannot be retrieved.
         """
+        symbol = symbol.upper()
         try:
-            latest_price = get_latest_price(symbol, self.ts)
-            if symbol in self.holding_stocks:
-                self.holding_stocks[symbol].current_price = latest_price
+            latest_price = price if price is not None else get_latest_price(symbol, self.ts)
+            self.apply_price(symbol, latest_price)
             logger.info(f"Updated latest price for {symbol}: ${latest_price:.2f}")
             return latest_price
         except Exception as e:
             logger.error(f"Error updating latest price for {symbol}: {e}")
             raise
 
+    def apply_price(self, symbol: str, price: float) -> bool:
+        """
+        Sets the current price of a held or watched stock from an already fetched quote.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            price (float): The latest price.
+
+        Returns:
+            bool: True if the symbol is in the portfolio and was updated.
+        """
+        symbol = symbol.upper()
+        with self.lock:
+            stock = self.holding_stocks.get(symbol)
+            if stock is None:
+                return False
+            stock.current_price = price
+            self._position_changed(symbol)
+            self._touch()
+        return True
+
     def calculate_portfolio_value(self) -> float:
         """
         Calculates the total portfolio value, including funds and stocks.
@@ -145,10 +455,11 @@ class PortfolioModel:
             Exception: If there is an error during calculation.
         """
         try:
-            total_value = self.funds
-            for stock in self.holding_stocks.values():
-                stock_value = stock.current_price * stock.quantity
-                total_value += stock_value
+            with self.lock:
+                total_value = self.funds
+                for stock in self.holding_stocks.values():
+                    stock_value = stock.current_price * stock.quantity
+                    total_value += stock_value
             logger.info(f"Total portfolio value calculated: ${total_value:.2f}")
             return total_value
         except Exception as e:
@@ -167,9 +478,10 @@ class PortfolioModel:
         """
         try:
             total_value = 0
-            for stock in self.holding_stocks.values():
-                stock_value = stock.current_price * stock.quantity
-                total_value += stock_value
+            with self.lock:
+                for stock in self.holding_stocks.values():
+                    stock_value = stock.current_price * stock.quantity
+                    total_value += stock_value
             logger.info(f"Total portfolio value calculated: ${total_value:.2f}")
             return total_value
         except Exception as e:
@@ -177,13 +489,30 @@ class PortfolioModel:
             raise
 
 
-    def buy_stock(self, symbol: str, quantity: int) -> None:
+    def quote_buy(self, symbol: str) -> Tuple[float, Dict[str, Any]]:
+        """
+        Fetches the price and company details a buy of a stock needs, without taking the lock.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+
+        Returns:
+            tuple: The latest price and the `lookup_stock` details.
+        """
+        symbol = symbol.upper()
+        return get_latest_price(symbol, self.ts), lookup_stock(symbol, self.ts, self.fd)
+
+    def buy_stock(self, symbol: str, quantity: int, quote: Optional[Tuple[float, Dict[str, Any]]] = None) -> float:
         """
         Buys a specified quantity of a stock and updates the portfolio.
 
         Args:
             symbol (str): The stock ticker symbol.
             quantity (int): The quantity of shares to buy.
+            quote (tuple, optional): A quote from `quote_buy` to buy at; fetched if not given.
+
+        Returns:
+            float: The price per share the shares were bought at.
 
         Raises:
             ValueError: If the quantity is invalid or funds are insufficient.
@@ -191,44 +520,58 @@ class PortfolioModel:
         """
         if quantity < 1:
             raise ValueError("Quantity must be at least 1.")
+        symbol = symbol.upper()
 
         try:
-            latest_price = get_latest_price(symbol, self.ts)
-            stock_info = lookup_stock(symbol, self.ts, self.fd)
+            latest_price, stock_info = quote if quote is not None else self.quote_buy(symbol)
 
             total_cost = latest_price * quantity
 
-            if self.funds < total_cost:
-                raise ValueError(f"Insufficient funds. Required: ${total_cost:.2f}, Available: ${self.funds:.2f}")
-
-            self.funds -= total_cost
-
-            if symbol in self.holding_stocks:
-                self.holding_stocks[symbol].quantity += quantity
-                self.holding_stocks[symbol].current_price = latest_price
-            else:
-                self.holding_stocks[symbol] = Stock(
-                    symbol=stock_info["symbol"],
-                    name=stock_info["name"],
-                    current_price=latest_price,
-                    description=stock_info["description"],
-                    sector=stock_info["sector"],
-                    industry=stock_info["industry"],
-                    market_cap=stock_info["market_cap"],
-                    quantity=quantity,
-                )
+            with self.lock:
+                if self.funds < total_cost:
+                    raise ValueError(
+                        f"Insufficient funds. Required: ${total_cost:.2f}, Available: ${self.funds:.2f}")
+                self._apply_buy(symbol, quantity, latest_price, stock_info)
             logger.info(f"Bought {quantity} shares of {symbol} at ${latest_price:.2f} each.")
+            return latest_price
         except Exception as e:
             logger.error(f"Error buying stock {symbol}: {e}")
             raise
 
-    def sell_stock(self, symbol: str, quantity: int) -> None:
+    def quote_sell(self, symbol: str, quantity: int) -> float:
+        """
+        Fetches the price a sale of a stock needs, without taking the lock.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            quantity (int): The quantity of shares to sell.
+
+        Returns:
+            float: The latest price.
+
+        Raises:
+            ValueError: If the quantity is invalid or insufficient shares are available.
+        """
+        if quantity < 1:
+            raise ValueError("Quantity must be at least 1.")
+        symbol = symbol.upper()
+
+        # Fail fast before spending an upstream call; the sale re-checks with the quote in hand.
+        with self.lock:
+            self._check_can_sell(symbol, quantity)
+        return get_latest_price(symbol, self.ts)
+
+    def sell_stock(self, symbol: str, quantity: int, price: Optional[float] = None) -> float:
         """
         Sells a specified quantity of a stock from the portfolio.
 
         Args:
             symbol (str): The stock ticker symbol.
             quantity (int): The quantity of shares to sell.
+            price (float, optional): A price from `quote_sell` to sell at; fetched if not given.
+
+        Returns:
+            float: The price per share the shares were sold at.
 
         Raises:
             ValueError: If the quantity is invalid or insufficient shares are available.
@@ -236,29 +579,243 @@ class PortfolioModel:
         """
         if quantity < 1:
             raise ValueError("Quantity must be at least 1.")
+        symbol = symbol.upper()
 
-        if symbol not in self.holding_stocks:
-            raise ValueError(f"Stock {symbol} is not in your portfolio.")
+        try:
+            latest_price = price if price is not None else self.quote_sell(symbol, quantity)
+            with self.lock:
+                self._check_can_sell(symbol, quantity)
+                self._apply_sell(symbol, quantity, latest_price)
+            logger.info(f"Sold {quantity} shares of {symbol} at ${latest_price:.2f} each.")
+            return latest_price
+        except Exception as e:
+            logger.error(f"Error selling stock {symbol}: {e}")
+            raise
 
-        stock = self.holding_stocks[symbol]
+    def _check_can_sell(self, symbol: str, quantity: int) -> None:
+        """
+        Checks that the portfolio holds enough shares of a stock to sell.
 
+        Raises:
+            ValueError: If the stock is not held or not enough shares are owned.
+        """
+        stock = self.holding_stocks.get(symbol)
+        if stock is None:
+            raise ValueError(f"Stock {symbol} is not in your portfolio.")
         if stock.quantity < quantity:
             raise ValueError(f"Not enough shares to sell. Owned: {stock.quantity}, Requested: {quantity}")
 
-        try:
-            latest_price = get_latest_price(symbol, self.ts)
-            total_revenue = latest_price * quantity
+    def _apply_buy(self, symbol: str, quantity: int, price: float, stock_info: Dict[str, Any]) -> None:
+        """
+        Debits the funds and adds the shares to the holdings. Must be called with `lock` held;
+        validation is the caller's job.
 
-            stock.quantity -= quantity
+        Args:
+            symbol (str): The stock ticker symbol.
+            quantity (int): The quantity of shares bought.
+            price (float): The execution price per share.
+            stock_info (dict): Stock details from `lookup_stock`, used when the symbol is new.
+        """
+        self.funds -= price * quantity
 
-            self.funds += total_revenue
+        if symbol in self.holding_stocks:
+            self.holding_stocks[symbol].add_lot(quantity, price)
+            self.holding_stocks[symbol].current_price = price
+            self._position_changed(symbol)
+        else:
+            self.holding_stocks[symbol] = Stock(
+                symbol=stock_info["symbol"],
+                name=stock_info["name"],
+                current_price=price,
+                description=stock_info["description"],
+                sector=stock_info["sector"],
+                industry=stock_info["industry"],
+                market_cap=stock_info["market_cap"],
+                quantity=quantity,
+                lots=[[quantity, price]],
+            )
+        self._record("buy", symbol, quantity, price, -price * quantity)
+        self._touch()
 
-            logger.info(f"Sold {quantity} shares of {symbol} at ${latest_price:.2f} each.")
+    def _apply_sell(self, symbol: str, quantity: int, price: float) -> None:
+        """
+        Removes the shares from the holdings, realizes their gain against the purchase lots
+        and credits the revenue. Must be called with `lock` held; validation is the caller's job.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            quantity (int): The quantity of shares sold.
+            price (float): The execution price per share.
+        """
+        self.realized_pnl += self.holding_stocks[symbol].remove_shares(quantity, price, self.cost_method)
+        self._position_changed(symbol)
+        self.funds += price * quantity
+        self._record("sell", symbol, quantity, price, price * quantity)
+        self._touch()
+
+    def _fetch_quotes(self, symbols: List[str], new_symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetches quotes for a set of symbols concurrently.
+
+        Symbols already held only need a price; new symbols need the full `lookup_stock`
+        details, whose `current_price` doubles as the quote, so each symbol costs one round-trip.
+
+        Args:
+            symbols (List[str]): Symbols to quote.
+            new_symbols (List[str]): Subset of `symbols` that also need company details.
+
+        Returns:
+            dict: Mapping of symbol to a stock info dict containing at least `current_price`.
+
+        Raises:
+            ValueError: If any quote cannot be retrieved.
+        """
+        def fetch(symbol: str) -> Dict[str, Any]:
+            if symbol in new_symbols:
+                return lookup_stock(symbol, self.ts, self.fd)
+            return {"current_price": get_latest_price(symbol, self.ts)}
+
+        if not symbols:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.quote_workers, len(symbols))) as pool:
+            results = dict(zip(symbols, pool.map(fetch, symbols)))
+
+        for symbol, info in results.items():
+            if info.get("current_price") is None or info["current_price"] < 0:
+                raise ValueError(f"No price data found for symbol {symbol}")
+        return results
+
+    @staticmethod
+    def _parse_orders(orders: List[Dict[str, Any]]) -> List[tuple]:
+        """
+        Validates a basket and returns its (action, symbol, quantity) orders.
+
+        Raises:
+            ValueError: If the basket is empty or an order is malformed.
+        """
+        if not orders:
+            raise ValueError("At least one order is required.")
+
+        parsed = []
+        for order in orders:
+            action = order.get("action")
+            symbol = order.get("symbol")
+            quantity = order.get("quantity")
+            if action not in ("buy", "sell"):
+                raise ValueError(f"Order action must be 'buy' or 'sell', got {action!r}")
+            if not symbol:
+                raise ValueError("Order symbol is required.")
+            if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+                raise ValueError("Quantity must be at least 1.")
+            parsed.append((action, symbol.upper(), quantity))
+        return parsed
+
+    def quote_batch(self, orders: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetches the quotes a basket of orders needs in one concurrent batch, without taking the lock.
+
+        Args:
+            orders (List[dict]): Orders of the form {"action": "buy"|"sell", "symbol": str, "quantity": int}.
+
+        Returns:
+            dict: Mapping of symbol to a stock info dict containing at least `current_price`.
+
+        Raises:
+            ValueError: If an order is malformed, shares are insufficient, or a quote fails.
+        """
+        parsed = self._parse_orders(orders)
+        symbols = list(dict.fromkeys(symbol for _, symbol, _ in parsed))
+
+        # Reject what is already impossible before spending any upstream calls.
+        with self.lock:
+            self._check_basket_shares(parsed)
+            new_symbols = [symbol for symbol in symbols if symbol not in self.holding_stocks]
+        return self._fetch_quotes(symbols, new_symbols)
+
+    def execute_batch(self, orders: List[Dict[str, Any]],
+                      quotes: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Executes a basket of buy and sell orders atomically.
+
+        All quotes are fetched in one concurrent batch, then the whole basket is validated
+        (share counts per symbol, and funds against total cost net of sell proceeds) before
+        any order is applied. Either every order is applied or the portfolio is unchanged.
+
+        Args:
+            orders (List[dict]): Orders of the form {"action": "buy"|"sell", "symbol": str, "quantity": int}.
+            quotes (dict, optional): Quotes from `quote_batch` to execute at; fetched if not given.
+
+        Returns:
+            dict: The executed orders with their prices, the net cash flow and the remaining funds.
+
+        Raises:
+            ValueError: If an order is malformed, shares or funds are insufficient, or a quote fails.
+            Exception: For API or unexpected errors.
+        """
+        parsed = self._parse_orders(orders)
+
+        try:
+            if quotes is None:
+                quotes = self.quote_batch(orders)
+
+            net_cash = 0.0
+            for action, symbol, quantity in parsed:
+                amount = quotes[symbol]["current_price"] * quantity
+                net_cash += amount if action == "sell" else -amount
+
+            with self.lock:
+                # Holdings may have changed while the quotes were in flight.
+                self._check_basket_shares(parsed)
+                for action, symbol, _ in parsed:
+                    if action == "buy" and symbol not in self.holding_stocks and "name" not in quotes[symbol]:
+                        raise ValueError(f"Stock {symbol} was removed while the batch was quoted; retry the batch.")
+
+                if self.funds + net_cash < 0:
+                    raise ValueError(
+                        f"Insufficient funds. Required: ${-net_cash:.2f}, Available: ${self.funds:.2f}")
+
+                executed = []
+                for action, symbol, quantity in parsed:
+                    price = quotes[symbol]["current_price"]
+                    if action == "buy":
+                        self._apply_buy(symbol, quantity, price, quotes[symbol])
+                    else:
+                        self._apply_sell(symbol, quantity, price)
+                    executed.append({
+                        "action": action,
+                        "symbol": symbol,
+                        "quantity": quantity,
+                        "price": price,
+                        "total": price * quantity,
+                    })
+                funds = self.funds
+
+            logger.info(f"Executed batch of {len(executed)} orders. Net cash flow: ${net_cash:.2f}")
+            return {"orders": executed, "net_cash": net_cash, "funds": funds}
         except Exception as e:
-            logger.error(f"Error selling stock {symbol}: {e}")
+            logger.error(f"Error executing order batch: {e}")
             raise
 
-    def add_interested_stock(self, symbol: str) -> None:
+    def _check_basket_shares(self, parsed: List[tuple]) -> None:
+        """
+        Walks a parsed basket in order and checks every sell is covered by held or earlier bought shares.
+
+        Raises:
+            ValueError: If a sell exceeds the shares available at that point in the basket.
+        """
+        available = defaultdict(int)
+        for symbol, stock in self.holding_stocks.items():
+            available[symbol] = stock.quantity
+        for action, symbol, quantity in parsed:
+            if action == "buy":
+                available[symbol] += quantity
+            elif available[symbol] < quantity:
+                raise ValueError(
+                    f"Not enough shares of {symbol} to sell. Owned: {available[symbol]}, Requested: {quantity}")
+            else:
+                available[symbol] -= quantity
+
+    def add_interested_stock(self, symbol: str, quote: Optional[Tuple[float, Dict[str, Any]]] = None) -> None:
         """
         Adds a stock to the user's portfolio with zero quantity.
 
@@ -266,34 +823,61 @@ class PortfolioModel:
 
         Args:
             symbol (str): The stock ticker symbol.
+            quote (tuple, optional): A quote from `quote_buy` for the stock; fetched if not given.
 
         Raises:
             ValueError: If the stock symbol is already in the portfolio.
             Exception: For API or unexpected errors.
         """
+        symbol = symbol.upper()
         try:
             if symbol in self.holding_stocks:
                 raise ValueError(f"The stock {symbol} is already existed in the stocks")
 
-            stock_info = lookup_stock(symbol, self.ts, self.fd)
-            latest_price = get_latest_price(symbol, self.ts)
+            latest_price, stock_info = quote if quote is not None else self.quote_buy(symbol)
 
-            self.holding_stocks[symbol] = Stock(
-                symbol = stock_info["symbol"],
-                name = stock_info["name"],
-                current_price = latest_price,
-                description = stock_info["description"],
-                sector = stock_info["sector"],
-                industry = stock_info["industry"],
-                market_cap = stock_info["market_cap"],
-                quantity = 0,
-            )
+            with self.lock:
+                if symbol in self.holding_stocks:
+                    raise ValueError(f"The stock {symbol} is already existed in the stocks")
+                self.holding_stocks[symbol] = Stock(
+                    symbol = stock_info["symbol"],
+                    name = stock_info["name"],
+                    current_price = latest_price,
+                    description = stock_info["description"],
+                    sector = stock_info["sector"],
+                    industry = stock_info["industry"],
+                    market_cap = stock_info["market_cap"],
+                    quantity = 0,
+                )
+                self._touch()
             logger.info(f"Added {symbol} to interested stocks.")
         except Exception as e:
             logger.error(f"Error adding interested stock {symbol}: {e}")
             raise
 
-    def remove_interested_stock(self, symbol: str) -> None:
+    def quote_removal(self, symbol: str) -> Optional[float]:
+        """
+        Fetches the price a removal of a stock sells its shares at, without taking the lock.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+
+        Returns:
+            float: The latest price, or None if no shares are held and none is needed.
+
+        Raises:
+            ValueError: If the stock is not in the portfolio.
+        """
+        symbol = symbol.upper()
+        with self.lock:
+            stock = self.holding_stocks.get(symbol)
+            if stock is None:
+                raise ValueError(f"Stock {symbol} is not in your holdings.")
+            if stock.quantity == 0:
+                return None
+        return get_latest_price(symbol, self.ts)
+
+    def remove_interested_stock(self, symbol: str, price: Optional[float] = None) -> None:
         """
         Removes a stock from the user's portfolio.
 
@@ -301,22 +885,33 @@ class PortfolioModel:
 
         Args:
             symbol (str): The stock ticker symbol.
+            price (float, optional): A price from `quote_removal` to sell any shares at; fetched
+                if shares are held and it is not given.
 
         Raises:
             ValueError: If the stock is not in the portfolio.
             Exception: For API or unexpected errors.
         """
+        symbol = symbol.upper()
         if symbol not in self.holding_stocks:
             raise ValueError(f"Stock {symbol} is not in your holdings.")
 
         try:
-            stock = self.holding_stocks[symbol]
-
-            if stock.quantity > 0:
+            latest_price = price
+            while True:
+                with self.lock:
+                    stock = self.holding_stocks.get(symbol)
+                    if stock is None:
+                        raise ValueError(f"Stock {symbol} is not in your holdings.")
+                    if stock.quantity == 0 or latest_price is not None:
+                        if stock.quantity > 0:
+                            self._apply_sell(symbol, stock.quantity, latest_price)
+                        del self.holding_stocks[symbol]
+                        self._touch()
+                        break
+                # Quote outside the lock, then re-check the position with the price in hand.
                 logger.info(f"Selling all shares of {symbol} before removing it.")
-                self.sell_stock(symbol, stock.quantity)
-
-            del self.holding_stocks[symbol]
+                latest_price = get_latest_price(symbol, self.ts)
             logger.info(f"Removed {symbol} from holdings.")
         except Exception as e:
             logger.error(f"Error removing interested stock {symbol}: {e}")
@@ -324,10 +919,14 @@ class PortfolioModel:
 
     def clear_all_stocks(self) -> None:
         """
-        Clear all the stocks and set the funds to 0.0
+        Clear all the stocks, the journal and the realized P&L, and set the funds to 0.0
         """
-        self.holding_stocks = {}
-        self.funds = 0.0
+        with self.lock:
+            self.holding_stocks = {}
+            self.funds = 0.0
+            self.realized_pnl = 0.0
+            self.journal = []
+            self._touch()
         logger.info("All stocks cleared and funds reset to 0.0.")
 
     def load_stock(self, stock: Stock) -> None:
@@ -342,31 +941,146 @@ class PortfolioModel:
         Raises:
             Exception: For unexpected errors during stock loading.
         """
-        if stock.symbol in self.holding_stocks:
-            existing_stock = self.holding_stocks[stock.symbol]
-            
-            existing_stock.quantity += stock.quantity
-
-            existing_stock.current_price = stock.current_price
-            existing_stock.market_cap = stock.market_cap
-
+        symbol = stock.symbol.upper()
+        with self.lock:
+            self._touch()
+            existing_stock = self.holding_stocks.get(symbol)
+            if existing_stock is None:
+                self.holding_stocks[symbol] = stock
+            else:
+                for shares, price in stock.lots:
+                    existing_stock.add_lot(shares, price)
+                existing_stock.realized_pnl += stock.realized_pnl
+                existing_stock.current_price = stock.current_price
+                existing_stock.market_cap = stock.market_cap
+                existing_stock.market_cap_value = stock.market_cap_value
+                if stock.market_cap_value is None:
+                    self.market_caps.remove(symbol)
+                else:
+                    self.market_caps.add(stock.market_cap_value, symbol)
+                self._position_changed(symbol)
+
+        if existing_stock is not None:
             logger.info(
                 "Updated stock: %s. New quantity: %d.",
                 stock.symbol,
                 existing_stock.quantity
             )
         else:
-            self.holding_stocks[stock.symbol] = stock
             logger.info("Added new stock: %s with quantity %d.", stock.symbol, stock.quantity)
 
     def get_stock_holdings(self):
         """Retrieves the user's current stock holdings.
 
         Returns:
-            Dict[str, Stock]: A dictionary of stocks in the portfolio.
+            Dict[str, Stock]: A snapshot of the stocks in the portfolio.
         """
-        return self.holding_stocks
+        with self.lock:
+            return dict(self.holding_stocks)
     
+    def get_journal(self) -> List[JournalEntry]:
+        """
+        Retrieves the user's trades and deposits.
+
+        Returns:
+            List[JournalEntry]: A snapshot of the journal, oldest first.
+        """
+        with self.lock:
+            return list(self.journal)
+
+    def load_journal(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Replaces the journal, e.g. with one restored from a saved session, compacted to `journal_limit`.
+
+        Args:
+            entries (List[dict]): Journal entries as dictionaries of `JournalEntry` fields.
+        """
+        with self.lock:
+            journal = [JournalEntry(**dict(entry, symbol=entry["symbol"] and entry["symbol"].upper()))
+                       for entry in entries]
+            self.journal = compact_journal(journal, self.journal_limit)
+
+    def get_realized_pnl(self) -> float:
+        """
+        Retrieves the gains realized by all of the user's sales.
+
+        Returns:
+            float: The realized P&L.
+        """
+        with self.lock:
+            return self.realized_pnl
+
+    def load_realized_pnl(self, value: float) -> None:
+        """
+        Restores the realized P&L, e.g. from a saved session.
+
+        Args:
+            value (float): The realized P&L.
+        """
+        with self.lock:
+            self.realized_pnl = value
+            self._touch()
+
+    def get_holdings_page(self, sort: str = "value", order: Optional[str] = None, sector: Optional[str] = None,
+                          limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Retrieves one page of the holdings from the maintained sort indexes.
+
+        Args:
+            sort (str, optional): "value", "weight" or "symbol".
+            order (str, optional): "asc" or "desc"; defaults to descending for value and weight.
+            sector (str, optional): Only positions in this sector.
+            limit (int, optional): Maximum number of stocks.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            dict: The page's `holdings` as a list of stocks in order, the `count` of positions
+            matching the filter and the `next_cursor` (None on the last page).
+
+        Raises:
+            ValueError: If the sort, order, limit or cursor is invalid.
+        """
+        with self.lock:
+            symbols, next_cursor, count = self.pages.page(sort, order, sector, limit, cursor)
+            holdings = [self.holding_stocks[symbol] for symbol in symbols]
+        logger.info("Retrieved a page of %d holdings.", len(holdings))
+        return {"holdings": holdings, "count": count, "next_cursor": next_cursor}
+
+    def get_holdings_by_market_cap(self, min_value: Optional[float] = None,
+                                   max_value: Optional[float] = None) -> Dict[str, Stock]:
+        """
+        Retrieves the holdings whose market cap lies in a range, from the sorted market-cap index.
+
+        Args:
+            min_value (float, optional): Smallest market cap in dollars included; unbounded if None.
+            max_value (float, optional): Largest market cap in dollars included; unbounded if None.
+
+        Returns:
+            Dict[str, Stock]: The matching stocks, smallest market cap first. Stocks whose
+            market cap is unknown never match.
+        """
+        with self.lock:
+            symbols = self.market_caps.range(min_value, max_value)
+            holdings = {symbol: self.holding_stocks[symbol] for symbol in symbols}
+        logger.info("Retrieved %d holdings by market cap.", len(holdings))
+        return holdings
+
+    def get_exposure(self) -> Dict[str, Any]:
+        """
+        Retrieves the weights of the holdings grouped by sector, industry and market-cap bucket.
+
+        The group totals are maintained as positions change, so this does not regroup the holdings.
+
+        Returns:
+            dict: The invested `total_value`, the `funds`, and per dimension the groups with
+            their value, weight in the invested total and number of positions, largest first.
+        """
+        with self.lock:
+            exposure = self.exposure.snapshot()
+            exposure["funds"] = self.funds
+        logger.info("Portfolio exposure retrieved.")
+        return exposure
+
     def get_funds(self):
         """
         Retrieves the current available funds in the portfolio.
@@ -0,0 +1,165 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from alpha_vantage.timeseries import TimeSeries
+
+from stock_app.models.holdings_index_model import HoldingsIndex, holdings_index
+from stock_app.models.stock_model import get_latest_price
+from stock_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class PriceRefreshScheduler:
+    """
+    Periodically refreshes prices of the symbols held or watched across active portfolios.
+
+    Each cycle takes the deduplicated union of symbols from the holdings index and any
+    other watched sources, such as standing orders, ranks them by how many portfolios
+    hold or watch them (ties broken by the oldest refresh first), and fetches
+    at most `budget` quotes concurrently. Symbols refreshed less than `interval` seconds
+    ago, for instance by a live price stream, are skipped, so upstream calls stay within
+    the configured budget no matter how many users hold a symbol.
+
+    Attributes:
+        ts (TimeSeries): TimeSeries object used to fetch quotes.
+        index (HoldingsIndex): Symbol-to-holders index of the active portfolios.
+        interval (float): Seconds between refresh cycles.
+        budget (int): Maximum upstream quote calls per cycle.
+        workers (int): Maximum concurrent quote fetches.
+        watched (Callable[[], Dict[str, int]], optional): Returns further symbols to refresh,
+            weighted like holder counts.
+        apply_quote (Callable[[str, float], Any]): Applies a quote to the portfolios; defaults
+            to the index's `apply_quote`. Replaced where portfolios must commit price changes,
+            e.g. to the state shared between workers.
+        leader (Callable[[], bool], optional): Checked before every background cycle; the cycle
+            is skipped unless it returns True, so one of several processes does the polling.
+    """
+
+    def __init__(self, ts: TimeSeries, index: HoldingsIndex = holdings_index,
+                 interval: float = 300.0, budget: int = 5, workers: int = 4,
+                 watched: Optional[Callable[[], Dict[str, int]]] = None,
+                 apply_quote: Optional[Callable[[str, float], Any]] = None,
+                 leader: Optional[Callable[[], bool]] = None):
+        self.ts = ts
+        self.index = index
+        self.interval = interval
+        self.budget = budget
+        self.workers = workers
+        self.watched = watched
+        self.apply_quote = index.apply_quote if apply_quote is None else apply_quote
+        self.leader = leader
+        self.last_refreshed: Dict[str, float] = {}
+        self._listeners: List[Callable[[str, float], None]] = []
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_listener(self, listener: Callable[[str, float], None]) -> None:
+        """
+        Registers a callback invoked with (symbol, price) for every refreshed quote.
+
+        Args:
+            listener (Callable[[str, float], None]): The callback.
+        """
+        self._listeners.append(listener)
+
+    def plan(self, now: Optional[float] = None) -> List[str]:
+        """
+        Chooses the symbols to refresh this cycle.
+
+        Args:
+            now (float, optional): Current time; defaults to `time.time()`.
+
+        Returns:
+            List[str]: At most `budget` symbols, most widely held and stalest first.
+        """
+        now = time.time() if now is None else now
+        holders = self.index.holder_counts()
+        if self.watched is not None:
+            for symbol, count in self.watched().items():
+                holders[symbol] = holders.get(symbol, 0) + count
+        due = [symbol for symbol in holders
+               if now - self.last_refreshed.get(symbol, 0.0) >= self.interval]
+        due.sort(key=lambda symbol: (-holders[symbol], self.last_refreshed.get(symbol, 0.0), symbol))
+        return due[:self.budget]
+
+    def record_quote(self, symbol: str, price: float) -> None:
+        """
+        Applies a quote to every portfolio holding the symbol and marks it fresh.
+
+        Also suitable as a listener for other quote sources, such as the price stream.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            price (float): The latest price.
+        """
+        self.last_refreshed[symbol] = time.time()
+        try:
+            self.apply_quote(symbol, price)
+        except Exception as e:
+            logger.error("Error applying %s quote: %s", symbol, e)
+        for listener in self._listeners:
+            try:
+                listener(symbol, price)
+            except Exception as e:
+                logger.error("Price listener failed for %s: %s", symbol, e)
+
+    def refresh_once(self) -> Dict[str, float]:
+        """
+        Runs one refresh cycle.
+
+        Returns:
+            dict: Mapping of refreshed symbol to its new price. Failed fetches are logged and omitted.
+        """
+        symbols = self.plan()
+        if not symbols:
+            return {}
+
+        def fetch(symbol: str) -> Optional[float]:
+            try:
+                return get_latest_price(symbol, self.ts)
+            except Exception as e:
+                logger.error("Error refreshing price for %s: %s", symbol, e)
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(symbols))) as pool:
+            prices = dict(zip(symbols, pool.map(fetch, symbols)))
+
+        refreshed = {}
+        for symbol, price in prices.items():
+            if price is None:
+                continue
+            self.record_quote(symbol, price)
+            refreshed[symbol] = price
+        logger.info("Refreshed prices for %d of %d planned symbols.", len(refreshed), len(symbols))
+        return refreshed
+
+    def start(self) -> None:
+        """Starts the background refresh thread if it is not already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="price-refresh", daemon=True)
+        self._thread.start()
+        logger.info("Price refresh scheduler started: every %.0fs, budget %d calls.", self.interval, self.budget)
+
+    def stop(self) -> None:
+        """Stops the background refresh thread."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                if self.leader is None or self.leader():
+                    self.refresh_once()
+            except Exception as e:
+                logger.error("Price refresh cycle failed: %s", e)
+            self._stopped.wait(self.interval)
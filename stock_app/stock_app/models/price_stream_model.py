@@ -0,0 +1,180 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+from alpha_vantage.timeseries import TimeSeries
+
+from stock_app.models.stock_model import get_latest_price
+from stock_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class Subscription:
+    """
+    A client's subscription to a set of symbols.
+
+    Quote events are delivered to a bounded queue; when a slow client lets the
+    queue fill up, the oldest event is dropped so pollers never block on it.
+
+    Attributes:
+        symbols (Set[str]): The subscribed ticker symbols.
+    """
+
+    def __init__(self, symbols: Set[str], max_queue: int):
+        self.symbols = symbols
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=max_queue)
+
+    def publish(self, event: dict) -> None:
+        """Queues an event, dropping the oldest one if the queue is full."""
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def events(self, timeout: float) -> Iterator[Optional[dict]]:
+        """
+        Yields queued events forever, or None whenever `timeout` seconds pass without one.
+
+        Args:
+            timeout (float): Seconds to wait before yielding a None heartbeat.
+        """
+        while True:
+            try:
+                yield self._queue.get(timeout=timeout)
+            except queue.Empty:
+                yield None
+
+
+class _SymbolPoller(threading.Thread):
+    """Background thread polling one symbol and fanning each quote out to its subscribers."""
+
+    def __init__(self, streamer: "PriceStreamer", symbol: str):
+        super().__init__(name=f"price-poller-{symbol}", daemon=True)
+        self.streamer = streamer
+        self.symbol = symbol
+        self.subscribers: List[Subscription] = []
+        self.last_event: Optional[dict] = None
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            try:
+                price = get_latest_price(self.symbol, self.streamer.ts)
+                event = {"symbol": self.symbol, "price": price, "timestamp": time.time()}
+            except Exception as e:
+                logger.error("Error polling price for %s: %s", self.symbol, e)
+                event = {"symbol": self.symbol, "error": str(e), "timestamp": time.time()}
+            self.streamer._dispatch(self, event)
+            self.stopped.wait(self.streamer.interval)
+        logger.info("Stopped price poller for %s.", self.symbol)
+
+
+class PriceStreamer:
+    """
+    Shares one upstream poller per symbol between all subscribers.
+
+    A poller thread starts when the first client subscribes to a symbol and stops
+    once the last subscriber leaves, so N clients watching the same ticker cost a
+    single upstream call per interval.
+
+    Attributes:
+        ts (TimeSeries): TimeSeries object used to fetch quotes.
+        interval (float): Seconds between polls of a symbol.
+        max_queue (int): Maximum number of undelivered events kept per subscription.
+    """
+
+    def __init__(self, ts: TimeSeries, interval: float = 15.0, max_queue: int = 100):
+        self.ts = ts
+        self.interval = interval
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._pollers: Dict[str, _SymbolPoller] = {}
+        self._listeners: List[Callable[[str, float], None]] = []
+
+    def add_listener(self, listener: Callable[[str, float], None]) -> None:
+        """
+        Registers a callback invoked with (symbol, price) for every successfully polled quote.
+
+        Args:
+            listener (Callable[[str, float], None]): The callback.
+        """
+        self._listeners.append(listener)
+
+    def subscribe(self, symbols: Set[str]) -> Subscription:
+        """
+        Subscribes to quote updates for a set of symbols, starting pollers as needed.
+
+        The last known quote of each already polled symbol is delivered immediately.
+
+        Args:
+            symbols (Set[str]): Ticker symbols to watch.
+
+        Returns:
+            Subscription: The subscription to read events from.
+        """
+        subscription = Subscription(set(symbols), self.max_queue)
+        with self._lock:
+            for symbol in subscription.symbols:
+                poller = self._pollers.get(symbol)
+                if poller is None:
+                    poller = self._pollers[symbol] = _SymbolPoller(self, symbol)
+                    poller.subscribers.append(subscription)
+                    poller.start()
+                    logger.info("Started price poller for %s.", symbol)
+                else:
+                    poller.subscribers.append(subscription)
+                    if poller.last_event is not None:
+                        subscription.publish(poller.last_event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Removes a subscription, stopping pollers that no longer have subscribers.
+
+        Args:
+            subscription (Subscription): The subscription returned by `subscribe`.
+        """
+        with self._lock:
+            for symbol in subscription.symbols:
+                poller = self._pollers.get(symbol)
+                if poller is None:
+                    continue
+                if subscription in poller.subscribers:
+                    poller.subscribers.remove(subscription)
+                if not poller.subscribers:
+                    poller.stopped.set()
+                    del self._pollers[symbol]
+
+    def active_symbols(self) -> List[str]:
+        """
+        Returns:
+            List[str]: Symbols that currently have a running poller.
+        """
+        with self._lock:
+            return sorted(self._pollers)
+
+    def _dispatch(self, poller: _SymbolPoller, event: dict) -> None:
+        with self._lock:
+            if poller.stopped.is_set():
+                return
+            poller.last_event = event
+            subscribers = list(poller.subscribers)
+        for subscription in subscribers:
+            subscription.publish(event)
+
+        if "price" in event:
+            for listener in self._listeners:
+                try:
+                    listener(event["symbol"], event["price"])
+                except Exception as e:
+                    logger.error("Price listener failed for %s: %s", event["symbol"], e)
@@ -0,0 +1,341 @@
+import json
+import logging
+import threading
+import uuid
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from stock_app.models.mongo_session_model import stock_document, stock_from_document
+from stock_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# KEYS: active user key. ARGV: key prefix.
+# Returns the logged-in user and their portfolio's version, or nil if nobody is logged in.
+_PEEK = """
+local user = redis.call('GET', KEYS[1])
+if not user then return nil end
+return {user, redis.call('HGET', ARGV[1] .. ':' .. user, 'version')}
+"""
+
+# KEYS: state hash, positions hash, journal list, active user key.
+# ARGV: user, funds, realized P&L, position count n, n (symbol, document) pairs, journal entries.
+# Returns -1 if another user is logged in. Otherwise makes the user the logged-in one,
+# publishes their portfolio at version 1 and returns 0, unless it is already shared; then
+# returns the shared version.
+_ATTACH = """
+local active = redis.call('GET', KEYS[4])
+if active and active ~= ARGV[1] then return -1 end
+redis.call('SET', KEYS[4], ARGV[1])
+local version = redis.call('HGET', KEYS[1], 'version')
+if version then return tonumber(version) end
+redis.call('DEL', KEYS[2], KEYS[3])
+redis.call('HSET', KEYS[1], 'funds', ARGV[2], 'realized_pnl', ARGV[3], 'version', 1)
+local n = tonumber(ARGV[4])
+for i = 0, n - 1 do redis.call('HSET', KEYS[2], ARGV[5 + 2 * i], ARGV[6 + 2 * i]) end
+for i = 5 + 2 * n, #ARGV do redis.call('RPUSH', KEYS[3], ARGV[i]) end
+return 0
+"""
+
+# KEYS: state hash, positions hash, journal list.
+# ARGV: expected version, funds, realized P&L, 1 to replace the journal or 0 to append to it,
+# position count n, n (symbol, document) pairs where an empty document deletes the
+# position, then journal entries.
+# Returns the new version, -1 if the portfolio is not shared, -2 if the version moved.
+_COMMIT = """
+local version = redis.call('HGET', KEYS[1], 'version')
+if not version then return -1 end
+if version ~= ARGV[1] then return -2 end
+redis.call('HSET', KEYS[1], 'funds', ARGV[2], 'realized_pnl', ARGV[3])
+if ARGV[4] == '1' then redis.call('DEL', KEYS[3]) end
+local n = tonumber(ARGV[5])
+for i = 0, n - 1 do
+    local symbol, document = ARGV[6 + 2 * i], ARGV[7 + 2 * i]
+    if document == '' then redis.call('HDEL', KEYS[2], symbol) else redis.call('HSET', KEYS[2], symbol, document) end
+end
+for i = 6 + 2 * n, #ARGV do redis.call('RPUSH', KEYS[3], ARGV[i]) end
+return redis.call('HINCRBY', KEYS[1], 'version', 1)
+"""
+
+# KEYS: state hash, positions hash, journal list, active user key. ARGV: expected version, user.
+# Drops the shared portfolio if it is still at that version; returns 1 if dropped, 0 if not.
+_RELEASE = """
+if redis.call('HGET', KEYS[1], 'version') ~= ARGV[1] then return 0 end
+redis.call('DEL', KEYS[1], KEYS[2], KEYS[3])
+if redis.call('GET', KEYS[4]) == ARGV[2] then redis.call('DEL', KEYS[4]) end
+return 1
+"""
+
+# KEYS: lease key. ARGV: holder, milliseconds to hold it.
+# Takes the lease if it is free or renews it if the holder has it; returns 1 if held, else 0.
+_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] or redis.call('SET', KEYS[1], ARGV[1], 'NX') then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+NOT_SHARED = -1
+
+
+class PortfolioConflictError(ValueError):
+    """Raised when a portfolio update keeps losing to concurrent updates from other workers."""
+
+
+class UserLoggedInError(ValueError):
+    """Raised when a user logs in while another user's portfolio is shared."""
+
+
+class RedisPortfolioStore:
+    """
+    Shares the logged-in user's portfolio between workers through Redis.
+
+    The portfolio's funds, realized P&L and version live in a hash, its positions in a
+    hash of position documents and its journal in a list, next to a key naming the
+    logged-in user. Every worker keeps serving reads from its in-process PortfolioModel,
+    which `sync` reloads only when the shared version has moved, so a read costs one
+    script call on top of the local lookup.
+
+    Trades still run the model's own validation and lot accounting locally; `update`
+    then commits the positions they changed through a Lua script that applies them only
+    if the shared version is still the one the trade started from. A trade that lost the
+    race is reloaded from Redis and applied again at the quote it already fetched, so
+    neither the lock nor the version check spans an upstream call. MongoDB remains the
+    durable store: the portfolio is published from the session at login and dropped once
+    the session is saved at logout. The workers serve one portfolio, so another user can
+    only log in once that logout is done.
+
+    Attributes:
+        client: The Redis client.
+        retries (int): Times a conflicting update is run again before giving up.
+        prefix (str): Prefix of the Redis keys.
+    """
+
+    def __init__(self, client, retries: int = 3, prefix: str = "portfolio"):
+        self.client = client
+        self.retries = retries
+        self.prefix = prefix
+        self._peek = client.register_script(_PEEK)
+        self._attach = client.register_script(_ATTACH)
+        self._commit = client.register_script(_COMMIT)
+        self._release = client.register_script(_RELEASE)
+        self._lease = client.register_script(_LEASE)
+        self._worker_id = uuid.uuid4().hex
+        # Updates from one worker are applied one at a time so each commits only its own changes.
+        self._write_lock = threading.Lock()
+        self._active_key = f"{prefix}:active"
+        self._versions: Dict[Any, int] = {}
+
+    def _keys(self, user_id) -> List[str]:
+        base = f"{self.prefix}:{user_id}"
+        return [base, f"{base}:positions", f"{base}:journal", self._active_key]
+
+    @staticmethod
+    def _positions(portfolio) -> Dict[str, Tuple]:
+        """What a change can touch in each position."""
+        return {symbol: (stock.quantity, stock.current_price, tuple(map(tuple, stock.lots)), stock.realized_pnl)
+                for symbol, stock in portfolio.holding_stocks.items()}
+
+    def attach(self, portfolio, user_id: int, load: Callable[[], None]) -> None:
+        """
+        Loads a user's portfolio from their session, e.g. with `login_user`, and publishes it,
+        or, if another worker already shares the user's portfolio, replaces it with the shared one.
+
+        Args:
+            portfolio (PortfolioModel): This worker's portfolio.
+            user_id (int): The user logging in.
+            load (Callable[[], None]): Loads the user's session into `portfolio`.
+
+        Raises:
+            UserLoggedInError: If another user is logged in; `portfolio` then keeps their portfolio.
+        """
+        with self._write_lock:
+            active = self.client.get(self._active_key)
+            if active is not None and int(active) != user_id:
+                raise UserLoggedInError(f"User ID {int(active)} is logged in; they must log out first.")
+            load()
+            with portfolio.lock:
+                args = [user_id, repr(float(portfolio.funds)), repr(float(portfolio.realized_pnl)),
+                        len(portfolio.holding_stocks)]
+                for symbol, stock in portfolio.holding_stocks.items():
+                    args += [symbol, json.dumps(stock_document(stock))]
+                args += [json.dumps(asdict(entry)) for entry in portfolio.journal]
+            version = int(self._attach(keys=self._keys(user_id), args=args))
+            if version < 0:
+                # Another user logged in on another worker meanwhile; serve their portfolio again.
+                self.sync(portfolio)
+                raise UserLoggedInError("Another user logged in meanwhile; they must log out first.")
+            if version == 0:
+                self._versions[user_id] = 1
+                logger.info("Shared the portfolio of user ID %s.", user_id)
+            else:
+                self._versions.pop(user_id, None)
+                self.sync(portfolio)
+
+    def sync(self, portfolio) -> bool:
+        """
+        Brings a portfolio up to date with Redis: reloads it if another worker changed it,
+        switches it to the user logged in on another worker, or clears it if its user
+        logged out on another worker.
+
+        Args:
+            portfolio (PortfolioModel): This worker's portfolio.
+
+        Returns:
+            bool: True if the portfolio is shared, False if nobody is logged in through Redis.
+        """
+        active = self._peek(keys=[self._active_key], args=[self.prefix])
+        user_id = portfolio.userID
+        if not active or active[1] is None:
+            if user_id in self._versions:
+                # Shared until now, so its user logged out elsewhere and the session is saved.
+                self._versions.pop(user_id)
+                with portfolio.lock:
+                    portfolio.clear_all_stocks()
+                    portfolio.userID = None
+                logger.info("User ID %s logged out on another worker.", user_id)
+            return False
+        active_user, version = int(active[0]), int(active[1])
+        if active_user == user_id and version == self._versions.get(user_id):
+            return True
+
+        state_key, positions_key, journal_key, _ = self._keys(active_user)
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.hgetall(state_key)
+        pipeline.hgetall(positions_key)
+        pipeline.lrange(journal_key, 0, -1)
+        state, positions, journal = pipeline.execute()
+        if not state:
+            return False
+
+        with portfolio.lock:
+            portfolio.clear_all_stocks()
+            portfolio.userID = active_user
+            portfolio.profile_charge_funds(float(state[b"funds"]))
+            for document in positions.values():
+                portfolio.load_stock(stock_from_document(json.loads(document)))
+            # Restoring funds above is not a deposit; the shared journal replaces what it recorded.
+            portfolio.load_journal([json.loads(entry) for entry in journal])
+            portfolio.load_realized_pnl(float(state[b"realized_pnl"]))
+        self._versions.pop(user_id, None)
+        self._versions[active_user] = int(state[b"version"])
+        logger.info("Reloaded the shared portfolio of user ID %s at version %s.", active_user, int(state[b"version"]))
+        return True
+
+    def update(self, portfolio, action: Callable[..., Any], prepare: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Runs a change to a portfolio and commits it to Redis atomically.
+
+        Args:
+            portfolio (PortfolioModel): This worker's portfolio.
+            action (Callable[..., Any]): Applies the change, e.g. a buy, to `portfolio` without
+                any upstream call; it is run again on the reloaded portfolio after a conflict.
+                Takes what `prepare` returned if `prepare` is given.
+            prepare (Callable[[], Any], optional): Fetches what the change needs, e.g. a quote.
+                Runs once, before the lock is taken and the shared version is read.
+
+        Returns:
+            Any: What the action returned.
+
+        Raises:
+            PortfolioConflictError: If the change conflicted with other workers on every attempt.
+            ValueError: If the user logged out on another worker meanwhile.
+            Exception: Whatever `prepare` or the action raised; nothing is committed then.
+        """
+        if prepare is not None:
+            prepared = prepare()
+            apply = lambda: action(prepared)
+        else:
+            apply = action
+        with self._write_lock:
+            for attempt in range(self.retries + 1):
+                if not self.sync(portfolio):
+                    return apply()
+                user_id = portfolio.userID
+                expected = self._versions[user_id]
+                with portfolio.lock:
+                    positions, funds, realized_pnl = self._positions(portfolio), portfolio.funds, portfolio.realized_pnl
+                    journal = portfolio.journal
+                    journal_length = len(journal)
+
+                result = apply()
+
+                with portfolio.lock:
+                    after = self._positions(portfolio)
+                    changed = sorted(symbol for symbol in positions.keys() | after.keys()
+                                     if positions.get(symbol) != after.get(symbol))
+                    # Changes append to the journal; clearing the portfolio replaces it.
+                    replace = portfolio.journal is not journal or len(portfolio.journal) < journal_length
+                    if not (changed or replace or len(portfolio.journal) > journal_length
+                            or portfolio.funds != funds or portfolio.realized_pnl != realized_pnl):
+                        return result
+                    args = [expected, repr(float(portfolio.funds)), repr(float(portfolio.realized_pnl)),
+                            int(replace), len(changed)]
+                    for symbol in changed:
+                        stock = portfolio.holding_stocks.get(symbol)
+                        args += [symbol, "" if stock is None else json.dumps(stock_document(stock))]
+                    new_entries = portfolio.journal if replace else portfolio.journal[journal_length:]
+                    args += [json.dumps(asdict(entry)) for entry in new_entries]
+
+                version = int(self._commit(keys=self._keys(user_id)[:3], args=args))
+                if version > 0:
+                    self._versions[user_id] = version
+                    return result
+                # Mark the uncommitted change stale; the next sync reloads or clears the portfolio.
+                self._versions[user_id] = 0
+                if version == NOT_SHARED:
+                    self.sync(portfolio)
+                    raise ValueError(f"User ID {user_id} is no longer logged in.")
+                logger.info("Portfolio update for user ID %s conflicted (attempt %d).", user_id, attempt + 1)
+            self.sync(portfolio)
+            raise PortfolioConflictError("The portfolio was changed concurrently; retry the request.")
+
+    def lead(self, role: str, ttl: float) -> bool:
+        """
+        Elects one worker for a role, e.g. polling quotes upstream, through a lease in Redis.
+        The elected worker keeps the role while it renews the lease within `ttl`; once it
+        stops, another worker takes over.
+
+        Args:
+            role (str): Name of the role.
+            ttl (float): Seconds the lease is held without renewal.
+
+        Returns:
+            bool: True if this worker holds the role.
+        """
+        return bool(int(self._lease(keys=[f"{self.prefix}:lease:{role}"],
+                                    args=[self._worker_id, max(1, int(ttl * 1000))])))
+
+    def release(self, portfolio, user_id: int, save: Callable[[], None]) -> None:
+        """
+        Saves a portfolio durably, e.g. with `logout_user`, then stops sharing it. If another
+        worker commits a change in between, the portfolio is reloaded and saved again.
+
+        Args:
+            portfolio (PortfolioModel): This worker's portfolio.
+            user_id (int): The user logging out.
+            save (Callable[[], None]): Persists `portfolio`.
+
+        Raises:
+            ValueError: If the user is not the one logged in; nothing is saved then.
+            PortfolioConflictError: If other workers kept changing the portfolio.
+        """
+        with self._write_lock:
+            for _ in range(self.retries + 1):
+                shared = self.sync(portfolio)
+                if portfolio.userID != user_id:
+                    raise ValueError(f"User ID {user_id} is not logged in.")
+                if not shared:
+                    save()
+                    return
+                version = self._versions.pop(user_id)
+                save()
+                if int(self._release(keys=self._keys(user_id), args=[version, user_id])):
+                    logger.info("Stopped sharing the portfolio of user ID %s.", user_id)
+                    return
+                # Saved a stale copy; mark it stale so the next sync reloads the shared one.
+                self._versions[user_id] = 0
+            raise PortfolioConflictError("The portfolio was changed concurrently; retry the logout.")
@@ -0,0 +1,273 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from stock_app.models.backtest_model import load_closes
+from stock_app.models.history_store_model import HistoryStore
+from stock_app.models.portfolio_model import PortfolioModel
+from stock_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+METHODS = ("bootstrap", "normal")
+# Upper bound on the return samples (paths x horizon x symbols) drawn at once by a shard,
+# which bounds each worker's memory at about 16 MB.
+SHARD_ELEMENTS = 2_000_000
+
+
+def log_returns(closes: np.ndarray, lookback: Optional[int] = None) -> np.ndarray:
+    """
+    Args:
+        closes (np.ndarray): Dates x symbols prices, oldest first, without gaps.
+        lookback (int, optional): Keep only the most recent `lookback` returns.
+
+    Returns:
+        np.ndarray: Daily log returns, one row fewer than `closes`.
+    """
+    returns = np.diff(np.log(closes), axis=0)
+    return returns[-lookback:] if lookback else returns
+
+
+def covariance_factor(returns: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Estimates the mean and a square root of the covariance of daily returns.
+
+    The factor comes from an eigendecomposition rather than a Cholesky one, so it also
+    exists when the covariance is singular, e.g. with fewer observations than symbols.
+
+    Args:
+        returns (np.ndarray): Observations x symbols returns.
+
+    Returns:
+        tuple: The mean returns, and a matrix `F` with `F @ F.T` equal to the covariance.
+    """
+    mean = returns.mean(axis=0)
+    covariance = np.atleast_2d(np.cov(returns, rowvar=False))
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    return mean, eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
+
+
+def simulate_shard(returns: np.ndarray, values: np.ndarray, method: str, paths: int, horizon: int,
+                   seed: np.random.SeedSequence) -> np.ndarray:
+    """
+    Simulates the profit and loss of a set of positions over a horizon, for one shard of paths.
+
+    Args:
+        returns (np.ndarray): Historical observations x symbols daily log returns.
+        values (np.ndarray): Current value of each position.
+        method (str): "bootstrap" resamples whole historical days, keeping their cross-symbol
+            correlation; "normal" draws from a multivariate normal fitted to the returns.
+        paths (int): Number of paths.
+        horizon (int): Days per path.
+        seed (np.random.SeedSequence): Seed of this shard's random stream.
+
+    Returns:
+        np.ndarray: The P&L of each path.
+    """
+    rng = np.random.default_rng(seed)
+    if method == "bootstrap":
+        days = rng.integers(0, len(returns), size=(paths, horizon))
+        totals = returns[days].sum(axis=1)
+    else:
+        # A sum of `horizon` independent normal days is one normal draw with scaled moments.
+        mean, factor = covariance_factor(returns)
+        totals = horizon * mean + np.sqrt(horizon) * rng.standard_normal((paths, len(values))) @ factor.T
+    return np.expm1(totals) @ values
+
+
+def _simulate_task(task: Tuple[np.ndarray, np.ndarray, str, int, int, np.random.SeedSequence]) -> np.ndarray:
+    return simulate_shard(*task)
+
+
+class RiskSimulator:
+    """
+    Runs Monte Carlo simulations sharded across a pool of worker processes.
+
+    Paths are split into shards of bounded size, each with its own child seed, so results
+    depend on the seed and path count but not on how many workers ran them. The pool is
+    started on first use and reused by later requests; its workers are spawned rather
+    than forked, since the app process runs threads.
+
+    Attributes:
+        workers (int): Worker processes; 1 runs every shard in the calling thread.
+        min_parallel_paths (int): Simulations with fewer paths run in the calling thread.
+    """
+
+    def __init__(self, workers: int = 1, min_parallel_paths: int = 20000):
+        self.workers = max(1, workers)
+        self.min_parallel_paths = min_parallel_paths
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def shutdown(self) -> None:
+        """Stops the worker processes, if any were started."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def simulate(self, returns: np.ndarray, values: np.ndarray, method: str = "bootstrap", paths: int = 10000,
+                 horizon: int = 1, seed: Optional[int] = None) -> np.ndarray:
+        """
+        Args:
+            returns (np.ndarray): Historical observations x symbols daily log returns.
+            values (np.ndarray): Current value of each position.
+            method (str, optional): "bootstrap" or "normal".
+            paths (int, optional): Number of paths.
+            horizon (int, optional): Days per path.
+            seed (int, optional): Seed for reproducible results.
+
+        Returns:
+            np.ndarray: The P&L of each path.
+
+        Raises:
+            ValueError: If the method is unknown, or paths, horizon or the history are empty.
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown method: {method}. Expected one of {', '.join(METHODS)}.")
+        if paths < 1 or horizon < 1:
+            raise ValueError("Paths and horizon must be at least 1.")
+        if len(returns) < 2:
+            raise ValueError("At least two daily returns are required.")
+
+        shard_paths = max(1, SHARD_ELEMENTS // (horizon * len(values)))
+        sizes = [min(shard_paths, paths - start) for start in range(0, paths, shard_paths)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        tasks = [(returns, values, method, size, horizon, shard_seed) for size, shard_seed in zip(sizes, seeds)]
+
+        if self.workers == 1 or paths < self.min_parallel_paths or len(tasks) == 1:
+            shards = [simulate_shard(*task) for task in tasks]
+        else:
+            shards = list(self._executor().map(_simulate_task, tasks))
+        return np.concatenate(shards)
+
+
+def value_at_risk(pnl: np.ndarray, confidence: float) -> Tuple[float, float]:
+    """
+    Args:
+        pnl (np.ndarray): Simulated profit and loss per path.
+        confidence (float): Confidence level, e.g. 0.95.
+
+    Returns:
+        tuple: The value at risk and the expected shortfall, as positive losses.
+    """
+    threshold = np.quantile(pnl, 1.0 - confidence)
+    tail = pnl[pnl <= threshold]
+    return float(-threshold), float(-tail.mean())
+
+
+def parse_shocks(text: Optional[str]) -> Dict[str, float]:
+    """
+    Parses what-if shocks given as "SYMBOL:return" pairs, e.g. "AAPL:-0.2,MSFT:-0.1".
+
+    Args:
+        text (str, optional): The comma-separated pairs.
+
+    Returns:
+        Dict[str, float]: The return applied to each symbol.
+
+    Raises:
+        ValueError: If a pair is malformed or a return is below -1.
+    """
+    shocks = {}
+    for pair in filter(None, (part.strip() for part in (text or "").split(","))):
+        symbol, separator, value = pair.partition(":")
+        try:
+            shock = float(value)
+        except ValueError:
+            separator = ""
+        if not separator or not symbol:
+            raise ValueError(f"Invalid shock: {pair}. Expected SYMBOL:return, e.g. AAPL:-0.2.")
+        if shock < -1:
+            raise ValueError(f"Invalid shock: {pair}. A price cannot fall more than 100%.")
+        shocks[symbol.strip().upper()] = shock
+    return shocks
+
+
+def portfolio_risk(portfolio: PortfolioModel, store: HistoryStore, simulator: RiskSimulator,
+                   paths: int = 10000, horizon: int = 1, confidence: float = 0.95, method: str = "bootstrap",
+                   size: str = "full", lookback: int = 252, seed: Optional[int] = None,
+                   shocks: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Estimates the value at risk and expected shortfall of a portfolio's current holdings.
+
+    Positions are valued at their current price (or the last stored close if it has none),
+    and their joint daily returns over the lookback window drive the simulation. Optional
+    what-if shocks are applied as one-off returns to the named holdings.
+
+    Args:
+        portfolio (PortfolioModel): The portfolio.
+        store (HistoryStore): Store serving the daily closes.
+        simulator (RiskSimulator): Runs the paths.
+        paths (int, optional): Number of simulated paths.
+        horizon (int, optional): Horizon in trading days.
+        confidence (float, optional): Confidence level, between 0.5 and 1.
+        method (str, optional): "bootstrap" or "normal".
+        size (str, optional): History window to load, 'compact' or 'full'.
+        lookback (int, optional): Most recent daily returns used.
+        seed (int, optional): Seed for reproducible results.
+        shocks (Dict[str, float], optional): What-if returns by symbol.
+
+    Returns:
+        dict: `symbols`, position `values` and total `value`, the simulation settings, `var`
+        and `expected_shortfall` in currency and as a fraction of the value, and for shocks,
+        the `scenario_pnl`.
+
+    Raises:
+        ValueError: If a parameter is invalid or a symbol's history cannot be loaded.
+    """
+    if not 0.5 <= confidence < 1:
+        raise ValueError("Confidence must be at least 0.5 and below 1.")
+    if lookback < 2:
+        raise ValueError("Lookback must be at least 2 days.")
+    # History and shocks are keyed by upper-case symbol, whatever case the holding was bought in.
+    positions: Dict[str, Tuple[int, Optional[float]]] = {}
+    with portfolio.lock:
+        for symbol, stock in portfolio.holding_stocks.items():
+            if stock.quantity > 0:
+                quantity, _ = positions.get(symbol.upper(), (0, None))
+                positions[symbol.upper()] = (quantity + stock.quantity, stock.current_price)
+    shocks = {symbol.upper(): shock for symbol, shock in (shocks or {}).items()}
+    unknown = sorted(set(shocks) - set(positions))
+    if unknown:
+        raise ValueError(f"Shocked symbols are not held: {', '.join(unknown)}")
+
+    result: Dict[str, Any] = {"method": method, "paths": paths, "horizon_days": horizon, "confidence": confidence}
+    if not positions:
+        return {**result, "symbols": [], "values": [], "value": 0.0, "var": 0.0, "expected_shortfall": 0.0,
+                "var_pct": 0.0, "expected_shortfall_pct": 0.0}
+
+    symbols, _, closes = load_closes(store, list(positions), size)
+    values = np.array([positions[symbol][0] * (positions[symbol][1] or closes[-1, j])
+                       for j, symbol in enumerate(symbols)])
+    returns = log_returns(closes, lookback)
+    pnl = simulator.simulate(returns, values, method=method, paths=paths, horizon=horizon, seed=seed)
+    var, shortfall = value_at_risk(pnl, confidence)
+    value = float(values.sum())
+    logger.info("Simulated %d paths over %d symbols: VaR %.2f, ES %.2f.", paths, len(symbols), var, shortfall)
+
+    result.update({
+        "symbols": symbols,
+        "values": values.tolist(),
+        "value": value,
+        "var": var,
+        "expected_shortfall": shortfall,
+        "var_pct": var / value if value else 0.0,
+        "expected_shortfall_pct": shortfall / value if value else 0.0,
+    })
+    if shocks:
+        result["scenario_pnl"] = float(sum(values[j] * shocks.get(symbol, 0.0) for j, symbol in enumerate(symbols)))
+    return result
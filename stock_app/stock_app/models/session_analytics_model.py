@@ -0,0 +1,211 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from pymongo import ASCENDING, DESCENDING
+
+from stock_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# The session's positions with shares, as {k: symbol, v: saved stock} pairs. Symbols are
+# reported in upper case, as `held_symbols` stores them, whatever case they were bought in.
+_POSITIONS = {
+    "$filter": {
+        "input": {"$objectToArray": {"$ifNull": ["$stock_holdings", {}]}},
+        "as": "position",
+        "cond": {"$gt": ["$$position.v.quantity", 0]},
+    }
+}
+
+
+def summary_pipeline(top: int) -> List[Dict[str, Any]]:
+    """
+    Args:
+        top (int): Number of most-held symbols to return.
+
+    Returns:
+        List[dict]: An aggregation pipeline over the sessions that yields one document with
+        the `totals` (users, funds, holdings value) and the `top_symbols` by number of holders.
+    """
+    return [
+        {"$project": {
+            "funds": {"$ifNull": ["$funds", 0.0]},
+            "positions": {"$map": {"input": _POSITIONS, "as": "position", "in": {
+                "symbol": {"$toUpper": "$$position.k"},
+                "quantity": "$$position.v.quantity",
+                "value": {"$multiply": ["$$position.v.quantity", "$$position.v.current_price"]},
+            }}},
+        }},
+        {"$facet": {
+            "totals": [{"$group": {
+                "_id": None,
+                "users": {"$sum": 1},
+                "funds": {"$sum": "$funds"},
+                "holdings_value": {"$sum": {"$sum": "$positions.value"}},
+            }}],
+            "top_symbols": [
+                {"$unwind": "$positions"},
+                # One row per session and symbol, so positions differing only in case count one holder.
+                {"$group": {
+                    "_id": {"session": "$_id", "symbol": "$positions.symbol"},
+                    "shares": {"$sum": "$positions.quantity"},
+                    "value": {"$sum": "$positions.value"},
+                }},
+                {"$group": {
+                    "_id": "$_id.symbol",
+                    "holders": {"$sum": 1},
+                    "shares": {"$sum": "$shares"},
+                    "value": {"$sum": "$value"},
+                }},
+                {"$sort": {"holders": -1, "value": -1, "_id": 1}},
+                {"$limit": top},
+            ],
+        }},
+    ]
+
+
+class SessionAnalytics:
+    """
+    Cross-user analytics over the saved sessions, computed by MongoDB.
+
+    Assets under management and the most-held symbols come from one aggregation
+    pipeline, and the holders of a symbol from the multikey index on the `held_symbols`
+    array that `logout_user` writes, so no session is loaded into Python.
+
+    Results are cached with the sessions' watermark, the latest `updated_at` and the
+    session count, both read from indexes. A result is recomputed only once the
+    watermark has moved, and the watermark is checked at most every `refresh_interval`
+    seconds, so polling an unchanged dashboard costs no aggregation.
+
+    Attributes:
+        collection: The sessions collection.
+        refresh_interval (float): Seconds a result is served without checking the watermark.
+        max_entries (int): Maximum number of cached results; least recently used are evicted.
+    """
+
+    def __init__(self, collection, refresh_interval: float = 60.0, max_entries: int = 256,
+                 clock: Callable[[], float] = time.time):
+        self.collection = collection
+        self.refresh_interval = refresh_interval
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._prepared = False
+        self._results: "OrderedDict[Hashable, Tuple[Any, Tuple, float]]" = OrderedDict()
+        self._computed = 0
+
+    def prepare(self) -> None:
+        """
+        Creates the supporting indexes and fills `held_symbols` and `updated_at` on sessions
+        saved before they were written. Runs once; later calls return immediately.
+        """
+        if self._prepared:
+            return
+        self.collection.create_index([("user_id", ASCENDING)])
+        self.collection.create_index([("held_symbols", ASCENDING), ("user_id", ASCENDING)])
+        self.collection.create_index([("updated_at", DESCENDING)])
+        # An update pipeline, so the backfill also runs inside MongoDB.
+        result = self.collection.update_many(
+            {"held_symbols": {"$exists": False}},
+            [{"$set": {
+                "held_symbols": {"$setUnion": [
+                    {"$map": {"input": _POSITIONS, "as": "position", "in": {"$toUpper": "$$position.k"}}}, []]},
+                "updated_at": {"$divide": [{"$toLong": "$$NOW"}, 1000]},
+            }}],
+        )
+        if result.modified_count:
+            logger.info("Backfilled held symbols of %d sessions.", result.modified_count)
+        self._prepared = True
+
+    def _watermark(self) -> Tuple:
+        """The latest session update time and the session count."""
+        latest = self.collection.find_one({}, {"_id": 0, "updated_at": 1}, sort=[("updated_at", DESCENDING)])
+        return (latest or {}).get("updated_at"), self.collection.estimated_document_count()
+
+    def _cached(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Returns the cached result for a key, recomputing it if the sessions changed."""
+        now = self._clock()
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None:
+                self._results.move_to_end(key)
+                if now - entry[2] < self.refresh_interval:
+                    return entry[0]
+        self.prepare()
+        watermark = self._watermark()
+        recompute = entry is None or entry[1] != watermark
+        value = compute() if recompute else entry[0]
+        with self._lock:
+            self._computed += recompute
+            self._results[key] = (value, watermark, now)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return value
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """
+        Args:
+            top (int, optional): Number of most-held symbols to return.
+
+        Returns:
+            dict: The number of `users`, their uninvested `funds`, the `holdings_value`, the
+            `aum` (funds plus holdings) and the `top_symbols`, each with its number of
+            `holders`, `shares` and `value`, most held first.
+
+        Raises:
+            ValueError: If `top` is not positive.
+        """
+        if top < 1:
+            raise ValueError("top must be at least 1.")
+
+        def compute() -> Dict[str, Any]:
+            result = next(self.collection.aggregate(summary_pipeline(top)), {})
+            totals = (result.get("totals") or [{}])[0]
+            funds, holdings_value = totals.get("funds", 0.0), totals.get("holdings_value", 0.0)
+            return {
+                "users": totals.get("users", 0),
+                "funds": funds,
+                "holdings_value": holdings_value,
+                "aum": funds + holdings_value,
+                "top_symbols": [{"symbol": row["_id"], "holders": row["holders"], "shares": row["shares"],
+                                 "value": row["value"]} for row in result.get("top_symbols", [])],
+            }
+        return self._cached(("summary", top), compute)
+
+    def holders(self, symbol: str, limit: int = 100) -> Dict[str, Any]:
+        """
+        Args:
+            symbol (str): The stock ticker symbol.
+            limit (int, optional): Maximum number of user IDs to return.
+
+        Returns:
+            dict: The `symbol`, the `count` of sessions holding it, and up to `limit` of
+            their `user_ids` in ascending order.
+
+        Raises:
+            ValueError: If `limit` is not positive.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1.")
+        symbol = symbol.strip().upper()
+
+        def compute() -> Dict[str, Any]:
+            query = {"held_symbols": symbol}
+            cursor = self.collection.find(query, {"_id": 0, "user_id": 1}).sort("user_id", ASCENDING).limit(limit)
+            return {"symbol": symbol, "count": self.collection.count_documents(query),
+                    "user_ids": [document["user_id"] for document in cursor]}
+        return self._cached(("holders", symbol, limit), compute)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            dict: The number of cached results and of aggregations run so far.
+        """
+        with self._lock:
+            return {"cached_results": len(self._results), "computed": self._computed}
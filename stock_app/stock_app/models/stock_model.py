@@ -1,5 +1,9 @@
-from typing import List, Dict
-from dataclasses import dataclass
+from array import array
+from collections import deque
+import datetime
+import math
+from typing import Deque, Dict, Iterator, List, Optional
+from dataclasses import dataclass, field
 
 from alpha_vantage.timeseries import TimeSeries
 from alpha_vantage.fundamentaldata import FundamentalData
@@ -11,6 +15,32 @@ import logging
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
+# Start of the error Alpha Vantage returns for symbols it does not know.
+INVALID_CALL = "Invalid API call"
+MARKET_CAP_SUFFIXES = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+
+
+def parse_market_cap(market_cap: Optional[str]) -> Optional[float]:
+    """
+    Parses a market capitalization into dollars.
+
+    Args:
+        market_cap (str, optional): Digits as reported by the company overview, e.g.
+            "2500000000000", optionally with a K, M, B or T suffix, e.g. "2.5T".
+
+    Returns:
+        float or None: The market cap, or None if it is missing ("None", "-", "") or invalid.
+    """
+    text = str(market_cap or "").strip().replace(",", "").upper()
+    scale = MARKET_CAP_SUFFIXES.get(text[-1:], 1.0)
+    if scale != 1.0:
+        text = text[:-1]
+    try:
+        value = float(text) * scale
+    except ValueError:
+        return None
+    return value if math.isfinite(value) and value >= 0 else None
+
 
 @dataclass
 class Stock:
@@ -23,12 +53,19 @@ class Stock:
         description (str): A brief description of the company.
         sector (str): The sector to which the company belongs.
         industry (str): The industry of the company.
-        market_cap (str): The company's market capitalization.
+        market_cap (str): The company's market capitalization, as reported.
         quantity (int): The number of shares held (default is 0).
+        lots (Deque[List]): Open purchase lots as [shares, price per share], oldest first.
+            Shares held without lots are opened as one lot at `current_price`.
+        realized_pnl (float): Gains realized by sales of this stock.
+        cost_basis (float): Total purchase cost of the open lots, kept in step with `lots`.
+        market_cap_value (float): `market_cap` parsed into dollars once, at construction;
+            None if it is unknown. Sort, filter and bucket by this rather than the string.
 
     Raises:
         ValueError: If `current_price` is negative.
         ValueError: If `quantity` is negative.
+        ValueError: If the lots hold more or fewer shares than `quantity`.
     """
     symbol: str
     name: str
@@ -38,13 +75,97 @@ class Stock:
     industry: str
     market_cap: str
     quantity: int
+    lots: Deque[List] = field(default_factory=deque)
+    realized_pnl: float = 0.0
+    cost_basis: float = field(init=False, default=0.0)
+    market_cap_value: Optional[float] = field(init=False, default=None)
+
+    COST_METHODS = ("fifo", "average")
 
     def __post_init__(self):
         if self.current_price < 0:
             raise ValueError(f"Price must be non-negative, got {self.price}")
         if self.quantity < 0:
             raise ValueError(f"Quantity must be non-negative, got {self.quantity}")
-        
+        self.lots = deque([int(shares), float(price)] for shares, price in self.lots)
+        if self.quantity and not self.lots:
+            self.lots.append([self.quantity, float(self.current_price)])
+        if sum(shares for shares, _ in self.lots) != self.quantity:
+            raise ValueError(f"Lots must add up to the quantity, got {self.quantity} shares")
+        self.cost_basis = sum(shares * price for shares, price in self.lots)
+        self.market_cap_value = parse_market_cap(self.market_cap)
+
+    @property
+    def average_cost(self) -> float:
+        """Average purchase price of the shares held, 0.0 when none are."""
+        return self.cost_basis / self.quantity if self.quantity else 0.0
+
+    @property
+    def unrealized_pnl(self) -> float:
+        """Gain on the shares held if they were sold at `current_price`."""
+        return self.current_price * self.quantity - self.cost_basis
+
+    def add_lot(self, quantity: int, price: float) -> None:
+        """
+        Records a purchase of shares.
+
+        Args:
+            quantity (int): The number of shares bought.
+            price (float): The price paid per share.
+        """
+        self.lots.append([quantity, float(price)])
+        self.quantity += quantity
+        self.cost_basis += quantity * price
+
+    def remove_shares(self, quantity: int, price: float, method: str = "fifo") -> float:
+        """
+        Records a sale of shares and realizes its gain against the open lots.
+
+        With "fifo" the oldest lots are consumed first and popped off the front of the
+        deque, so a sale costs one step per lot it closes, however many stay open. With "average" the remaining shares collapse into
+        one lot at the average cost, in constant time.
+
+        Args:
+            quantity (int): The number of shares sold.
+            price (float): The price received per share.
+            method (str, optional): Cost basis method, "fifo" or "average".
+
+        Returns:
+            float: The gain realized by the sale.
+
+        Raises:
+            ValueError: If more shares are sold than held, or the method is unknown.
+        """
+        if quantity > self.quantity:
+            raise ValueError(f"Not enough shares to sell. Owned: {self.quantity}, Requested: {quantity}")
+        if method == "average":
+            cost = self.average_cost * quantity
+            remaining = self.quantity - quantity
+            self.lots = deque([[remaining, (self.cost_basis - cost) / remaining]] if remaining else [])
+        elif method == "fifo":
+            cost, left = 0.0, quantity
+            while left:
+                lot = self.lots[0]
+                taken = min(lot[0], left)
+                cost += taken * lot[1]
+                lot[0] -= taken
+                left -= taken
+                if not lot[0]:
+                    self.lots.popleft()
+        else:
+            raise ValueError(f"Unknown cost basis method: {method}. Expected one of {', '.join(self.COST_METHODS)}.")
+
+        self.quantity -= quantity
+        # Reset rather than subtract once flat, so rounding errors do not accumulate.
+        self.cost_basis = self.cost_basis - cost if self.lots else 0.0
+        realized = price * quantity - cost
+        self.realized_pnl += realized
+        return realized
+
+
+
+class UnknownSymbolError(ValueError):
+    """Raised when the upstream API has no data for a symbol, as opposed to failing to answer."""
 
 
 def lookup_stock(symbol: str, ts: TimeSeries, fd: FundamentalData) -> dict:
@@ -58,20 +179,21 @@ def lookup_stock(symbol: str, ts: TimeSeries, fd: FundamentalData) -> dict:
 
     Returns:
         dict: A dictionary containing stock details such as symbol, name, description, 
-        sector, industry, market capitalization, and current price.
+        sector, industry, market capitalization (as reported and parsed into
+        `market_cap_value`), and current price.
 
     Raises:
-        ValueError: If the stock symbol is invalid or no data is retrieved.
-        Exception: For API or unexpected errors.
+        UnknownSymbolError: If no data is retrieved for the symbol.
+        ValueError: For API or unexpected errors.
     """
     try:
         overview_data = fd.get_company_overview(symbol)
-        if not overview_data or len(overview_data) < 2:
-            raise ValueError(f"No data found for symbol {symbol}")
+        if not overview_data or len(overview_data) < 2 or not overview_data[0]:
+            raise UnknownSymbolError(f"No data found for symbol {symbol}")
 
         price_data = ts.get_quote_endpoint(symbol=symbol)
         if not price_data or len(price_data) < 2 or "05. price" not in price_data[0]:
-            raise ValueError(f"No price data found for symbol {symbol}")
+            raise UnknownSymbolError(f"No price data found for symbol {symbol}")
 
         latest_price = float(price_data[0]["05. price"])
 
@@ -82,6 +204,7 @@ def lookup_stock(symbol: str, ts: TimeSeries, fd: FundamentalData) -> dict:
             "sector": overview_data[0].get("Sector"),
             "industry": overview_data[0].get("Industry"),
             "market_cap": overview_data[0].get("MarketCapitalization"),
+            "market_cap_value": parse_market_cap(overview_data[0].get("MarketCapitalization")),
             "current_price": latest_price,
         }
     except ValueError as ve:
@@ -92,6 +215,134 @@ def lookup_stock(symbol: str, ts: TimeSeries, fd: FundamentalData) -> dict:
         raise ValueError(f"Unexpected error: {str(e)}")
 
 
+def fetch_daily_bars(symbol: str, ts: TimeSeries, size: str) -> Dict[str, Dict[str, str]]:
+    """
+    Fetch the raw daily time series for a stock, without parsing it.
+
+    Args:
+        symbol (str): The stock ticker symbol.
+        ts (TimeSeries): An Alpha Vantage TimeSeries object for fetching stock data.
+        size (str): The size of the data set to retrieve ('compact' or 'full').
+
+    Returns:
+        Dict[str, Dict[str, str]]: The upstream mapping of date to price fields, newest first.
+
+    Raises:
+        UnknownSymbolError: If no historical data is found for the stock symbol.
+        ValueError: On API errors.
+    """
+    try:
+        data = ts.get_daily(symbol=symbol, outputsize=size)
+        if not data or len(data) < 2 or not data[0]:
+            raise UnknownSymbolError(f"No historical data found for symbol {symbol}")
+        return data[0]
+    except ValueError as ve:
+        logger.error(f"Validation error: {ve}")
+        # The time series endpoints answer unknown symbols with an "Invalid API call" error
+        if INVALID_CALL in str(ve) and not isinstance(ve, UnknownSymbolError):
+            raise UnknownSymbolError(f"No historical data found for symbol {symbol}") from ve
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error fetching historical stock data: {e}")
+        raise ValueError(f"Unexpected error: {str(e)}")
+
+
+def iter_daily_bars(bars: Dict[str, Dict[str, str]]) -> Iterator[Dict]:
+    """
+    Lazily parse a raw daily time series into price rows.
+
+    Rows are produced one at a time, so consumers such as streamed responses never hold
+    more than the row being written.
+
+    Args:
+        bars (Dict[str, Dict[str, str]]): The raw series, as returned by `fetch_daily_bars`.
+
+    Yields:
+        dict: The date, open, high, low, and close prices of one day.
+    """
+    for date, stats in bars.items():
+        yield {
+            "date": date,
+            "open": float(stats["1. open"]),
+            "high": float(stats["2. high"]),
+            "low": float(stats["3. low"]),
+            "close": float(stats["4. close"]),
+        }
+
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+@dataclass
+class PriceHistory:
+    """Columnar daily price history: one array per field instead of one dict per day.
+
+    Attributes:
+        symbol (str): The stock ticker symbol.
+        date (List[str]): ISO dates, newest first.
+        day (array): The same dates as days since 1970-01-01, as C ints.
+        open (array): Opening prices, as doubles.
+        high (array): Daily highs, as doubles.
+        low (array): Daily lows, as doubles.
+        close (array): Closing prices, as doubles.
+    """
+    symbol: str
+    date: List[str] = field(default_factory=list)
+    day: array = field(default_factory=lambda: array("i"))
+    open: array = field(default_factory=lambda: array("d"))
+    high: array = field(default_factory=lambda: array("d"))
+    low: array = field(default_factory=lambda: array("d"))
+    close: array = field(default_factory=lambda: array("d"))
+
+    PRICE_FIELDS = ("open", "high", "low", "close")
+
+    def __len__(self) -> int:
+        return len(self.date)
+
+
+def daily_bar_columns(symbol: str, bars: Dict[str, Dict[str, str]]) -> PriceHistory:
+    """
+    Parse a raw daily time series straight into columns, without building per-row dicts.
+
+    Args:
+        symbol (str): The stock ticker symbol.
+        bars (Dict[str, Dict[str, str]]): The raw series, as returned by `fetch_daily_bars`.
+
+    Returns:
+        PriceHistory: The parsed history, newest first.
+    """
+    history = PriceHistory(symbol=symbol, date=list(bars))
+    history.day.extend(datetime.date.fromisoformat(day).toordinal() - EPOCH_ORDINAL for day in history.date)
+    opens, highs, lows, closes = history.open, history.high, history.low, history.close
+    for stats in bars.values():
+        opens.append(float(stats["1. open"]))
+        highs.append(float(stats["2. high"]))
+        lows.append(float(stats["3. low"]))
+        closes.append(float(stats["4. close"]))
+    return history
+
+
+def iter_historical_data(symbol: str, ts: TimeSeries, size: str) -> Iterator[Dict]:
+    """
+    Fetch historical price data for a stock and parse it lazily.
+
+    The upstream call and its validation happen immediately, so errors surface before
+    the first row is consumed; parsing happens as the rows are iterated.
+
+    Args:
+        symbol (str): The stock ticker symbol.
+        ts (TimeSeries): An Alpha Vantage TimeSeries object for fetching stock data.
+        size (str): The size of the data set to retrieve ('compact' or 'full').
+
+    Returns:
+        Iterator[dict]: The historical price rows, newest first.
+
+    Raises:
+        ValueError: If no historical data is found for the stock symbol, or on API errors.
+    """
+    return iter_daily_bars(fetch_daily_bars(symbol, ts, size))
+
+
 def stock_historical_data(symbol: str, ts: TimeSeries, size: str) -> list[dict]:
     """
     Fetch historical price data for a stock.
@@ -110,25 +361,11 @@ def stock_historical_data(symbol: str, ts: TimeSeries, size: str) -> list[dict]:
         Exception: For API or unexpected errors.
     """
     try:
-        data = ts.get_daily(symbol=symbol, outputsize=size)
-        if not data or len(data) < 2:
-            raise ValueError(f"No historical data found for symbol {symbol}")
-
-        historical_data = []
-        for date, stats in data[0].items():
-            historical_data.append({
-                "date": date,
-                "open": float(stats["1. open"]),
-                "high": float(stats["2. high"]),
-                "low": float(stats["3. low"]),
-                "close": float(stats["4. close"]),
-            })
-        return historical_data
-    except ValueError as ve:
-        logger.error(f"Validation error: {ve}")
+        return list(iter_historical_data(symbol, ts, size))
+    except ValueError:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error fetching historical stock data: {e}")
+        logger.error(f"Unexpected error parsing historical stock data: {e}")
         raise ValueError(f"Unexpected error: {str(e)}")
 
 
@@ -144,15 +381,15 @@ def get_latest_price(symbol: str, ts: TimeSeries) -> float:
         float: The latest market price of the stock.
 
     Raises:
-        ValueError: If no price data is found for the stock symbol.
-        Exception: For API or unexpected errors.
+        UnknownSymbolError: If no price data is found for the stock symbol.
+        ValueError: For API or unexpected errors.
     """
     try:
         data = ts.get_quote_endpoint(symbol=symbol)
-        if not data or len(data) < 2:
-            raise ValueError(f"No price data found for symbol {symbol}")
+        if not data or len(data) < 2 or "05. price" not in data[0]:
+            raise UnknownSymbolError(f"No price data found for symbol {symbol}")
 
-        return float(data[0].get("05. price", -1))
+        return float(data[0]["05. price"])
     except ValueError as ve:
         logger.error(f"Validation error: {ve}")
         raise
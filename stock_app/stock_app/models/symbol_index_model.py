@@ -0,0 +1,303 @@
+import bisect
+import csv
+import logging
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from stock_app.models.stock_model import UnknownSymbolError
+from stock_app.utils.cache import NegativeCache
+from stock_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Tickers with optional class or exchange suffixes, e.g. BRK.B, BF-B or TSCO.LON.
+SYMBOL_PATTERN = re.compile(r"[A-Z0-9][A-Z0-9.\-]{0,14}")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Args:
+        text (str): A company name or query.
+
+    Returns:
+        List[str]: Its lowercase alphanumeric words.
+    """
+    return _TOKEN.findall(text.lower())
+
+
+class _PrefixTrie:
+    """
+    Trie over keys where every node lists the symbols stored under it, best first.
+
+    Symbols are ranked by (length, symbol), so short primary tickers lead and an exact
+    symbol match is first; a prefix lookup is a walk down the trie plus a slice.
+    """
+
+    def __init__(self):
+        self._root: Dict = {}
+
+    @staticmethod
+    def _rank(symbol: str) -> Tuple[int, str]:
+        return len(symbol), symbol
+
+    def add(self, key: str, symbol: str) -> None:
+        entry = self._rank(symbol)
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+            ranked = node.setdefault("", [])
+            position = bisect.bisect_left(ranked, entry)
+            if position == len(ranked) or ranked[position] != entry:
+                ranked.insert(position, entry)
+
+    def remove(self, key: str, symbol: str) -> None:
+        entry = self._rank(symbol)
+        node = self._root
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                return
+            ranked = node[""]
+            position = bisect.bisect_left(ranked, entry)
+            if position < len(ranked) and ranked[position] == entry:
+                del ranked[position]
+
+    def find(self, prefix: str) -> List[Tuple[int, str]]:
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        return node.get("", [])
+
+
+class SymbolIndex:
+    """
+    Local index of ticker symbols and company names for search and autocomplete.
+
+    Symbols are found by prefix through one trie, and companies by the prefixes of the
+    words in their names through another. Lookups walk at most the query's length, so
+    they take microseconds regardless of the number of listings.
+
+    The index is filled from a listing file and from company overviews fetched by the
+    app. Once a listing file is loaded the index is treated as complete, and symbols
+    missing from it can be rejected without an upstream call.
+
+    Attributes:
+        complete (bool): True once a listing file has been loaded.
+    """
+
+    def __init__(self):
+        self.complete = False
+        self._names: Dict[str, str] = {}
+        self._exchanges: Dict[str, str] = {}
+        self._symbols = _PrefixTrie()
+        self._tokens = _PrefixTrie()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, symbol: str, name: str, exchange: str = "") -> None:
+        """
+        Adds or updates a listing.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            name (str): The company name.
+            exchange (str, optional): The exchange it is listed on.
+        """
+        symbol = symbol.strip().upper()
+        if not symbol:
+            return
+        with self._lock:
+            previous = self._names.get(symbol)
+            if previous == name and (not exchange or self._exchanges.get(symbol) == exchange):
+                return
+            if previous is None:
+                self._symbols.add(symbol, symbol)
+            else:
+                for token in set(tokenize(previous)) - set(tokenize(name)):
+                    self._tokens.remove(token, symbol)
+            for token in set(tokenize(name)):
+                self._tokens.add(token, symbol)
+            self._names[symbol] = name
+            if exchange or symbol not in self._exchanges:
+                self._exchanges[symbol] = exchange
+
+    def load_listing(self, path: str, active_only: bool = True) -> int:
+        """
+        Loads listings from a CSV file with `symbol` and `name` columns, and optionally
+        `exchange` and `status`, such as Alpha Vantage's LISTING_STATUS export.
+
+        Args:
+            path (str): Path of the CSV file.
+            active_only (bool, optional): Skip rows whose status is not "Active".
+
+        Returns:
+            int: The number of listings loaded.
+
+        Raises:
+            ValueError: If the file lacks the symbol or name column.
+        """
+        with open(path, newline="", encoding="utf-8") as listing:
+            reader = csv.DictReader(listing)
+            if not {"symbol", "name"} <= set(reader.fieldnames or ()):
+                raise ValueError(f"Listing file {path} needs symbol and name columns.")
+            count = 0
+            for row in reader:
+                if active_only and row.get("status", "Active") != "Active":
+                    continue
+                self.add(row["symbol"], row["name"], row.get("exchange") or "")
+                count += 1
+        self.complete = True
+        logger.info("Loaded %d listings from %s.", count, path)
+        return count
+
+    def exists(self, symbol: str) -> Optional[bool]:
+        """
+        Args:
+            symbol (str): The stock ticker symbol.
+
+        Returns:
+            bool or None: True if the symbol is indexed, False if it is not and the index is
+            complete, None if the index cannot tell.
+        """
+        if symbol.strip().upper() in self._names:
+            return True
+        return False if self.complete else None
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, str]]:
+        """
+        Finds listings whose symbol starts with the query, followed by those whose name has
+        words starting with every word of the query.
+
+        Args:
+            query (str): Symbol or company name prefix, e.g. "AAP" or "apple in".
+            limit (int, optional): Maximum number of results.
+
+        Returns:
+            List[dict]: Matches with `symbol`, `name` and `exchange`, best first.
+        """
+        query = query.strip()
+        if not query or limit < 1:
+            return []
+        with self._lock:
+            symbols = [symbol for _, symbol in self._symbols.find(query.upper())[:limit]]
+            if len(symbols) < limit:
+                candidates = sorted((self._tokens.find(token) for token in tokenize(query)), key=len)
+                if len(candidates) > 1:
+                    # Intersect in C rather than probing entry by entry, then restore the ranking.
+                    candidates[0] = sorted(set(candidates[0]).intersection(*candidates[1:]))
+                if candidates:
+                    seen = set(symbols)
+                    for _, symbol in candidates[0]:
+                        if symbol not in seen:
+                            symbols.append(symbol)
+                            if len(symbols) == limit:
+                                break
+            return [{"symbol": symbol, "name": self._names[symbol], "exchange": self._exchanges.get(symbol, "")}
+                    for symbol in symbols]
+
+    def suggest(self, symbol: str, limit: int = 5) -> List[str]:
+        """
+        Suggests indexed symbols for one that is not, from its leading characters.
+
+        Args:
+            symbol (str): The unknown symbol.
+            limit (int, optional): Maximum number of suggestions.
+
+        Returns:
+            List[str]: Suggested symbols.
+        """
+        symbol = symbol.strip().upper()
+        with self._lock:
+            for length in range(len(symbol), 0, -1):
+                ranked = self._symbols.find(symbol[:length])
+                if ranked:
+                    return [candidate for _, candidate in ranked[:limit]]
+        return []
+
+
+class SymbolGuard:
+    """
+    Rejects symbols that cannot exist before they cost an upstream call.
+
+    A symbol is rejected when it is malformed, when a complete listing is loaded and
+    lacks it, or when the API reported it unknown within the negative cache's TTL. Each
+    rejection is counted as an upstream call saved.
+
+    Attributes:
+        index (SymbolIndex): The listed symbols.
+        unknown (NegativeCache): Symbols the API recently reported unknown.
+    """
+
+    REASONS = ("malformed", "unlisted", "recently_unknown")
+
+    def __init__(self, index: SymbolIndex, unknown: NegativeCache):
+        self.index = index
+        self.unknown = unknown
+        self._lock = threading.Lock()
+        self._saved = dict.fromkeys(self.REASONS, 0)
+        self._reported = 0
+
+    def check(self, symbol: str) -> Optional[str]:
+        """
+        Args:
+            symbol (str): The stock ticker symbol.
+
+        Returns:
+            str or None: Why the symbol is rejected, or None if it may be looked up.
+        """
+        symbol = symbol.strip().upper()
+        if not SYMBOL_PATTERN.fullmatch(symbol):
+            reason, message = "malformed", f"Invalid symbol: {symbol}"
+        elif self.index.exists(symbol) is False:
+            reason, message = "unlisted", f"Unknown symbol: {symbol}"
+        elif symbol in self.unknown:
+            reason, message = "recently_unknown", f"Unknown symbol: {symbol}"
+        else:
+            return None
+        with self._lock:
+            self._saved[reason] += 1
+        return message
+
+    def report_unknown(self, symbol: str) -> None:
+        """Remembers a symbol the API has no data for."""
+        self.unknown.add(symbol.strip().upper())
+        with self._lock:
+            self._reported += 1
+        logger.info("Remembering unknown symbol %s.", symbol.upper())
+
+    def guarded(self, symbol: str, loader: Callable[[], Any]) -> Callable[[], Any]:
+        """
+        Args:
+            symbol (str): The stock ticker symbol.
+            loader (Callable[[], Any]): An upstream lookup for the symbol.
+
+        Returns:
+            Callable[[], Any]: The lookup, reporting the symbol if it raises UnknownSymbolError.
+        """
+        def load():
+            try:
+                return loader()
+            except UnknownSymbolError:
+                self.report_unknown(symbol)
+                raise
+        return load
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Upstream calls saved in total and per reason, unknown symbols reported by
+            the API, and how many are remembered.
+        """
+        with self._lock:
+            saved = dict(self._saved)
+            reported = self._reported
+        return {"saved_calls": sum(saved.values()), "saved_by_reason": saved,
+                "unknown_reported": reported, "unknown_remembered": len(self.unknown)}
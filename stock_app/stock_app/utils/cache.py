@@ -0,0 +1,193 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from stock_app.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class StaleWhileRevalidateCache:
+    """
+    In-memory cache serving the last known value while refreshing it in the background.
+
+    For each lookup the caller supplies how long a value counts as fresh and how stale
+    it may get before it must no longer be served:
+
+    - fresh values are returned as is;
+    - stale values within the bound are returned immediately and a single background
+      refresh is started for the key;
+    - missing or too-stale values block on the loader. Concurrent callers for the same
+      key share one load instead of each calling upstream.
+
+    A failed background refresh keeps the old value, so an upstream outage or rate limit
+    only surfaces once the value exceeds its staleness bound.
+
+    Attributes:
+        max_entries (int): Maximum number of cached keys; least recently used keys are evicted.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_workers: int = 4, clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="swr-refresh")
+
+    def get(self, key: Hashable, loader: Callable[[], Any], fresh_for: float, max_stale: float) -> Tuple[Any, float]:
+        """
+        Returns the value for a key, loading or revalidating it as needed.
+
+        Args:
+            key (Hashable): The cache key.
+            loader (Callable[[], Any]): Fetches a new value; may raise.
+            fresh_for (float): Seconds a value is served without revalidation.
+            max_stale (float): Maximum age in seconds a value may be served at.
+
+        Returns:
+            tuple: The value and its age in seconds.
+
+        Raises:
+            Exception: Whatever the loader raised, when no servable value exists.
+        """
+        value, fetched_at = self.get_entry(key, loader, fresh_for, max_stale)
+        return value, max(0.0, self._clock() - fetched_at)
+
+    def get_entry(self, key: Hashable, loader: Callable[[], Any], fresh_for: float,
+                  max_stale: float) -> Tuple[Any, float]:
+        """
+        Same as `get`, but returns the time the served value was fetched instead of its age.
+
+        Useful for validators such as Last-Modified, which must not change between
+        requests served from the same value.
+
+        Returns:
+            tuple: The value and the clock time it was fetched at.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = self._clock() - entry[1]
+                if age <= max_stale:
+                    self._entries.move_to_end(key)
+                    if age > fresh_for:
+                        self._start_load(key, loader, background=True)
+                    return entry
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._start_load(key, loader, background=False)
+
+        if owner:
+            self._load(key, loader, future)
+        return future.result()
+
+    def age(self, key: Hashable) -> Optional[float]:
+        """
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            float: Age in seconds of the cached value, or None if nothing is cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        return None if entry is None else max(0.0, self._clock() - entry[1])
+
+    def put(self, key: Hashable, value: Any) -> Tuple[Any, float]:
+        """
+        Stores a freshly fetched value.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value.
+
+        Returns:
+            tuple: The stored value and its fetch time.
+        """
+        with self._lock:
+            entry = self._entries[key] = (value, self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drops a key from the cache."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _start_load(self, key: Hashable, loader: Callable[[], Any], background: bool) -> Future:
+        """Registers an in-flight load for a key; must be called with the lock held."""
+        future = self._inflight.get(key)
+        if future is not None:
+            return future
+        future = self._inflight[key] = Future()
+        if background:
+            logger.debug("Revalidating %s in the background.", key)
+            self._executor.submit(self._load, key, loader, future)
+        return future
+
+    def _load(self, key: Hashable, loader: Callable[[], Any], future: Future) -> None:
+        try:
+            future.set_result(self.put(key, loader()))
+        except Exception as e:
+            logger.warning("Failed to load %s: %s", key, e)
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+class NegativeCache:
+    """
+    Remembers keys whose lookup failed for good, such as unknown symbols, for a while.
+
+    Entries expire after `ttl` seconds, so a key that becomes valid (a new listing) is
+    retried eventually. Beyond `max_entries` the oldest entries are evicted, which bounds
+    the memory a stream of random bad keys can take.
+
+    Attributes:
+        ttl (float): Seconds a failure is remembered.
+        max_entries (int): Maximum number of remembered keys.
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 10000, clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._expiries: "OrderedDict[Hashable, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._expiries)
+
+    def add(self, key: Hashable) -> None:
+        """Remembers a failed key, restarting its TTL."""
+        with self._lock:
+            self._expiries[key] = self._clock() + self.ttl
+            self._expiries.move_to_end(key)
+            while len(self._expiries) > self.max_entries:
+                self._expiries.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            expiry = self._expiries.get(key)
+            if expiry is None:
+                return False
+            if expiry <= self._clock():
+                del self._expiries[key]
+                return False
+            return True
+
+    def discard(self, key: Hashable) -> None:
+        """Forgets a key, e.g. once it is known to be valid."""
+        with self._lock:
+            self._expiries.pop(key, None)
@@ -0,0 +1,118 @@
+import io
+import logging
+from typing import Dict, Iterator
+
+from stock_app.models.stock_model import PriceHistory
+from stock_app.utils.logger import configure_logger
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - exercised only where pyarrow is absent
+    pyarrow = None
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# Export format to (MIME type, file extension).
+EXPORT_FORMATS: Dict[str, tuple] = {
+    "csv": ("text/csv", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+ARROW_FORMATS = ("arrow", "parquet")
+
+
+def export_available(output: str) -> bool:
+    """
+    Args:
+        output (str): An export format from `EXPORT_FORMATS`.
+
+    Returns:
+        bool: False if the format needs pyarrow and it is not installed.
+    """
+    return output not in ARROW_FORMATS or pyarrow is not None
+
+
+def iter_csv(history: PriceHistory, chunk_size: int = 5000) -> Iterator[bytes]:
+    """
+    Writes a price history as CSV, a chunk of rows at a time.
+
+    Prices use Python's shortest round-trip float formatting, so they read back exactly.
+
+    Args:
+        history (PriceHistory): The columnar history.
+        chunk_size (int, optional): Rows encoded per chunk.
+
+    Yields:
+        bytes: Consecutive pieces of the CSV document, starting with the header.
+    """
+    yield b"date,open,high,low,close\n"
+    prices = [getattr(history, name) for name in PriceHistory.PRICE_FIELDS]
+    for start in range(0, len(history), chunk_size):
+        end = start + chunk_size
+        # Format column by column; repr of a float is its shortest round-trip form
+        columns = [history.date[start:end]] + [list(map(repr, column[start:end])) for column in prices]
+        yield ("\n".join(map(",".join, zip(*columns))) + "\n").encode("ascii")
+
+
+def to_arrow_table(history: PriceHistory) -> "pyarrow.Table":
+    """
+    Builds an Arrow table from a price history.
+
+    The date and price columns wrap the existing arrays without copying them.
+
+    Args:
+        history (PriceHistory): The columnar history.
+
+    Returns:
+        pyarrow.Table: Columns date (date32), open, high, low and close (float64),
+        with the symbol in the schema metadata.
+
+    Raises:
+        RuntimeError: If pyarrow is not installed.
+    """
+    if pyarrow is None:
+        raise RuntimeError("pyarrow is required for Arrow and Parquet exports")
+    count = len(history)
+    columns = {"date": pyarrow.Array.from_buffers(pyarrow.date32(), count, [None, pyarrow.py_buffer(history.day)])}
+    for name in PriceHistory.PRICE_FIELDS:
+        buffer = pyarrow.py_buffer(getattr(history, name))
+        columns[name] = pyarrow.Array.from_buffers(pyarrow.float64(), count, [None, buffer])
+    table = pyarrow.table(columns)
+    return table.replace_schema_metadata({"symbol": history.symbol})
+
+
+def to_arrow_ipc(history: PriceHistory) -> bytes:
+    """
+    Serializes a price history in the Arrow IPC streaming format.
+
+    Args:
+        history (PriceHistory): The columnar history.
+
+    Returns:
+        bytes: The Arrow stream.
+    """
+    table = to_arrow_table(history)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def to_parquet(history: PriceHistory) -> bytes:
+    """
+    Serializes a price history as a compressed Parquet file.
+
+    Args:
+        history (PriceHistory): The columnar history.
+
+    Returns:
+        bytes: The Parquet file.
+    """
+    table = to_arrow_table(history)
+    sink = io.BytesIO()
+    pyarrow.parquet.write_table(table, sink, compression="zstd")
+    return sink.getvalue()
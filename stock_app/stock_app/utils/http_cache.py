@@ -0,0 +1,155 @@
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Any, Callable, ContextManager, Iterable, Optional, Tuple
+
+from flask import current_app, request, Response
+from werkzeug.http import is_resource_modified
+
+from stock_app.utils.json_provider import dumps_bytes, streamed_json_response, streamed_ndjson_response
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of serialized response bodies keyed by ETag.
+
+    An ETag identifies one version of one representation, so a cached body never needs
+    invalidating: once the underlying state changes, requests carry a new ETag and the
+    old body simply ages out.
+
+    Attributes:
+        max_entries (int): Maximum number of bodies kept.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._bodies: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def get(self, etag: str) -> Optional[bytes]:
+        """
+        Args:
+            etag (str): The representation's ETag.
+
+        Returns:
+            bytes: The cached body, or None.
+        """
+        with self._lock:
+            body = self._bodies.get(etag)
+            if body is not None:
+                self._bodies.move_to_end(etag)
+            return body
+
+    def put(self, etag: str, body: bytes) -> None:
+        """
+        Args:
+            etag (str): The representation's ETag.
+            body (bytes): The serialized body.
+        """
+        with self._lock:
+            self._bodies[etag] = body
+            self._bodies.move_to_end(etag)
+            while len(self._bodies) > self.max_entries:
+                self._bodies.popitem(last=False)
+
+
+def is_not_modified(etag: str, last_modified: float) -> bool:
+    """
+    Checks the current request's If-None-Match and If-Modified-Since headers.
+
+    Args:
+        etag (str): The current ETag, unquoted.
+        last_modified (float): The current last-modified time, as returned by `time.time()`.
+
+    Returns:
+        bool: True if the client's copy is still current.
+    """
+    modified = datetime.fromtimestamp(last_modified, tz=timezone.utc)
+    return not is_resource_modified(request.environ, etag=etag, last_modified=modified)
+
+
+def set_validators(response: Response, etag: str, last_modified: float) -> Response:
+    """Adds ETag, Last-Modified and revalidation headers to a response."""
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def conditional_json(cache: ResponseCache, state: Callable[[], Tuple[str, float]], render: Callable[[], Any],
+                     lock: Optional[ContextManager] = None, stream_key: Optional[str] = None) -> Response:
+    """
+    Builds a JSON response honoring If-None-Match and If-Modified-Since.
+
+    `state` and `render` run under `lock`, so the validators always describe the body
+    they are sent with. Serialization happens outside the lock and only on a cache miss;
+    unchanged state is answered with `304 Not Modified` without rendering anything.
+    If `stream_key` names a list of at least `JSON_STREAM_MIN_ITEMS` items, or a lazy
+    iterator, the body is streamed in chunks instead of being encoded whole, and is not cached.
+
+    Args:
+        cache (ResponseCache): Serialized bodies by ETag.
+        state (Callable[[], Tuple[str, float]]): Returns the current ETag and last-modified time.
+        render (Callable[[], Any]): Returns the JSON-serializable payload.
+        lock (ContextManager, optional): Guards the state being rendered.
+        stream_key (str, optional): Top-level payload field holding a potentially large list.
+
+    Returns:
+        Response: A 200 response with ETag and Last-Modified headers, or a 304.
+    """
+    with lock or nullcontext():
+        etag, last_modified = state()
+        if is_not_modified(etag, last_modified):
+            response = current_app.response_class(status=304)
+            body = data = None
+        else:
+            response = None
+            body = cache.get(etag)
+            data = render() if body is None else None
+
+    if response is None and body is None and stream_key is not None:
+        items = data.get(stream_key)
+        if items is not None and (not hasattr(items, "__len__")
+                                  or len(items) >= current_app.config.get("JSON_STREAM_MIN_ITEMS", 5000)):
+            envelope = {key: value for key, value in data.items() if key != stream_key}
+            response = streamed_json_response(current_app.json, envelope, stream_key, items)
+    if response is None:
+        if body is None:
+            body = dumps_bytes(current_app.json, data)
+            cache.put(etag, body)
+        response = current_app.response_class(body, status=200, mimetype="application/json")
+    return set_validators(response, etag, last_modified)
+
+
+def conditional_response(state: Callable[[], Tuple[str, float]], build: Callable[[], Response]) -> Response:
+    """
+    Builds any response honoring If-None-Match and If-Modified-Since.
+
+    Args:
+        state (Callable[[], Tuple[str, float]]): Returns the current ETag and last-modified time.
+        build (Callable[[], Response]): Builds the full response; only called on a 200.
+
+    Returns:
+        Response: The built response with ETag and Last-Modified headers, or a 304.
+    """
+    etag, last_modified = state()
+    if is_not_modified(etag, last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = build()
+    return set_validators(response, etag, last_modified)
+
+
+def conditional_ndjson(state: Callable[[], Tuple[str, float]], rows: Callable[[], Iterable[Any]]) -> Response:
+    """
+    Builds a streamed NDJSON response honoring If-None-Match and If-Modified-Since.
+
+    Args:
+        state (Callable[[], Tuple[str, float]]): Returns the current ETag and last-modified time.
+        rows (Callable[[], Iterable[Any]]): Returns the rows, ideally lazily; only called on a 200.
+
+    Returns:
+        Response: A streamed 200 response with ETag and Last-Modified headers, or a 304.
+    """
+    return conditional_response(state, lambda: streamed_ndjson_response(current_app.json, rows()))
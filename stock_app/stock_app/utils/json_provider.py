@@ -0,0 +1,194 @@
+import logging
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider
+
+from stock_app.utils.logger import configure_logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only where orjson is absent
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+class StandardJSONProvider(DefaultJSONProvider):
+    """
+    Flask's default JSON provider, except that deques, such as a Stock's lots, are written
+    as lists. Used when the fast provider is turned off.
+    """
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        if isinstance(o, deque):
+            return list(o)
+        return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(StandardJSONProvider):
+    """
+    JSON provider serializing with orjson when it is installed.
+
+    orjson natively handles dataclasses (such as Stock) and writes bytes directly, which is
+    several times faster than the standard library for large payloads like full price
+    histories. Dates and types it does not know fall back to the standard provider's
+    conversions, so documents are identical. Without orjson the provider behaves exactly
+    like `StandardJSONProvider`.
+    """
+
+    def __init__(self, app: Flask):
+        super().__init__(app)
+        if orjson is None:
+            logger.warning("orjson is not installed; falling back to the standard json module.")
+
+    def _orjson_options(self) -> int:
+        # Dates go through the default hook so they keep Flask's HTTP-date format.
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj: Any, **kwargs: Any) -> bytes:
+        """
+        Serializes an object to UTF-8 encoded JSON.
+
+        Args:
+            obj (Any): The object to serialize.
+
+        Returns:
+            bytes: The encoded JSON document.
+        """
+        if orjson is None or kwargs:
+            kwargs.setdefault("separators", (",", ":"))
+            return super().dumps(obj, **kwargs).encode("utf-8")
+        return orjson.dumps(obj, default=self.default, option=self._orjson_options())
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+
+def dumps_bytes(provider: DefaultJSONProvider, obj: Any) -> bytes:
+    """
+    Serializes an object with any JSON provider, avoiding a str round trip when it supports bytes.
+
+    Args:
+        provider (DefaultJSONProvider): The app's JSON provider, i.e. `app.json`.
+        obj (Any): The object to serialize.
+
+    Returns:
+        bytes: The encoded JSON document.
+    """
+    if isinstance(provider, FastJSONProvider):
+        return provider.dumps_bytes(obj)
+    return provider.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def iter_json_list(provider: DefaultJSONProvider, envelope: Dict[str, Any], key: str,
+                   items: Iterable[Any], chunk_size: int = 1000) -> Iterator[bytes]:
+    """
+    Serializes `{**envelope, key: [*items]}` incrementally, a chunk of items at a time.
+
+    Only one chunk of items is encoded at any moment, so peak memory does not grow with
+    the length of the list and `items` may be a lazy iterator.
+
+    Args:
+        provider (DefaultJSONProvider): The app's JSON provider, i.e. `app.json`.
+        envelope (Dict[str, Any]): The other top-level fields of the response object.
+        key (str): The field holding the list.
+        items (Iterable[Any]): The list items.
+        chunk_size (int, optional): Items serialized per chunk.
+
+    Yields:
+        bytes: Consecutive pieces of the JSON document.
+    """
+    head = dumps_bytes(provider, envelope).rstrip()[:-1].rstrip()
+    separator = b"," if envelope else b""
+    yield head + separator + dumps_bytes(provider, key) + b":["
+
+    first = True
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield _list_body(provider, chunk, first)
+            first = False
+            chunk = []
+    if chunk:
+        yield _list_body(provider, chunk, first)
+    yield b"]}"
+
+
+def _list_body(provider: DefaultJSONProvider, chunk: list, first: bool) -> bytes:
+    body = dumps_bytes(provider, chunk).strip()[1:-1].strip()
+    return body if first else b"," + body
+
+
+def streamed_json_response(provider: DefaultJSONProvider, envelope: Dict[str, Any], key: str,
+                           items: Iterable[Any], chunk_size: int = 1000,
+                           status: Optional[int] = 200) -> Response:
+    """
+    Builds a chunked JSON response for a list that may be too large to encode at once.
+
+    Args:
+        provider (DefaultJSONProvider): The app's JSON provider, i.e. `app.json`.
+        envelope (Dict[str, Any]): The other top-level fields of the response object.
+        key (str): The field holding the list.
+        items (Iterable[Any]): The list items.
+        chunk_size (int, optional): Items serialized per chunk.
+        status (int, optional): The HTTP status code.
+
+    Returns:
+        Response: A streamed `application/json` response.
+    """
+    return provider._app.response_class(iter_json_list(provider, envelope, key, items, chunk_size),
+                                        status=status, mimetype=provider.mimetype)
+
+
+def iter_ndjson(provider: DefaultJSONProvider, items: Iterable[Any]) -> Iterator[bytes]:
+    """
+    Serializes items as newline-delimited JSON, one compact document per line.
+
+    Args:
+        provider (DefaultJSONProvider): The app's JSON provider, i.e. `app.json`.
+        items (Iterable[Any]): The items.
+
+    Yields:
+        bytes: One encoded line per item.
+    """
+    for item in items:
+        yield dumps_bytes(provider, item).replace(b"\n", b"") + b"\n"
+
+
+def streamed_ndjson_response(provider: DefaultJSONProvider, items: Iterable[Any], status: Optional[int] = 200) -> Response:
+    """
+    Builds a streamed `application/x-ndjson` response; clients can process rows as they arrive.
+
+    Args:
+        provider (DefaultJSONProvider): The app's JSON provider, i.e. `app.json`.
+        items (Iterable[Any]): The rows.
+        status (int, optional): The HTTP status code.
+
+    Returns:
+        Response: The streamed response.
+    """
+    return provider._app.response_class(iter_ndjson(provider, items), status=status, mimetype=NDJSON_MIMETYPE)
@@ -0,0 +1,73 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket limiting calls to an upstream API.
+
+    Tokens refill continuously at `rate` per `per` seconds up to `burst`; each call
+    takes one token, waiting for it if none is available.
+
+    Attributes:
+        rate (float): Calls allowed per period.
+        per (float): The period in seconds.
+        burst (float): Maximum tokens that can accumulate.
+    """
+
+    def __init__(self, rate: float, per: float = 60.0, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0 or per <= 0:
+            raise ValueError("Rate and period must be positive.")
+        self.rate = rate
+        self.per = per
+        self.burst = rate if burst is None else burst
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = clock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate / self.per)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """
+        Takes a token if one is available.
+
+        Returns:
+            bool: True if the call may proceed.
+        """
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Takes a token, waiting until one is available.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait; waits indefinitely if None.
+
+        Returns:
+            bool: True if a token was taken, False on timeout.
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) * self.per / self.rate
+            if deadline is not None:
+                if now >= deadline:
+                    return False
+                wait = min(wait, deadline - now)
+            self._sleep(wait)
@@ -0,0 +1,180 @@
+import bisect
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class SortedIndex:
+    """
+    Items kept sorted by a key, for range scans in O(log n + k).
+
+    Each item appears at most once; adding it again moves it to its new key. Items with
+    equal keys are ordered by the item itself, so they must be comparable, e.g. ticker
+    symbols.
+
+    Entries are held in sorted chunks of at most twice `load` entries, each as parallel
+    key and item lists, with the last entry of every chunk listed separately. An insert
+    or removal shifts one chunk rather than the whole index, so building or re-keying
+    large indexes stays cheap, and bounds are found by bisecting the chunk maxima and
+    then one chunk's keys.
+    """
+
+    def __init__(self, load: int = 1000):
+        self._load = load
+        self._keys: List[List[Any]] = []
+        self._items: List[List[Hashable]] = []
+        self._maxes: List[Tuple[Any, Hashable]] = []
+        self._max_keys: List[Any] = []
+        self._key_of: Dict[Hashable, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._key_of)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._key_of
+
+    def _locate(self, key: Any, item: Hashable) -> Tuple[int, int]:
+        """Chunk and offset of (key, item), or where it would be inserted."""
+        if not self._maxes:
+            return 0, 0
+        chunk = bisect.bisect_left(self._maxes, (key, item))
+        if chunk == len(self._maxes):
+            chunk -= 1
+            return chunk, len(self._keys[chunk])
+        keys = self._keys[chunk]
+        start = bisect.bisect_left(keys, key)
+        end = bisect.bisect_right(keys, key, lo=start)
+        return chunk, bisect.bisect_left(self._items[chunk], item, lo=start, hi=end)
+
+    def _lower(self, key: Any) -> Tuple[int, int]:
+        """Chunk and offset of the first entry with a key of at least `key`."""
+        chunk = bisect.bisect_left(self._max_keys, key)
+        if chunk == len(self._max_keys):
+            return chunk, 0
+        return chunk, bisect.bisect_left(self._keys[chunk], key)
+
+    def _upper(self, key: Any) -> Tuple[int, int]:
+        """Chunk and offset of the first entry with a key above `key`."""
+        chunk = bisect.bisect_right(self._max_keys, key)
+        if chunk == len(self._max_keys):
+            return chunk, 0
+        return chunk, bisect.bisect_right(self._keys[chunk], key)
+
+    def _refresh_max(self, chunk: int) -> None:
+        self._maxes[chunk] = (self._keys[chunk][-1], self._items[chunk][-1])
+        self._max_keys[chunk] = self._keys[chunk][-1]
+
+    def add(self, key: Any, item: Hashable) -> None:
+        """
+        Indexes an item under a key, replacing its previous key.
+
+        Args:
+            key (Any): The sort key.
+            item (Hashable): The item.
+        """
+        if item in self._key_of:
+            if self._key_of[item] == key:
+                return
+            self.remove(item)
+        self._key_of[item] = key
+        if not self._maxes:
+            self._keys.append([key])
+            self._items.append([item])
+            self._maxes.append((key, item))
+            self._max_keys.append(key)
+            return
+        chunk, offset = self._locate(key, item)
+        keys, items = self._keys[chunk], self._items[chunk]
+        keys.insert(offset, key)
+        items.insert(offset, item)
+        if offset == len(keys) - 1:
+            self._refresh_max(chunk)
+        if len(keys) > 2 * self._load:
+            # Split the chunk in half so shifts stay bounded by the load.
+            self._keys[chunk + 1:chunk + 1] = [keys[self._load:]]
+            self._items[chunk + 1:chunk + 1] = [items[self._load:]]
+            del keys[self._load:], items[self._load:]
+            self._maxes.insert(chunk, (keys[-1], items[-1]))
+            self._max_keys.insert(chunk, keys[-1])
+
+    def remove(self, item: Hashable) -> None:
+        """
+        Drops an item, if indexed.
+
+        Args:
+            item (Hashable): The item.
+        """
+        if item not in self._key_of:
+            return
+        chunk, offset = self._locate(self._key_of.pop(item), item)
+        keys, items = self._keys[chunk], self._items[chunk]
+        del keys[offset], items[offset]
+        if not keys:
+            del self._keys[chunk], self._items[chunk], self._maxes[chunk], self._max_keys[chunk]
+        elif offset == len(keys):
+            self._refresh_max(chunk)
+
+    def _walk(self, chunk: int, offset: int, limit: int, reverse: bool) -> List[Tuple[Any, Hashable]]:
+        """Up to `limit` entries from a position onwards, or before it when reversed."""
+        entries: List[Tuple[Any, Hashable]] = []
+        if reverse:
+            while chunk >= 0 and len(entries) < limit:
+                if chunk < len(self._keys):
+                    start = max(0, offset - (limit - len(entries)))
+                    entries.extend(zip(reversed(self._keys[chunk][start:offset]),
+                                       reversed(self._items[chunk][start:offset])))
+                chunk -= 1
+                offset = len(self._keys[chunk]) if chunk >= 0 else 0
+            return entries
+        while chunk < len(self._keys) and len(entries) < limit:
+            end = offset + limit - len(entries)
+            entries.extend(zip(self._keys[chunk][offset:end], self._items[chunk][offset:end]))
+            chunk, offset = chunk + 1, 0
+        return entries
+
+    def range(self, low: Optional[Any] = None, high: Optional[Any] = None) -> List[Hashable]:
+        """
+        Args:
+            low (Any, optional): Smallest key included; unbounded if None.
+            high (Any, optional): Largest key included; unbounded if None.
+
+        Returns:
+            List[Hashable]: The items with keys in the range, in ascending key order.
+        """
+        start = (0, 0) if low is None else self._lower(low)
+        end = (len(self._keys), 0) if high is None else self._upper(high)
+        if start >= end:
+            return []
+        if start[0] == end[0]:
+            return self._items[start[0]][start[1]:end[1]]
+        items = self._items[start[0]][start[1]:]
+        for chunk in range(start[0] + 1, end[0]):
+            items.extend(self._items[chunk])
+        if end[0] < len(self._items):
+            items.extend(self._items[end[0]][:end[1]])
+        return items
+
+    def page(self, limit: int, after: Optional[Tuple[Any, Hashable]] = None,
+             reverse: bool = False) -> List[Tuple[Any, Hashable]]:
+        """
+        Returns up to `limit` entries following a position, in O(log n + limit).
+
+        Args:
+            limit (int): Maximum number of entries.
+            after (tuple, optional): The (key, item) entry the previous page ended on; the page
+                starts after it, even if that entry has since moved or been removed.
+            reverse (bool, optional): Walk in descending order.
+
+        Returns:
+            List[tuple]: The (key, item) entries of the page.
+        """
+        if reverse:
+            if after is None:
+                chunk = len(self._keys) - 1
+                return self._walk(chunk, len(self._keys[chunk]) if chunk >= 0 else 0, limit, True)
+            return self._walk(*self._locate(*after), limit, True)
+        if after is None:
+            return self._walk(0, 0, limit, False)
+        chunk, offset = self._locate(*after)
+        if chunk < len(self._keys) and offset < len(self._keys[chunk]) \
+                and self._keys[chunk][offset] == after[0] and self._items[chunk][offset] == after[1]:
+            offset += 1
+        return self._walk(chunk, offset, limit, False)
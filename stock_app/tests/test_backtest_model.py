@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from stock_app.models.backtest_model import (backtest, load_closes, momentum, rolling_mean, simulate,
+                                             sma_crossover, sweep)
+from stock_app.models.stock_model import daily_bar_columns
+
+
+def history(symbol, closes):
+    """Builds a PriceHistory from {ISO date: close}."""
+    return daily_bar_columns(symbol, {date: {"1. open": close, "2. high": close, "3. low": close, "4. close": close}
+                                      for date, close in closes.items()})
+
+
+@pytest.fixture
+def closes():
+    """Fixture for a deterministic 300-day, 3-symbol random walk."""
+    rng = np.random.default_rng(7)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (300, 3)), axis=0))
+
+
+def test_rolling_mean():
+    """Test trailing means, undefined until the window is full."""
+    means = rolling_mean(np.array([[1.0], [2.0], [3.0], [4.0]]), 2)
+    assert np.isnan(means[0, 0])
+    assert means[1:, 0].tolist() == [1.5, 2.5, 3.5]
+
+
+def test_strategies_return_equal_weights(closes):
+    """Test that the built-in strategies split equity equally among the symbols they hold."""
+    for weights in (sma_crossover(closes, 5, 20), momentum(closes, 10)):
+        assert weights.shape == closes.shape
+        assert set(np.unique(weights)) <= {0.0, 1 / 3}
+    with pytest.raises(ValueError, match="fast window must be shorter"):
+        sma_crossover(closes, 20, 5)
+
+
+def test_simulate_whole_shares_within_funds():
+    """Test that fills are whole shares and buys are scaled down to the available funds."""
+    closes = np.array([[30.0, 70.0], [40.0, 80.0]])
+    weights = np.array([[0.5, 0.6], [0.5, 0.5]])
+    result = simulate(closes, weights, 100.0)
+
+    # Day 0 wants 1 + 0 shares at 30/70 (0.6 * 100 / 70 rounds down to 0)
+    assert result["equity"].tolist() == [100.0, 110.0]
+    assert result["shares"].tolist() == [1, 0]
+    assert result["funds"] == 70.0
+    assert result["trades"] == 1
+
+    # Targets worth more than the funds are scaled down instead of overdrawing
+    result = simulate(np.array([[10.0, 10.0]]), np.array([[1.0, 1.0]]), 100.0)
+    assert result["shares"].tolist() == [5, 5]
+    assert result["funds"] >= 0
+
+
+def test_simulate_skips_symbols_without_price():
+    """Test that a symbol without a price is neither bought nor sold."""
+    closes = np.array([[np.nan, 10.0], [10.0, 10.0]])
+    result = simulate(closes, np.full((2, 2), 0.5), 100.0)
+    assert result["shares"].tolist() == [5, 5]
+
+
+def test_backtest_summary(closes):
+    """Test that a backtest reports metrics consistent with its equity curve."""
+    result = backtest(closes, "sma_crossover", {"fast": 5, "slow": 20}, funds=10000.0)
+    equity = result["equity"]
+    assert result["total_return"] == pytest.approx(equity[-1] / 10000.0 - 1.0)
+    assert -1.0 <= result["max_drawdown"] <= 0.0
+    assert result["params"] == {"fast": 5, "slow": 20}
+
+    with pytest.raises(ValueError, match="Unknown strategy"):
+        backtest(closes, "martingale")
+
+
+def test_sweep_parallel_matches_serial(closes):
+    """Test that a sweep covers the grid in order and workers reproduce the serial results."""
+    grid = {"fast": [5, 10], "slow": [20, 40]}
+    serial = sweep(closes, "sma_crossover", grid, workers=1)
+    assert [row["params"] for row in serial] == [
+        {"fast": 5, "slow": 20}, {"fast": 5, "slow": 40}, {"fast": 10, "slow": 20}, {"fast": 10, "slow": 40}]
+    assert sweep(closes, "sma_crossover", grid, workers=2) == serial
+
+
+def test_load_closes():
+    """Test that closes are aligned across symbols and gaps are filled."""
+    store = MagicMock()
+    store.load_many.return_value = ({
+        "AAPL": history("AAPL", {"2024-12-03": 3.0, "2024-12-02": 2.0}),
+        "MSFT": history("MSFT", {"2024-12-02": 20.0}),
+    }, {})
+    symbols, days, closes = load_closes(store, ["aapl", "MSFT", "AAPL"])
+
+    store.load_many.assert_called_once_with(["AAPL", "MSFT"], "full")
+    assert symbols == ["AAPL", "MSFT"]
+    assert closes.tolist() == [[2.0, 20.0], [3.0, 20.0]]
+
+    store.load_many.return_value = ({}, {"AAPL": "Invalid API call"})
+    with pytest.raises(ValueError, match="Could not load history"):
+        load_closes(store, ["AAPL"])
@@ -0,0 +1,131 @@
+import threading
+
+import pytest
+from unittest.mock import MagicMock
+
+from stock_app.utils.cache import NegativeCache, StaleWhileRevalidateCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Fixture for a manually advanced clock."""
+    return FakeClock()
+
+@pytest.fixture
+def cache(clock):
+    """Fixture for a cache driven by the fake clock."""
+    return StaleWhileRevalidateCache(max_entries=2, clock=clock)
+
+
+def wait_for_refresh(cache, key):
+    future = cache._inflight.get(key)
+    if future is not None:
+        future.exception(timeout=5)
+
+
+def test_miss_blocks_then_serves_fresh(cache, clock):
+    """Test that a miss calls the loader once and later hits are served from cache."""
+    loader = MagicMock(return_value=150.0)
+    assert cache.get("AAPL", loader, fresh_for=60, max_stale=600) == (150.0, 0.0)
+
+    clock.now += 30
+    assert cache.get("AAPL", loader, fresh_for=60, max_stale=600) == (150.0, 30.0)
+    loader.assert_called_once()
+
+
+def test_stale_value_served_while_revalidating(cache, clock):
+    """Test that a stale value is returned with its age and refreshed in the background."""
+    cache.get("AAPL", MagicMock(return_value=150.0), fresh_for=60, max_stale=600)
+    clock.now += 120
+
+    loader = MagicMock(return_value=155.0)
+    assert cache.get("AAPL", loader, fresh_for=60, max_stale=600) == (150.0, 120.0)
+    wait_for_refresh(cache, "AAPL")
+
+    loader.assert_called_once()
+    assert cache.get("AAPL", loader, fresh_for=60, max_stale=600) == (155.0, 0.0)
+
+
+def test_failed_revalidation_keeps_stale_value(cache, clock):
+    """Test that an upstream error during revalidation does not reach the caller."""
+    cache.get("AAPL", MagicMock(return_value=150.0), fresh_for=60, max_stale=600)
+    clock.now += 120
+
+    loader = MagicMock(side_effect=ValueError("rate limited"))
+    assert cache.get("AAPL", loader, fresh_for=60, max_stale=600)[0] == 150.0
+    wait_for_refresh(cache, "AAPL")
+    assert cache.get("AAPL", loader, fresh_for=60, max_stale=600) == (150.0, 120.0)
+
+
+def test_too_stale_value_blocks_and_raises(cache, clock):
+    """Test that values past the staleness bound are not served."""
+    cache.get("AAPL", MagicMock(return_value=150.0), fresh_for=60, max_stale=600)
+    clock.now += 601
+
+    with pytest.raises(ValueError, match="rate limited"):
+        cache.get("AAPL", MagicMock(side_effect=ValueError("rate limited")), fresh_for=60, max_stale=600)
+
+
+def test_concurrent_misses_share_one_load(cache):
+    """Test that simultaneous misses for one key make a single upstream call."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_loader():
+        started.set()
+        release.wait(5)
+        return 150.0
+
+    loader = MagicMock(side_effect=slow_loader)
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.get("AAPL", loader, 60, 600)))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=lambda: results.append(cache.get("AAPL", loader, 60, 600)))
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    loader.assert_called_once()
+    assert [value for value, _ in results] == [150.0, 150.0]
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    """Test that the cache keeps at most max_entries keys."""
+    for symbol in ("AAPL", "MSFT", "IBM"):
+        cache.put(symbol, 1.0)
+    assert cache.age("AAPL") is None
+    assert cache.age("IBM") == 0.0
+
+
+def test_negative_cache_expires_entries(clock):
+    """Test that a remembered key expires after its TTL and re-adding restarts it."""
+    unknown = NegativeCache(ttl=60, clock=clock)
+    unknown.add("ZZZZ")
+    clock.now += 59
+    assert "ZZZZ" in unknown
+    unknown.add("ZZZZ")
+    clock.now += 59
+    assert "ZZZZ" in unknown
+    clock.now += 1
+    assert "ZZZZ" not in unknown
+    assert len(unknown) == 0
+
+
+def test_negative_cache_evicts_oldest(clock):
+    """Test that the oldest keys are evicted beyond the maximum size."""
+    unknown = NegativeCache(max_entries=2, clock=clock)
+    for key in ("A", "B", "C"):
+        unknown.add(key)
+    assert "A" not in unknown and "B" in unknown and "C" in unknown
+    unknown.discard("B")
+    assert "B" not in unknown
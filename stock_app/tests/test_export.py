@@ -0,0 +1,59 @@
+import csv
+import io
+
+import pytest
+from unittest.mock import patch
+
+from stock_app.models.stock_model import daily_bar_columns
+from stock_app.utils import export
+from stock_app.utils.export import export_available, iter_csv, to_arrow_ipc, to_arrow_table, to_parquet
+
+
+@pytest.fixture
+def history():
+    """Fixture for a three-day columnar history."""
+    bars = {
+        f"2024-12-0{day}": {"1. open": f"{day}.5", "2. high": f"{day + 1}.25", "3. low": f"{day}.125",
+                            "4. close": f"{day}.1", "5. volume": "100"}
+        for day in (3, 2, 1)
+    }
+    return daily_bar_columns("AAPL", bars)
+
+
+def test_iter_csv_round_trips(history):
+    """Test that the CSV export has a header and exact prices, across chunk boundaries."""
+    body = b"".join(iter_csv(history, chunk_size=2)).decode("ascii")
+    rows = list(csv.DictReader(io.StringIO(body)))
+    assert [row["date"] for row in rows] == ["2024-12-03", "2024-12-02", "2024-12-01"]
+    assert [float(row["close"]) for row in rows] == list(history.close)
+
+
+def test_export_available_without_pyarrow():
+    """Test that only the pyarrow-backed formats become unavailable without pyarrow."""
+    with patch.object(export, "pyarrow", None):
+        assert export_available("csv")
+        assert not export_available("parquet")
+        with pytest.raises(RuntimeError, match="pyarrow is required"):
+            to_arrow_table(daily_bar_columns("AAPL", {}))
+
+
+def test_arrow_export(history):
+    """Test that the Arrow stream carries typed columns and the symbol."""
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+
+    table = pyarrow.ipc.open_stream(to_arrow_ipc(history)).read_all()
+    assert table.column_names == ["date", "open", "high", "low", "close"]
+    assert table.schema.field("date").type == pyarrow.date32()
+    assert table.column("high").to_pylist() == list(history.high)
+    assert table.schema.metadata[b"symbol"] == b"AAPL"
+
+
+def test_parquet_export(history):
+    """Test that the Parquet file reads back to the same prices."""
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+
+    table = pyarrow.parquet.read_table(io.BytesIO(to_parquet(history)))
+    assert table.num_rows == 3
+    assert table.column("open").to_pylist() == list(history.open)
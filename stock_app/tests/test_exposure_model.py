@@ -0,0 +1,56 @@
+import pytest
+
+from stock_app.models.exposure_model import ExposureTotals, market_cap_bucket
+from stock_app.models.stock_model import Stock
+
+
+def stock(symbol, sector, industry, market_cap, price, quantity):
+    return Stock(symbol=symbol, name=symbol, current_price=price, description="", sector=sector,
+                 industry=industry, market_cap=market_cap, quantity=quantity)
+
+
+@pytest.mark.parametrize("market_cap_value, bucket", [
+    (2.5e12, "mega"), (50e9, "large"), (2e9, "mid"), (500e6, "small"), (1000.0, "micro"), (None, "Unknown"),
+])
+def test_market_cap_bucket(market_cap_value, bucket):
+    """Test that market caps are bucketed and missing ones are unknown."""
+    assert market_cap_bucket(market_cap_value) == bucket
+
+
+def test_update_and_remove_adjust_group_totals():
+    """Test that totals follow positions as they are added, repriced and removed."""
+    totals = ExposureTotals()
+    totals.update("AAPL", stock("AAPL", "TECHNOLOGY", "ELECTRONIC COMPUTERS", "3000000000000", 100.0, 6))
+    totals.update("MSFT", stock("MSFT", "TECHNOLOGY", "SERVICES-PREPACKAGED SOFTWARE", "3000000000000", 50.0, 4))
+    totals.update("XOM", stock("XOM", "ENERGY", "", "None", 100.0, 2))
+
+    exposure = totals.snapshot()
+    assert exposure["total_value"] == 1000.0
+    assert exposure["sector"] == [
+        {"group": "TECHNOLOGY", "value": 800.0, "weight": 0.8, "positions": 2},
+        {"group": "ENERGY", "value": 200.0, "weight": 0.2, "positions": 1},
+    ]
+    assert [row["group"] for row in exposure["industry"]] == [
+        "ELECTRONIC COMPUTERS", "SERVICES-PREPACKAGED SOFTWARE", "Unknown"]
+    assert exposure["market_cap"] == [
+        {"group": "mega", "value": 800.0, "weight": 0.8, "positions": 2},
+        {"group": "Unknown", "value": 200.0, "weight": 0.2, "positions": 1},
+    ]
+
+    totals.update("XOM", stock("XOM", "ENERGY", "", "None", 300.0, 2))
+    assert totals.snapshot()["sector"][1] == {"group": "ENERGY", "value": 600.0, "weight": 600.0 / 1400.0,
+                                              "positions": 1}
+
+    totals.remove("XOM")
+    exposure = totals.snapshot()
+    assert exposure["total_value"] == 800.0
+    assert [row["group"] for row in exposure["sector"]] == ["TECHNOLOGY"]
+    assert [row["group"] for row in exposure["market_cap"]] == ["mega"]
+
+
+def test_positions_without_shares_are_excluded():
+    """Test that watched stocks and sold-out positions contribute nothing."""
+    totals = ExposureTotals()
+    totals.update("AAPL", stock("AAPL", "TECHNOLOGY", "", "", 100.0, 0))
+    assert len(totals) == 0
+    assert totals.snapshot() == {"total_value": 0.0, "sector": [], "industry": [], "market_cap": []}
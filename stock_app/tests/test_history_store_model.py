@@ -0,0 +1,82 @@
+import pytest
+from unittest.mock import MagicMock
+
+from stock_app.models.history_store_model import HistoryStore
+from stock_app.utils.cache import StaleWhileRevalidateCache
+from stock_app.utils.rate_limiter import RateLimiter
+
+
+SERIES = {
+    "AAPL": {"2024-12-03": 3.0, "2024-12-02": 2.0, "2024-12-01": 1.0},
+    "MSFT": {"2024-12-03": 30.0, "2024-12-01": 10.0},
+}
+
+
+def raw_series(closes):
+    return {date: {"1. open": str(close), "2. high": str(close), "3. low": str(close), "4. close": str(close)}
+            for date, close in closes.items()}
+
+
+@pytest.fixture
+def ts():
+    """Fixture for a TimeSeries mock serving SERIES and failing on unknown symbols."""
+    ts = MagicMock()
+
+    def get_daily(symbol, outputsize):
+        if symbol not in SERIES:
+            raise RuntimeError("Invalid API call")
+        return raw_series(SERIES[symbol]), {}
+    ts.get_daily.side_effect = get_daily
+    return ts
+
+@pytest.fixture
+def store(ts):
+    """Fixture for a store with an unrestrictive rate limit."""
+    return HistoryStore(ts, StaleWhileRevalidateCache(), RateLimiter(1000), fresh_for=60, max_stale=600)
+
+
+def test_matrix_inner_join(store):
+    """Test that the inner join keeps only dates every symbol has, oldest first."""
+    matrix = store.matrix(["aapl", "MSFT"], "full")
+    assert matrix["symbols"] == ["AAPL", "MSFT"]
+    assert matrix["dates"] == ["2024-12-01", "2024-12-03"]
+    assert matrix["values"] == [[1.0, 10.0], [3.0, 30.0]]
+
+
+def test_matrix_outer_join(store):
+    """Test that the outer join keeps every date and fills gaps with None."""
+    matrix = store.matrix(["AAPL", "MSFT"], "full", join="outer")
+    assert matrix["dates"] == ["2024-12-01", "2024-12-02", "2024-12-03"]
+    assert matrix["values"][1] == [2.0, None]
+
+
+def test_matrix_reports_failed_symbols(store):
+    """Test that a failing symbol is reported without failing the others."""
+    matrix = store.matrix(["AAPL", "NOPE"], "full")
+    assert matrix["symbols"] == ["AAPL"]
+    assert "NOPE" in matrix["errors"]
+
+
+def test_stored_series_are_not_refetched(store, ts):
+    """Test that repeated and duplicate symbols cost one upstream call each."""
+    store.matrix(["AAPL", "AAPL", "MSFT"], "full")
+    store.matrix(["MSFT", "AAPL"], "full", field="open")
+    assert ts.get_daily.call_count == 2
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"field": "volume"}, "Unknown field"),
+    ({"join": "left"}, "Unknown join"),
+])
+def test_matrix_rejects_invalid_options(store, kwargs, message):
+    """Test that unknown fields and joins raise ValueError."""
+    with pytest.raises(ValueError, match=message):
+        store.matrix(["AAPL"], "full", **kwargs)
+
+
+def test_fetches_go_through_rate_limiter(ts):
+    """Test that every upstream fetch takes a rate limiter token."""
+    limiter = MagicMock()
+    store = HistoryStore(ts, StaleWhileRevalidateCache(), limiter, fresh_for=60, max_stale=600)
+    store.matrix(["AAPL", "MSFT"], "full")
+    assert limiter.acquire.call_count == 2
@@ -0,0 +1,98 @@
+import gc
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from stock_app.models.holdings_index_model import HoldingsIndex
+from stock_app.models.portfolio_model import PortfolioModel
+from stock_app.models.price_refresh_model import PriceRefreshScheduler
+from stock_app.models.stock_model import Stock
+
+
+def make_stock(symbol, price=100.0, quantity=10):
+    return Stock(symbol=symbol, name=symbol, current_price=price, quantity=quantity,
+                 description="", sector="", industry="", market_cap="")
+
+
+@pytest.fixture
+def index():
+    """Fixture for a holdings index isolated from the shared one."""
+    return HoldingsIndex()
+
+
+def test_index_tracks_portfolio_changes(index):
+    """Test that loading, removing and clearing stocks keep the index in sync."""
+    portfolio = PortfolioModel(funds=1000.0, userid=1, index=index)
+    portfolio.load_stock(make_stock("AAPL"))
+    portfolio.load_stock(make_stock("MSFT", quantity=0))
+    assert index.holder_counts() == {"AAPL": 1, "MSFT": 1}
+
+    portfolio.remove_interested_stock("MSFT")
+    assert index.holders("MSFT") == []
+
+    portfolio.clear_all_stocks()
+    assert index.holder_counts() == {}
+
+
+def test_index_tracks_direct_assignment(index):
+    """Test that assigning to holding_stocks directly updates the index."""
+    portfolio = PortfolioModel(funds=1000.0, userid=1, index=index)
+    portfolio.holding_stocks = {"AAPL": make_stock("AAPL")}
+    portfolio.holding_stocks["IBM"] = make_stock("IBM")
+    assert sorted(index.holder_counts()) == ["AAPL", "IBM"]
+
+    del portfolio.holding_stocks["AAPL"]
+    portfolio.holding_stocks = {"MSFT": make_stock("MSFT")}
+    assert index.holder_counts() == {"MSFT": 1}
+
+
+@patch("stock_app.models.portfolio_model.get_latest_price", return_value=100.0)
+@patch("stock_app.models.portfolio_model.lookup_stock", return_value={
+    "symbol": "AAPL", "name": "Apple Inc.", "description": "", "sector": "", "industry": "", "market_cap": ""})
+def test_index_tracks_buys(mock_lookup_stock, mock_get_latest_price, index):
+    """Test that buying a new stock registers the portfolio as a holder."""
+    portfolio = PortfolioModel(funds=1000.0, userid=1, index=index)
+    portfolio.buy_stock("AAPL", 2)
+    assert index.holders("AAPL") == [portfolio]
+
+
+@patch("stock_app.models.portfolio_model.get_latest_price", return_value=100.0)
+@patch("stock_app.models.portfolio_model.lookup_stock", return_value={
+    "symbol": "MSFT", "name": "Microsoft Corp.", "description": "", "sector": "", "industry": "", "market_cap": ""})
+def test_symbols_in_any_case_share_one_position(mock_lookup_stock, mock_get_latest_price, index):
+    """Test that a stock bought in lower case is quoted, refreshed and bought again in upper case."""
+    portfolio = PortfolioModel(funds=1000.0, userid=1, index=index)
+    portfolio.buy_stock("msft", 2)
+    assert index.holder_counts() == {"MSFT": 1}
+
+    assert index.apply_quote("MSFT", 150.0) == 1
+    assert portfolio.holding_stocks["msft"].current_price == 150.0
+    assert PriceRefreshScheduler(MagicMock(), index=index).plan() == ["MSFT"]
+
+    portfolio.buy_stock("MSFT", 1)
+    portfolio.sell_stock("Msft", 1)
+    assert list(portfolio.get_stock_holdings()) == ["MSFT"]
+    assert portfolio.holding_stocks["MSFT"].quantity == 2
+    assert [entry.symbol for entry in portfolio.get_journal()] == ["MSFT", "MSFT", "MSFT"]
+
+
+def test_apply_quote_updates_only_holders(index):
+    """Test that a quote reaches every holder of the symbol and nothing else."""
+    holders = [PortfolioModel(funds=0.0, userid=i, index=index) for i in range(3)]
+    for portfolio in holders:
+        portfolio.load_stock(make_stock("AAPL"))
+    other = PortfolioModel(funds=0.0, userid=99, index=index)
+    other.load_stock(make_stock("MSFT"))
+
+    assert index.apply_quote("AAPL", 175.0) == 3
+    assert all(p.holding_stocks["AAPL"].current_price == 175.0 for p in holders)
+    assert other.holding_stocks["MSFT"].current_price == 100.0
+
+
+def test_index_drops_collected_portfolios(index):
+    """Test that the index does not keep discarded portfolios alive."""
+    portfolio = PortfolioModel(funds=0.0, userid=1, index=index)
+    portfolio.load_stock(make_stock("AAPL"))
+    del portfolio
+    gc.collect()
+    assert index.holders("AAPL") == []
@@ -0,0 +1,80 @@
+import pytest
+
+from stock_app.models.holdings_page_model import HoldingsPages
+from stock_app.models.stock_model import Stock
+
+
+def stock(symbol, sector, price, quantity):
+    return Stock(symbol=symbol, name=symbol, current_price=price, description="", sector=sector, industry="",
+                 market_cap="", quantity=quantity)
+
+
+@pytest.fixture
+def pages():
+    """Fixture for five positions worth 10, 40, 20, 50 and 30 across two sectors."""
+    pages = HoldingsPages()
+    for symbol, sector, value in (("A", "TECH", 10.0), ("B", "TECH", 40.0), ("C", "ENERGY", 20.0),
+                                  ("D", "TECH", 50.0), ("E", "ENERGY", 30.0)):
+        pages.update(symbol, stock(symbol, sector, value, 1))
+    return pages
+
+
+def walk(pages, **kwargs):
+    """Collects every page of a sort, following the cursors."""
+    symbols, cursor = [], None
+    while True:
+        page, cursor, _ = pages.page(cursor=cursor, **kwargs)
+        symbols.append(page)
+        if cursor is None:
+            return symbols
+
+
+def test_pages_by_value_descending_by_default(pages):
+    """Test that the default sort is the largest positions first, page by page."""
+    assert walk(pages, limit=2) == [["D", "B"], ["E", "C"], ["A"]]
+    assert walk(pages, sort="weight", limit=5) == [["D", "B", "E", "C", "A"]]
+    assert walk(pages, order="asc", limit=3) == [["A", "C", "E"], ["B", "D"]]
+
+
+def test_pages_by_symbol_and_sector(pages):
+    """Test symbol order and that a sector filter pages only that sector's positions."""
+    assert walk(pages, sort="symbol", limit=2) == [["A", "B"], ["C", "D"], ["E"]]
+    assert walk(pages, sector="ENERGY", limit=1) == [["E"], ["C"]]
+    assert pages.page(sector="ENERGY")[2] == 2
+    assert pages.page(sector="UTILITIES") == ([], None, 0)
+
+
+def test_updates_rekey_positions_and_totals(pages):
+    """Test that repricing and removal move positions and keep the running totals."""
+    pages.update("A", stock("A", "TECH", 100.0, 1))
+    assert pages.page(limit=2)[0] == ["A", "D"]
+    assert pages.total_value == 240.0
+    assert pages.total_cost == 240.0
+
+    pages.remove("D")
+    assert pages.page(sector="TECH")[0] == ["A", "B"]
+    assert pages.total_value == 190.0 and len(pages) == 4
+
+
+def test_cursor_survives_removal_of_its_position(pages):
+    """Test that a page continues after the cursor's entry even once that position is gone."""
+    first, cursor, _ = pages.page(limit=2)
+    pages.remove(first[-1])
+    assert pages.page(limit=2, cursor=cursor)[0] == ["E", "C"]
+
+
+def test_invalid_paging(pages):
+    """Test that unknown sorts, orders, limits and foreign or malformed cursors are rejected."""
+    _, cursor, _ = pages.page(limit=1)
+    with pytest.raises(ValueError, match="different sort"):
+        pages.page(sort="symbol", cursor=cursor)
+    with pytest.raises(ValueError, match="different sort"):
+        pages.page(order="asc", cursor=cursor)
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        pages.page(cursor="not-a-cursor")
+    with pytest.raises(ValueError, match="Unknown sort"):
+        pages.page(sort="name")
+    with pytest.raises(ValueError, match="Unknown order"):
+        pages.page(order="up")
+    with pytest.raises(ValueError, match="Limit"):
+        pages.page(limit=0)
@@ -0,0 +1,121 @@
+import pytest
+from flask import Flask
+from unittest.mock import MagicMock
+
+from stock_app.utils.http_cache import ResponseCache, conditional_json, conditional_ndjson
+
+
+@pytest.fixture
+def state():
+    """Fixture for mutable resource state: an ETag and a last-modified timestamp."""
+    return {"etag": "funds-1", "modified": 1700000000.0}
+
+@pytest.fixture
+def render():
+    """Fixture for the payload renderer."""
+    return MagicMock(return_value={"status": "success", "funds": 100.0})
+
+@pytest.fixture
+def client(state, render):
+    """Fixture for a minimal app serving one conditional endpoint."""
+    app = Flask(__name__)
+    cache = ResponseCache(max_entries=2)
+
+    @app.route("/funds")
+    def funds():
+        return conditional_json(cache, lambda: (state["etag"], state["modified"]), render)
+
+    return app.test_client()
+
+
+def test_response_carries_validators(client):
+    """Test that a 200 response includes ETag, Last-Modified and the JSON body."""
+    response = client.get("/funds")
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"funds-1"'
+    assert response.headers["Last-Modified"] == "Tue, 14 Nov 2023 22:13:20 GMT"
+    assert response.get_json() == {"status": "success", "funds": 100.0}
+
+
+def test_matching_etag_returns_not_modified(client, render):
+    """Test that If-None-Match with the current ETag yields a 304 without rendering."""
+    client.get("/funds")
+    response = client.get("/funds", headers={"If-None-Match": '"funds-1"'})
+    assert response.status_code == 304
+    assert response.data == b""
+    render.assert_called_once()
+
+
+def test_if_modified_since_returns_not_modified(client):
+    """Test that an unchanged Last-Modified yields a 304."""
+    response = client.get("/funds", headers={"If-Modified-Since": "Tue, 14 Nov 2023 22:13:20 GMT"})
+    assert response.status_code == 304
+
+
+def test_changed_state_renders_again(client, state, render):
+    """Test that a new version is rendered and stale validators no longer match."""
+    client.get("/funds")
+    state["etag"] = "funds-2"
+    render.return_value = {"status": "success", "funds": 50.0}
+
+    response = client.get("/funds", headers={"If-None-Match": '"funds-1"'})
+    assert response.status_code == 200
+    assert response.get_json()["funds"] == 50.0
+
+
+def test_serialized_body_reused_for_same_version(client, render):
+    """Test that repeated unconditional requests reuse the serialized body."""
+    first = client.get("/funds")
+    second = client.get("/funds")
+    assert first.data == second.data
+    render.assert_called_once()
+
+
+def test_response_cache_evicts_least_recently_used():
+    """Test that the body cache is bounded."""
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    cache.get("a")
+    cache.put("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+
+
+def test_long_lists_are_streamed_not_cached():
+    """Test that a list past JSON_STREAM_MIN_ITEMS is streamed and its body is not cached."""
+    app = Flask(__name__)
+    app.config["JSON_STREAM_MIN_ITEMS"] = 3
+    cache = ResponseCache()
+
+    @app.route("/history/<int:count>")
+    def history(count):
+        return conditional_json(cache, lambda: (f"history-{count}", 1700000000.0),
+                                lambda: {"status": "success", "data": list(range(count))}, stream_key="data")
+
+    client = app.test_client()
+    response = client.get("/history/3")
+    assert response.get_json() == {"status": "success", "data": [0, 1, 2]}
+    assert response.headers["ETag"] == '"history-3"'
+    assert cache.get("history-3") is None
+
+    assert client.get("/history/2").get_json()["data"] == [0, 1]
+    assert cache.get("history-2") is not None
+
+
+def test_ndjson_response_is_conditional():
+    """Test that NDJSON responses emit one row per line and honor If-None-Match."""
+    app = Flask(__name__)
+    rows = MagicMock(return_value=iter([{"close": 1.0}, {"close": 2.0}]))
+
+    @app.route("/history.ndjson")
+    def history():
+        return conditional_ndjson(lambda: ("history-ndjson-1", 1700000000.0), rows)
+
+    client = app.test_client()
+    response = client.get("/history.ndjson")
+    assert response.mimetype == "application/x-ndjson"
+    assert response.data == b'{"close":1.0}\n{"close":2.0}\n'
+
+    assert client.get("/history.ndjson", headers={"If-None-Match": '"history-ndjson-1"'}).status_code == 304
+    rows.assert_called_once()
@@ -0,0 +1,86 @@
+import json
+from datetime import date
+
+import pytest
+from flask import Flask
+from unittest.mock import patch
+
+from stock_app.models.stock_model import Stock
+from stock_app.utils import json_provider
+from stock_app.utils.json_provider import FastJSONProvider, StandardJSONProvider, iter_json_list, streamed_json_response
+
+
+@pytest.fixture
+def app():
+    """Fixture for an app using the fast JSON provider."""
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+@pytest.fixture
+def payload():
+    """Fixture for a payload mixing dataclasses, dates and plain values."""
+    return {
+        "status": "success",
+        "holdings": {"AAPL": Stock(symbol="AAPL", name="Apple Inc.", current_price=150.0, quantity=10,
+                                   description="", sector="", industry="", market_cap="")},
+        "as_of": date(2024, 1, 2),
+    }
+
+
+def test_dumps_matches_standard_json(app, payload):
+    """Test that the fast provider produces the same document as Flask's default provider."""
+    default = Flask(__name__).json
+    assert json.loads(app.json.dumps(payload)) == json.loads(default.dumps(payload, default=app.json.default))
+    assert json.loads(app.json.dumps(payload))["holdings"]["AAPL"]["lots"] == [[10, 150.0]]
+
+
+def test_falls_back_without_orjson(app, payload):
+    """Test that serialization still works when orjson is unavailable."""
+    expected = json.loads(app.json.dumps(payload))
+    with patch.object(json_provider, "orjson", None):
+        assert json.loads(app.json.dumps_bytes(payload)) == expected
+        assert app.json.loads('{"a": 1}') == {"a": 1}
+
+
+def test_standard_provider_writes_lots(payload):
+    """Test that stocks serialize with the fast provider turned off, lots included."""
+    app = Flask(__name__)
+    app.json = StandardJSONProvider(app)
+    with app.app_context():
+        from flask import jsonify
+        response = jsonify(payload)
+    assert response.get_json()["holdings"]["AAPL"]["lots"] == [[10, 150.0]]
+
+
+def test_jsonify_uses_provider(app, payload):
+    """Test that jsonify goes through the provider."""
+    with app.app_context():
+        from flask import jsonify
+        response = jsonify(payload)
+    assert response.get_json()["holdings"]["AAPL"]["quantity"] == 10
+
+
+@pytest.mark.parametrize("count", [0, 1, 5, 7])
+def test_iter_json_list_is_valid_json(app, count):
+    """Test that the chunked encoding yields the same document for any list length."""
+    items = ({"date": f"2024-01-{i + 1:02d}", "close": float(i)} for i in range(count))
+    body = b"".join(iter_json_list(app.json, {"status": "success"}, "data", items, chunk_size=3))
+    assert json.loads(body) == {
+        "status": "success",
+        "data": [{"date": f"2024-01-{i + 1:02d}", "close": float(i)} for i in range(count)],
+    }
+
+
+def test_iter_json_list_without_envelope(app):
+    """Test that a list can be streamed as the only field."""
+    body = b"".join(iter_json_list(app.json, {}, "data", [1, 2, 3], chunk_size=2))
+    assert json.loads(body) == {"data": [1, 2, 3]}
+
+
+def test_streamed_response(app):
+    """Test that the streamed response is chunked JSON."""
+    response = streamed_json_response(app.json, {"status": "success"}, "data", iter(range(2500)))
+    assert response.is_streamed
+    assert response.mimetype == "application/json"
+    assert len(json.loads(b"".join(response.response))["data"]) == 2500
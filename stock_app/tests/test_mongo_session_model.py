@@ -1,6 +1,7 @@
 import pytest
 
 from stock_app.models.mongo_session_model import login_user, logout_user
+from stock_app.models.stock_model import Stock
 
 @pytest.fixture
 def sample_user_id():
@@ -31,7 +32,8 @@ def test_login_user_creates_session_if_not_exists(mocker, sample_user_id):
     login_user(sample_user_id, mock_portfolio_model)
 
     mock_find.assert_called_once_with({"user_id": sample_user_id})
-    mock_insert.assert_called_once_with({"user_id": sample_user_id, "stock_holdings": {}, "funds": 0.0})
+    mock_insert.assert_called_once_with({"user_id": sample_user_id, "stock_holdings": {}, "funds": 0.0,
+                                         "held_symbols": [], "updated_at": mocker.ANY})
     mock_portfolio_model.clear_all_stocks.assert_not_called()
     mock_portfolio_model.load_stock.assert_not_called()
 
@@ -64,6 +66,8 @@ def test_login_user_loads_stocks_if_session_exists(mocker, sample_user_id):
     mock_portfolio_model.clear_all_stocks.assert_called_once()
     mock_portfolio_model.profile_charge_funds.assert_called_once_with(1000.0)
     mock_portfolio_model.load_stock.assert_called_once()
+    # Sessions saved before lots were tracked open one lot at the saved price.
+    assert list(mock_portfolio_model.load_stock.call_args[0][0].lots) == [[10, 150.0]]
 
 
 def test_logout_user_updates_stocks(mocker, sample_user_id):
@@ -80,10 +84,15 @@ def test_logout_user_updates_stocks(mocker, sample_user_id):
     mock_stock.sector = "Technology"
     mock_stock.industry = "Consumer Electronics"
     mock_stock.market_cap = "2T"
+    mock_stock.market_cap_value = 2e12
     mock_stock.quantity = 10
+    mock_stock.lots = [[10, 120.0]]
+    mock_stock.realized_pnl = 25.0
 
     mock_portfolio_model.get_stock_holdings.return_value = {"AAPL": mock_stock}
     mock_portfolio_model.get_funds.return_value = 1000.0
+    mock_portfolio_model.get_journal.return_value = []
+    mock_portfolio_model.get_realized_pnl.return_value = 0.0
 
     logout_user(sample_user_id, mock_portfolio_model)
 
@@ -100,10 +109,17 @@ def test_logout_user_updates_stocks(mocker, sample_user_id):
                         "sector": "Technology",
                         "industry": "Consumer Electronics",
                         "market_cap": "2T",
+                        "market_cap_value": 2e12,
                         "quantity": 10,
+                        "lots": [[10, 120.0]],
+                        "realized_pnl": 25.0,
                     }
                 },
                 "funds": 1000.0,
+                "journal": [],
+                "realized_pnl": 0.0,
+                "held_symbols": ["AAPL"],
+                "updated_at": mocker.ANY,
             }
         },
         upsert=False
@@ -119,12 +135,32 @@ def test_logout_user_raises_value_error_if_no_user(mocker, sample_user_id):
     # Mock get_stock_holdings to return an empty dictionary
     mock_portfolio_model.get_stock_holdings.return_value = {}
     mock_portfolio_model.get_funds.return_value = 0.0
+    mock_portfolio_model.get_journal.return_value = []
+    mock_portfolio_model.get_realized_pnl.return_value = 0.0
 
     with pytest.raises(ValueError, match=f"User with ID {sample_user_id} not found for logout."):
         logout_user(sample_user_id, mock_portfolio_model)
 
     mock_update.assert_called_once_with(
         {"user_id": sample_user_id},
-        {"$set": {"stock_holdings": {}, "funds": 0.0}},
+        {"$set": {"stock_holdings": {}, "funds": 0.0, "journal": [], "realized_pnl": 0.0,
+                  "held_symbols": [], "updated_at": mocker.ANY}},
         upsert=False
-    )
\ No newline at end of file
+    )
+
+def test_logout_user_indexes_held_symbols_in_upper_case(mocker, sample_user_id):
+    """Test that held_symbols lists each held symbol once, in upper case, whatever case it was bought in."""
+    mock_update = mocker.patch("stock_app.clients.mongo_client.sessions_collection.update_one", return_value=mocker.Mock(matched_count=1))
+    mock_portfolio_model = mocker.Mock()
+    mock_portfolio_model.get_stock_holdings.return_value = {
+        "aapl": Stock("aapl", "Apple Inc.", 150.0, "", "Technology", "", "2T", 1),
+        "AAPL": Stock("AAPL", "Apple Inc.", 150.0, "", "Technology", "", "2T", 2),
+        "ibm": Stock("ibm", "IBM", 100.0, "", "Technology", "", "100B", 0),
+    }
+    mock_portfolio_model.get_funds.return_value = 0.0
+    mock_portfolio_model.get_journal.return_value = []
+    mock_portfolio_model.get_realized_pnl.return_value = 0.0
+
+    logout_user(sample_user_id, mock_portfolio_model)
+
+    assert mock_update.call_args.args[1]["$set"]["held_symbols"] == ["AAPL"]
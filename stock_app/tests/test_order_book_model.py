@@ -0,0 +1,115 @@
+import pytest
+from unittest.mock import MagicMock
+
+from stock_app.models.order_book_model import OrderBook, PriceMovedError
+
+
+@pytest.fixture
+def executor():
+    """Fixture for a mock trade executor."""
+    return MagicMock()
+
+@pytest.fixture
+def book(executor):
+    """Fixture for an empty order book."""
+    return OrderBook(executor)
+
+
+def test_buy_triggers_at_or_below_threshold(book, executor):
+    """Test that a buy order defaults to triggering on a dip and executes once."""
+    order = book.place(1, "aapl", "buy", 100.0, quantity=5)
+    assert order.direction == "below" and order.symbol == "AAPL"
+
+    assert book.on_quote("AAPL", 100.5) == []
+    assert book.on_quote("AAPL", 100.0) == [order]
+    executor.assert_called_once_with(order, 100.0)
+    assert order.status == "executed" and order.triggered_price == 100.0
+
+    assert book.on_quote("AAPL", 90.0) == []
+    executor.assert_called_once()
+
+
+def test_quote_triggers_only_crossed_orders(book):
+    """Test that a quote triggers every crossed threshold on both sides and nothing else."""
+    buys = [book.place(1, "AAPL", "buy", threshold, quantity=1) for threshold in (90.0, 95.0, 99.0)]
+    sells = [book.place(1, "AAPL", "sell", threshold, quantity=1) for threshold in (101.0, 110.0)]
+    alert = book.place(1, "AAPL", "alert", 96.0, direction="below")
+    book.place(1, "MSFT", "buy", 500.0, quantity=1)
+
+    assert {o.order_id for o in book.on_quote("AAPL", 95.0)} == {buys[1].order_id, buys[2].order_id, alert.order_id}
+    assert book.on_quote("AAPL", 105.0) == [sells[0]]
+    assert alert.status == "triggered"
+    assert book.symbol_counts() == {"AAPL": 2, "MSFT": 1}
+
+
+def test_cancelled_orders_never_trigger(book, executor):
+    """Test lazy cancellation and that only the owner can cancel."""
+    order = book.place(1, "AAPL", "buy", 100.0, quantity=1)
+    with pytest.raises(ValueError, match="No open order"):
+        book.cancel(order.order_id, user_id=2)
+    book.cancel(order.order_id, user_id=1)
+
+    assert book.on_quote("AAPL", 50.0) == []
+    executor.assert_not_called()
+    assert order.status == "cancelled"
+    with pytest.raises(ValueError, match="No open order"):
+        book.cancel(order.order_id)
+
+
+def test_cancellations_compact_the_heaps(book):
+    """Test that mostly-cancelled heaps are rebuilt without the cancelled entries."""
+    orders = [book.place(1, "AAPL", "alert", 100.0 + i, direction="above") for i in range(10)]
+    for order in orders[:6]:
+        book.cancel(order.order_id)
+    assert len(book._heaps["AAPL"]["above"]) == 4
+    assert [o.order_id for o in book.on_quote("AAPL", 200.0)] == [o.order_id for o in orders[6:]]
+
+
+def test_failed_execution_is_recorded(book, executor):
+    """Test that an execution error marks the order failed without affecting others."""
+    executor.side_effect = [ValueError("Insufficient funds"), None]
+    first = book.place(1, "AAPL", "buy", 100.0, quantity=1000)
+    second = book.place(1, "AAPL", "buy", 99.0, quantity=1)
+
+    book.on_quote("AAPL", 98.0)
+    assert (first.status, first.error) == ("failed", "Insufficient funds")
+    assert second.status == "executed"
+
+
+def test_order_is_put_back_when_the_fill_price_moved(book, executor):
+    """Test that an order whose fill quote no longer crosses the threshold waits for the next quote."""
+    order = book.place(1, "AAPL", "buy", 100.0, quantity=5)
+    assert order.crossed_by(99.0) and not order.crossed_by(101.0)
+    executor.side_effect = PriceMovedError("AAPL is at 101.00")
+
+    assert book.on_quote("AAPL", 99.0) == [order]
+    assert order.status == "open" and order.triggered_price is None
+    assert book.symbol_counts() == {"AAPL": 1}
+
+    executor.side_effect = None
+    assert book.on_quote("AAPL", 98.0) == [order]
+    assert order.status == "executed" and executor.call_count == 2
+
+
+def test_place_validation(book):
+    """Test that invalid orders are rejected."""
+    with pytest.raises(ValueError, match="Unknown order kind"):
+        book.place(1, "AAPL", "short", 100.0, quantity=1)
+    with pytest.raises(ValueError, match="Direction"):
+        book.place(1, "AAPL", "alert", 100.0)
+    with pytest.raises(ValueError, match="Threshold"):
+        book.place(1, "AAPL", "buy", 0.0, quantity=1)
+    with pytest.raises(ValueError, match="Quantity"):
+        book.place(1, "AAPL", "sell", 100.0)
+
+
+def test_orders_lists_per_user_and_bounds_history(executor):
+    """Test that listings are per user and finished orders are kept up to the limit."""
+    book = OrderBook(executor, max_finished=2)
+    for threshold in (1.0, 2.0, 3.0):
+        book.place(1, "AAPL", "alert", threshold, direction="above")
+    book.place(2, "AAPL", "alert", 50.0, direction="above")
+    book.on_quote("AAPL", 10.0)
+
+    assert [o.threshold for o in book.orders(1)] == [2.0, 3.0]
+    assert [o.status for o in book.orders(2)] == ["open"]
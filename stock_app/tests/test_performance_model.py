@@ -0,0 +1,128 @@
+import datetime
+from array import array
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from stock_app.models.performance_model import align_closes, compute_performance, fill_gaps, portfolio_performance
+from stock_app.models.portfolio_model import JournalEntry, PortfolioModel, compact_journal
+from stock_app.models.stock_model import EPOCH_ORDINAL, PriceHistory, Stock
+
+
+def history(symbol, closes):
+    """Builds a PriceHistory from {ISO date: close}."""
+    result = PriceHistory(symbol)
+    for date, close in closes.items():
+        result.date.append(date)
+        result.day.append(datetime.date.fromisoformat(date).toordinal() - EPOCH_ORDINAL)
+        result.close.append(close)
+    return result
+
+
+def timestamp(date):
+    return datetime.datetime.fromisoformat(date).replace(tzinfo=datetime.timezone.utc).timestamp()
+
+
+DAYS = np.array(["2024-12-02", "2024-12-03", "2024-12-04"], dtype="datetime64[D]")
+
+
+def test_fill_gaps():
+    """Test that gaps take the previous price, and leading gaps the first known one."""
+    prices = np.array([[np.nan, 1.0], [2.0, np.nan], [np.nan, 3.0]])
+    assert fill_gaps(prices).tolist() == [[2.0, 1.0], [2.0, 1.0], [2.0, 3.0]]
+
+
+def test_align_closes():
+    """Test that histories are aligned on the union of their dates, oldest first."""
+    days, closes = align_closes([history("AAPL", {"2024-12-03": 3.0, "2024-12-02": 2.0}),
+                                 history("MSFT", {"2024-12-04": 40.0, "2024-12-02": 20.0})])
+    assert np.datetime_as_string(days).tolist() == ["2024-12-02", "2024-12-03", "2024-12-04"]
+    assert np.array_equal(closes, np.array([[2.0, 20.0], [3.0, np.nan], [np.nan, 40.0]]), equal_nan=True)
+
+
+def test_compute_performance_holdings_only():
+    """Test the equity curve and risk figures of a portfolio without trades."""
+    closes = np.array([[10.0], [12.0], [9.0]])
+    result = compute_performance(DAYS, ["AAPL"], closes, {"AAPL": 10}, 100.0, [])
+
+    assert result["dates"] == ["2024-12-02", "2024-12-03", "2024-12-04"]
+    assert result["equity"] == [200.0, 220.0, 190.0]
+    assert result["returns"] == pytest.approx([0.0, 0.1, 190.0 / 220.0 - 1.0])
+    assert result["total_return"] == pytest.approx(-0.05)
+    assert result["max_drawdown"] == pytest.approx(190.0 / 220.0 - 1.0)
+    assert result["volatility"] > 0
+
+
+def test_compute_performance_excludes_deposits_from_returns():
+    """Test that trades are replayed from the journal and deposits do not count as returns."""
+    journal = [
+        JournalEntry(timestamp("2024-12-03T15:00:00"), "deposit", None, 0, 0.0, 100.0),
+        JournalEntry(timestamp("2024-12-04T15:00:00"), "buy", "AAPL", 5, 10.0, -50.0),
+    ]
+    closes = np.array([[10.0], [10.0], [10.0]])
+    # Now: 5 shares and 50 in cash; before the deposit, nothing.
+    result = compute_performance(DAYS, ["AAPL"], closes, {"AAPL": 5}, 50.0, journal)
+
+    assert result["equity"] == [0.0, 100.0, 100.0]
+    assert result["returns"] == [0.0, 0.0, 0.0]
+    assert result["total_return"] == 0.0
+
+
+def test_compacted_journal_keeps_the_curve():
+    """Test that merging old entries per day leaves the equity curve unchanged."""
+    journal = [JournalEntry(timestamp("2024-12-02T10:00:00"), "deposit", None, 0, 0.0, 1000.0)]
+    for day, price in (("2024-12-02", 10.0), ("2024-12-03", 12.0), ("2024-12-04", 9.0)):
+        for hour in range(10, 16):
+            journal.append(JournalEntry(timestamp(f"{day}T{hour}:00:00"), "buy", "AAPL", 2, price, -2 * price))
+            journal.append(JournalEntry(timestamp(f"{day}T{hour}:30:00"), "sell", "AAPL", 1, price, price))
+    closes = np.array([[10.0], [12.0], [9.0]])
+    funds = 1000.0 + sum(entry.cash for entry in journal[1:])
+
+    compacted = compact_journal(journal, 32)
+    assert len(compacted) == 21 and compacted[-16:] == journal[-16:]
+    assert [(entry.action, entry.quantity, entry.price) for entry in compacted[:3]] == \
+        [("deposit", 0, 0.0), ("buy", 12, 10.0), ("sell", 6, 10.0)]
+    assert compute_performance(DAYS, ["AAPL"], closes, {"AAPL": 18}, funds, compacted) == \
+        compute_performance(DAYS, ["AAPL"], closes, {"AAPL": 18}, funds, journal)
+
+    # Beyond a quarter of the limit, the oldest merged days are dropped.
+    bounded = compact_journal(journal, 16)
+    assert len(bounded) == 12 and bounded[0].timestamp == timestamp("2024-12-03T10:00:00")
+
+
+def test_compute_performance_empty():
+    """Test that an empty date range yields an empty curve."""
+    result = compute_performance(np.empty(0, dtype="datetime64[D]"), [], np.empty((0, 0)), {}, 0.0, [])
+    assert result["equity"] == [] and result["total_return"] == 0.0
+
+
+def test_portfolio_performance_trims_to_start():
+    """Test that the curve starts at the requested date while the holdings are still valued."""
+    portfolio = PortfolioModel(funds=0.0, userid=1)
+    portfolio.load_stock(Stock(symbol="AAPL", name="Apple Inc.", current_price=3.0, quantity=2,
+                               description="", sector="", industry="", market_cap=""))
+    store = MagicMock()
+    store.load_many.return_value = (
+        {"AAPL": history("AAPL", {"2024-12-04": 3.0, "2024-12-03": 2.0, "2024-12-02": 1.0})}, {})
+
+    result = portfolio_performance(portfolio, store, "compact", start="2024-12-03")
+
+    store.load_many.assert_called_once_with(["AAPL"], "compact")
+    assert result["symbols"] == ["AAPL"]
+    assert result["dates"] == ["2024-12-03", "2024-12-04"]
+    assert result["equity"] == [4.0, 6.0]
+
+
+def test_portfolio_performance_errors():
+    """Test that invalid start dates and unloadable histories raise ValueError."""
+    portfolio = PortfolioModel(funds=0.0, userid=1)
+    portfolio.load_stock(Stock(symbol="AAPL", name="Apple Inc.", current_price=3.0, quantity=2,
+                               description="", sector="", industry="", market_cap=""))
+    store = MagicMock()
+    store.load_many.return_value = ({}, {"AAPL": "Invalid API call"})
+
+    with pytest.raises(ValueError, match="Invalid start date"):
+        portfolio_performance(portfolio, store, start="December")
+    with pytest.raises(ValueError, match="Could not load history for: AAPL"):
+        portfolio_performance(portfolio, store)
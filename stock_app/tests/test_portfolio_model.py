@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 from unittest.mock import MagicMock, patch
 from stock_app.models.portfolio_model import PortfolioModel
@@ -42,10 +44,14 @@ def test_display_portfolio(portfolio):
 
     expected = {
         "portfolio": [
-            {"symbol": "AAPL", "name": "Apple Inc.", "quantity": 10, "current_price": 150.0, "total_value": 1500.0},
-            {"symbol": "MSFT", "name": "Microsoft Corp.", "quantity": 5, "current_price": 300.0, "total_value": 1500.0},
+            {"symbol": "AAPL", "name": "Apple Inc.", "quantity": 10, "current_price": 150.0, "total_value": 1500.0,
+             "average_cost": 150.0, "cost_basis": 1500.0, "unrealized_pnl": 0.0, "realized_pnl": 0.0},
+            {"symbol": "MSFT", "name": "Microsoft Corp.", "quantity": 5, "current_price": 300.0, "total_value": 1500.0,
+             "average_cost": 300.0, "cost_basis": 1500.0, "unrealized_pnl": 0.0, "realized_pnl": 0.0},
         ],
-        "total_value": 1000.0 + 1500.0 + 1500.0
+        "total_value": 1000.0 + 1500.0 + 1500.0,
+        "realized_pnl": 0.0,
+        "unrealized_pnl": 0.0,
     }
     assert result == expected
 
@@ -113,6 +119,19 @@ def test_buy_stock_invalid_quantity(portfolio):
     with pytest.raises(ValueError, match="Quantity must be at least 1."):
         portfolio.buy_stock("AAPL", 0)
 
+@patch("stock_app.models.portfolio_model.get_latest_price", side_effect=AssertionError("no upstream call"))
+def test_trades_at_prefetched_quotes(mock_get_latest_price, portfolio):
+    """Test that trades given a quote apply it without calling upstream."""
+    info = {"symbol": "AAPL", "name": "Apple Inc.", "description": "", "sector": "Technology",
+            "industry": "Consumer Electronics", "market_cap": "2500000000000"}
+    portfolio.buy_stock("AAPL", 5, (100.0, info))
+    portfolio.sell_stock("AAPL", 2, 110.0)
+
+    assert portfolio.holding_stocks["AAPL"].quantity == 3
+    assert portfolio.get_funds() == 1000.0 - 500.0 + 220.0
+    with pytest.raises(ValueError, match="Quantity must be at least 1."):
+        portfolio.sell_stock("AAPL", 0, 110.0)
+
 @patch("stock_app.models.portfolio_model.get_latest_price")
 def test_sell_stock(mock_get_latest_price, portfolio):
     """Test selling stock updates holdings and funds."""
@@ -229,4 +248,274 @@ def test_load_stock(portfolio):
                       description="", sector="", industry="", market_cap="")
     portfolio.load_stock(stock_new)
 
-    assert portfolio.holding_stocks["AAPL"].quantity == 15  # Updated quantity
\ No newline at end of file
+    assert portfolio.holding_stocks["AAPL"].quantity == 15  # Updated quantity
+
+
+@patch("stock_app.models.portfolio_model.get_latest_price", return_value=100.0)
+@patch("stock_app.models.portfolio_model.lookup_stock", return_value={
+    "symbol": "MSFT", "name": "Microsoft Corp.", "current_price": 200.0, "description": "",
+    "sector": "", "industry": "", "market_cap": ""})
+def test_execute_batch(mock_lookup_stock, mock_get_latest_price, portfolio):
+    """Test executing a basket quotes each symbol once and applies every order."""
+    portfolio.holding_stocks["AAPL"] = Stock(
+        symbol="AAPL", name="Apple Inc.", current_price=90.0, quantity=10,
+        description="", sector="", industry="", market_cap="")
+
+    result = portfolio.execute_batch([
+        {"action": "sell", "symbol": "AAPL", "quantity": 4},
+        {"action": "buy", "symbol": "MSFT", "quantity": 6},
+        {"action": "buy", "symbol": "AAPL", "quantity": 1},
+    ])
+
+    mock_get_latest_price.assert_called_once_with("AAPL", portfolio.ts)
+    mock_lookup_stock.assert_called_once_with("MSFT", portfolio.ts, portfolio.fd)
+    assert portfolio.holding_stocks["AAPL"].quantity == 7
+    assert portfolio.holding_stocks["MSFT"].quantity == 6
+    assert result["net_cash"] == 400.0 - 1200.0 - 100.0
+    assert portfolio.get_funds() == 1000.0 + 400.0 - 1200.0 - 100.0
+
+@patch("stock_app.models.portfolio_model.get_latest_price", return_value=100.0)
+def test_execute_batch_insufficient_funds_is_atomic(mock_get_latest_price, portfolio):
+    """Test that a basket exceeding the funds leaves the portfolio unchanged."""
+    portfolio.holding_stocks["AAPL"] = Stock(
+        symbol="AAPL", name="Apple Inc.", current_price=100.0, quantity=10,
+        description="", sector="", industry="", market_cap="")
+
+    with pytest.raises(ValueError, match="Insufficient funds"):
+        portfolio.execute_batch([
+            {"action": "sell", "symbol": "AAPL", "quantity": 5},
+            {"action": "buy", "symbol": "AAPL", "quantity": 20},
+        ])
+
+    assert portfolio.holding_stocks["AAPL"].quantity == 10
+    assert portfolio.get_funds() == 1000.0
+
+def test_execute_batch_oversell_rejected_before_quotes(portfolio):
+    """Test that selling more shares than the basket makes available fails without any quote."""
+    with patch("stock_app.models.portfolio_model.get_latest_price") as mock_get_latest_price:
+        with pytest.raises(ValueError, match="Not enough shares of AAPL to sell"):
+            portfolio.execute_batch([{"action": "sell", "symbol": "AAPL", "quantity": 1}])
+        mock_get_latest_price.assert_not_called()
+
+def test_execute_batch_invalid_action(portfolio):
+    """Test that an unknown order action raises a ValueError."""
+    with pytest.raises(ValueError, match="Order action must be 'buy' or 'sell'"):
+        portfolio.execute_batch([{"action": "short", "symbol": "AAPL", "quantity": 1}])
+
+def test_concurrent_buys_cannot_overspend(portfolio):
+    """Test that two buys quoted concurrently cannot both pass the funds check."""
+    barrier = threading.Barrier(2)
+
+    def slow_quote(symbol, ts):
+        barrier.wait(timeout=5)  # both buys hold a quote before either applies
+        return 100.0
+
+    stock_info = {"symbol": "AAPL", "name": "Apple Inc.", "description": "", "sector": "",
+                  "industry": "", "market_cap": ""}
+    errors = []
+
+    def buy():
+        try:
+            portfolio.buy_stock("AAPL", 6)
+        except ValueError as e:
+            errors.append(e)
+
+    with patch("stock_app.models.portfolio_model.get_latest_price", side_effect=slow_quote), \
+         patch("stock_app.models.portfolio_model.lookup_stock", return_value=stock_info):
+        threads = [threading.Thread(target=buy) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(errors) == 1
+    assert portfolio.holding_stocks["AAPL"].quantity == 6
+    assert portfolio.get_funds() == 400.0
+
+@patch("stock_app.models.portfolio_model.get_latest_price", return_value=100.0)
+def test_version_increments_on_changes(mock_get_latest_price, portfolio):
+    """Test that every change to funds or holdings bumps the version counter."""
+    portfolio.load_stock(Stock(symbol="AAPL", name="Apple Inc.", current_price=90.0, quantity=5,
+                               description="", sector="", industry="", market_cap=""))
+    version = portfolio.version
+    portfolio.profile_charge_funds(10.0)
+    portfolio.sell_stock("AAPL", 1)
+    assert portfolio.version == version + 2
+
+
+def test_direct_holding_changes_bump_version(portfolio):
+    """Test that assigning to holding_stocks directly also invalidates the version."""
+    version, modified_at = portfolio.version, portfolio.modified_at
+    portfolio.holding_stocks["AAPL"] = Stock(symbol="AAPL", name="Apple Inc.", current_price=90.0, quantity=5,
+                                             description="", sector="", industry="", market_cap="")
+    assert portfolio.version > version
+    assert portfolio.modified_at >= modified_at
+
+
+@patch("stock_app.models.portfolio_model.get_latest_price", return_value=100.0)
+@patch("stock_app.models.portfolio_model.lookup_stock", return_value={
+    "symbol": "AAPL", "name": "Apple Inc.", "description": "", "sector": "", "industry": "", "market_cap": ""})
+def test_journal_records_deposits_and_trades(mock_lookup_stock, mock_get_latest_price, portfolio):
+    """Test that deposits, buys and sells are journaled with their cash effect."""
+    portfolio.load_stock(Stock(symbol="AAPL", name="Apple Inc.", current_price=90.0, quantity=5,
+                               description="", sector="", industry="", market_cap=""))
+    portfolio.profile_charge_funds(50.0)
+    portfolio.sell_stock("AAPL", 2)
+    portfolio.buy_stock("AAPL", 1)
+
+    journal = portfolio.get_journal()
+    assert [(e.action, e.symbol, e.quantity, e.cash) for e in journal] == [
+        ("deposit", None, 0, 50.0), ("sell", "AAPL", 2, 200.0), ("buy", "AAPL", 1, -100.0)]
+    assert [e.share_delta for e in journal] == [0, -2, 1]
+
+
+def test_load_and_clear_journal(portfolio):
+    """Test that a saved journal can be restored and that clearing the portfolio resets it."""
+    portfolio.load_journal([{"timestamp": 1.0, "action": "buy", "symbol": "AAPL",
+                             "quantity": 3, "price": 10.0, "cash": -30.0}])
+    assert portfolio.get_journal()[0].share_delta == 3
+
+    portfolio.clear_all_stocks()
+    assert portfolio.get_journal() == []
+
+
+@patch("stock_app.models.portfolio_model.get_latest_price")
+@patch("stock_app.models.portfolio_model.lookup_stock", return_value={
+    "symbol": "AAPL", "name": "Apple Inc.", "description": "", "sector": "", "industry": "", "market_cap": ""})
+def test_fifo_cost_basis_and_pnl(mock_lookup_stock, mock_get_latest_price, portfolio):
+    """Test that sales realize gains against the oldest lots and the rest stays unrealized."""
+    for price, quantity in ((10.0, 3), (20.0, 3)):
+        mock_get_latest_price.return_value = price
+        portfolio.buy_stock("AAPL", quantity)
+    mock_get_latest_price.return_value = 30.0
+    portfolio.sell_stock("AAPL", 4)
+
+    stock = portfolio.holding_stocks["AAPL"]
+    assert list(stock.lots) == [[2, 20.0]]
+    assert stock.cost_basis == 40.0
+    assert stock.realized_pnl == 4 * 30.0 - (3 * 10.0 + 20.0)
+
+    portfolio.apply_price("AAPL", 30.0)
+    summary = portfolio.display_portfolio()
+    assert summary["realized_pnl"] == 70.0
+    assert summary["unrealized_pnl"] == 2 * 30.0 - 40.0
+    assert summary["portfolio"][0]["average_cost"] == 20.0
+
+
+@patch("stock_app.models.portfolio_model.get_latest_price", return_value=40.0)
+def test_average_cost_basis(mock_get_latest_price, portfolio):
+    """Test that with average costing the remaining shares keep the average price."""
+    portfolio.load_stock(Stock(symbol="AAPL", name="Apple Inc.", current_price=40.0, quantity=4,
+                               description="", sector="", industry="", market_cap="",
+                               lots=[[2, 10.0], [2, 30.0]]))
+    with patch.object(PortfolioModel, "cost_method", "average"):
+        portfolio.sell_stock("AAPL", 1)
+
+    stock = portfolio.holding_stocks["AAPL"]
+    assert list(stock.lots) == [[3, 20.0]]
+    assert stock.realized_pnl == 40.0 - 20.0
+    assert portfolio.get_realized_pnl() == 20.0
+
+
+def test_realized_pnl_survives_position_removal(portfolio):
+    """Test that the portfolio keeps realized gains after a position is sold out and removed."""
+    portfolio.load_stock(Stock(symbol="AAPL", name="Apple Inc.", current_price=10.0, quantity=2,
+                               description="", sector="", industry="", market_cap=""))
+    with patch("stock_app.models.portfolio_model.get_latest_price", return_value=15.0):
+        portfolio.remove_interested_stock("AAPL")
+
+    assert "AAPL" not in portfolio.holding_stocks
+    assert portfolio.display_portfolio()["realized_pnl"] == 10.0
+
+
+def test_stock_lots_must_match_quantity():
+    """Test that lots inconsistent with the quantity are rejected."""
+    with pytest.raises(ValueError, match="Lots must add up to the quantity"):
+        Stock(symbol="AAPL", name="Apple Inc.", current_price=10.0, quantity=3,
+              description="", sector="", industry="", market_cap="", lots=[[2, 10.0]])
+
+
+@patch("stock_app.models.portfolio_model.get_latest_price")
+@patch("stock_app.models.portfolio_model.lookup_stock", return_value={
+    "symbol": "MSFT", "name": "Microsoft Corp.", "current_price": 100.0, "description": "",
+    "sector": "TECHNOLOGY", "industry": "SOFTWARE", "market_cap": "3000000000000"})
+def test_exposure_follows_trades_and_prices(mock_lookup_stock, mock_get_latest_price, portfolio):
+    """Test that the maintained exposure matches a regroup of the holdings after every kind of change."""
+    def regrouped():
+        sectors = {}
+        for stock in portfolio.holding_stocks.values():
+            if stock.quantity:
+                sectors[stock.sector] = sectors.get(stock.sector, 0.0) + stock.current_price * stock.quantity
+        return sectors
+
+    def sectors():
+        return {row["group"]: row["value"] for row in portfolio.get_exposure()["sector"]}
+
+    portfolio.holding_stocks["XOM"] = Stock(
+        symbol="XOM", name="Exxon", current_price=50.0, description="", sector="ENERGY",
+        industry="OIL", market_cap="400000000000", quantity=4)
+    mock_get_latest_price.return_value = 100.0
+    portfolio.buy_stock("MSFT", 3)
+    assert sectors() == regrouped() == {"ENERGY": 200.0, "TECHNOLOGY": 300.0}
+    assert portfolio.get_exposure()["funds"] == 700.0
+
+    portfolio.apply_price("XOM", 75.0)
+    mock_get_latest_price.return_value = 120.0
+    portfolio.sell_stock("MSFT", 1)
+    assert sectors() == regrouped() == {"ENERGY": 300.0, "TECHNOLOGY": 200.0}
+
+    portfolio.sell_stock("MSFT", 2)
+    assert sectors() == regrouped() == {"ENERGY": 300.0}
+
+    portfolio.load_stock(Stock(symbol="XOM", name="Exxon", current_price=80.0, description="", sector="ENERGY",
+                               industry="OIL", market_cap="400000000000", quantity=1))
+    assert sectors() == regrouped() == {"ENERGY": 400.0}
+
+    portfolio.clear_all_stocks()
+    assert portfolio.get_exposure()["total_value"] == 0.0
+    assert sectors() == {}
+
+
+def test_holdings_by_market_cap(portfolio):
+    """Test that range queries use the market-cap index, which follows positions and reloads."""
+    for symbol, market_cap in (("AAPL", "3000000000000"), ("SMOL", "500000000"), ("MID", "5000000000"),
+                               ("UNK", "None")):
+        portfolio.holding_stocks[symbol] = Stock(
+            symbol=symbol, name=symbol, current_price=10.0, description="", sector="", industry="",
+            market_cap=market_cap, quantity=1)
+
+    assert list(portfolio.get_holdings_by_market_cap(min_value=10e9)) == ["AAPL"]
+    assert list(portfolio.get_holdings_by_market_cap(max_value=10e9)) == ["SMOL", "MID"]
+    assert list(portfolio.get_holdings_by_market_cap()) == ["SMOL", "MID", "AAPL"]
+
+    portfolio.load_stock(Stock(symbol="MID", name="MID", current_price=10.0, description="", sector="",
+                               industry="", market_cap="50000000000", quantity=1))
+    assert list(portfolio.get_holdings_by_market_cap(min_value=10e9)) == ["MID", "AAPL"]
+
+    del portfolio.holding_stocks["AAPL"]
+    assert list(portfolio.get_holdings_by_market_cap(min_value=10e9)) == ["MID"]
+
+
+def test_display_portfolio_page_matches_full_display(portfolio):
+    """Test that pages of the portfolio carry the same rows and totals as the full display."""
+    for symbol, sector, price in (("AAPL", "TECH", 150.0), ("XOM", "ENERGY", 100.0), ("MSFT", "TECH", 400.0)):
+        portfolio.holding_stocks[symbol] = Stock(
+            symbol=symbol, name=symbol, current_price=price, description="", sector=sector, industry="",
+            market_cap="", quantity=2, lots=[[2, 90.0]])
+    full = portfolio.display_portfolio()
+    rows = {row["symbol"]: row for row in full["portfolio"]}
+
+    page = portfolio.display_portfolio_page(limit=2)
+    assert [row["symbol"] for row in page["portfolio"]] == ["MSFT", "AAPL"]
+    assert page["portfolio"][0] == {**rows["MSFT"], "weight": 800.0 / 1300.0}
+    assert page["total_value"] == full["total_value"]
+    assert page["unrealized_pnl"] == full["unrealized_pnl"]
+    assert page["count"] == 3
+
+    rest = portfolio.display_portfolio_page(limit=2, cursor=page["next_cursor"])
+    assert [row["symbol"] for row in rest["portfolio"]] == ["XOM"]
+    assert rest["next_cursor"] is None
+
+    holdings = portfolio.get_holdings_page(sort="symbol", sector="TECH")
+    assert [stock.symbol for stock in holdings["holdings"]] == ["AAPL", "MSFT"]
+
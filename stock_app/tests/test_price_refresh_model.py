@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+from stock_app.models.holdings_index_model import HoldingsIndex
+from stock_app.models.portfolio_model import PortfolioModel
+from stock_app.models.price_refresh_model import PriceRefreshScheduler
+from stock_app.models.stock_model import Stock
+
+
+def make_stock(symbol, price=100.0, quantity=1):
+    return Stock(symbol=symbol, name=symbol, current_price=price, quantity=quantity,
+                 description="", sector="", industry="", market_cap="")
+
+
+@pytest.fixture
+def index():
+    """Fixture for a holdings index isolated from the shared one."""
+    return HoldingsIndex()
+
+@pytest.fixture
+def portfolios(index):
+    """Fixture for three portfolios: AAPL held by all, MSFT by two, IBM watched by one."""
+    first = PortfolioModel(funds=0.0, userid=1, index=index)
+    second = PortfolioModel(funds=0.0, userid=2, index=index)
+    third = PortfolioModel(funds=0.0, userid=3, index=index)
+    for portfolio in (first, second, third):
+        portfolio.load_stock(make_stock("AAPL"))
+    for portfolio in (first, second):
+        portfolio.load_stock(make_stock("MSFT"))
+    third.load_stock(make_stock("IBM", quantity=0))
+    return [first, second, third]
+
+
+def test_plan_prioritizes_by_holders_within_budget(index, portfolios):
+    """Test that the plan is deduplicated, ordered by holder count and capped by the budget."""
+    scheduler = PriceRefreshScheduler(MagicMock(), index, interval=60, budget=2)
+    assert scheduler.plan(now=1000.0) == ["AAPL", "MSFT"]
+
+
+def test_plan_skips_recently_refreshed(index, portfolios):
+    """Test that symbols refreshed within the interval give their budget to stale ones."""
+    scheduler = PriceRefreshScheduler(MagicMock(), index, interval=60, budget=2)
+    scheduler.last_refreshed["AAPL"] = 990.0
+    assert scheduler.plan(now=1000.0) == ["MSFT", "IBM"]
+
+
+def test_plan_includes_watched_symbols(index, portfolios):
+    """Test that watched symbols, e.g. of standing orders, are refreshed and add to the ranking."""
+    scheduler = PriceRefreshScheduler(MagicMock(), index, interval=60, budget=3,
+                                      watched=lambda: {"TSLA": 5, "IBM": 2})
+    assert scheduler.plan(now=1000.0) == ["TSLA", "AAPL", "IBM"]
+
+
+@patch("stock_app.models.price_refresh_model.get_latest_price", return_value=120.0)
+def test_refresh_once_updates_every_holder(mock_get_latest_price, index, portfolios):
+    """Test that a cycle makes one call per planned symbol and updates all portfolios."""
+    scheduler = PriceRefreshScheduler(MagicMock(), index, interval=60, budget=1)
+
+    assert scheduler.refresh_once() == {"AAPL": 120.0}
+    mock_get_latest_price.assert_called_once()
+    assert all(p.holding_stocks["AAPL"].current_price == 120.0 for p in portfolios)
+    assert portfolios[0].holding_stocks["MSFT"].current_price == 100.0
+
+
+@patch("stock_app.models.price_refresh_model.get_latest_price", side_effect=ValueError("rate limited"))
+def test_refresh_once_tolerates_failures(mock_get_latest_price, index, portfolios):
+    """Test that failed fetches are skipped without marking the symbol fresh."""
+    scheduler = PriceRefreshScheduler(MagicMock(), index, interval=60, budget=3)
+    assert scheduler.refresh_once() == {}
+    assert scheduler.last_refreshed == {}
+
+
+@patch("stock_app.models.price_refresh_model.get_latest_price", return_value=120.0)
+def test_quotes_go_through_the_apply_hook(mock_get_latest_price, index, portfolios):
+    """Test that a custom hook, e.g. one committing to shared state, applies quotes instead of the index."""
+    applied = []
+    scheduler = PriceRefreshScheduler(MagicMock(), index, interval=60, budget=1,
+                                      apply_quote=lambda symbol, price: applied.append((symbol, price)))
+    scheduler.refresh_once()
+    assert applied == [("AAPL", 120.0)]
+    assert portfolios[0].holding_stocks["AAPL"].current_price == 100.0
+
+
+@patch("stock_app.models.price_refresh_model.get_latest_price", return_value=120.0)
+def test_background_cycles_run_only_on_the_leader(mock_get_latest_price, index, portfolios):
+    """Test that a process that is not the elected leader skips its refresh cycles."""
+    scheduler = PriceRefreshScheduler(MagicMock(), index, interval=60, budget=1)
+    elections = []
+
+    def leader():
+        elections.append(True)
+        scheduler._stopped.set()
+        return False
+
+    scheduler.leader = leader
+    scheduler._run()
+    assert elections == [True]
+    mock_get_latest_price.assert_not_called()
@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from stock_app.models.price_stream_model import PriceStreamer, Subscription
+
+
+@pytest.fixture
+def streamer():
+    """Fixture for a PriceStreamer polling a mocked TimeSeries quickly."""
+    streamer = PriceStreamer(MagicMock(), interval=0.01)
+    yield streamer
+    for symbol in streamer.active_symbols():
+        streamer._pollers[symbol].stopped.set()
+
+
+def next_event(subscription):
+    """Return the first non-heartbeat event of a subscription."""
+    for event in subscription.events(timeout=1.0):
+        if event is not None:
+            return event
+
+
+@patch("stock_app.models.price_stream_model.get_latest_price", return_value=150.0)
+def test_subscribers_share_one_poller(mock_get_latest_price, streamer):
+    """Test that two subscriptions to the same symbol share a single poller."""
+    first = streamer.subscribe({"AAPL"})
+    second = streamer.subscribe({"AAPL"})
+
+    assert streamer.active_symbols() == ["AAPL"]
+    assert next_event(first)["price"] == 150.0
+    assert next_event(second)["price"] == 150.0
+    assert all(call.args[0] == "AAPL" for call in mock_get_latest_price.call_args_list)
+
+    streamer.unsubscribe(first)
+    assert streamer.active_symbols() == ["AAPL"]
+    streamer.unsubscribe(second)
+    assert streamer.active_symbols() == []
+
+
+@patch("stock_app.models.price_stream_model.get_latest_price", side_effect=ValueError("No price data found"))
+def test_poll_error_is_published(mock_get_latest_price, streamer):
+    """Test that a failed poll is delivered as an error event."""
+    subscription = streamer.subscribe({"INVALID"})
+    event = next_event(subscription)
+    assert event["symbol"] == "INVALID"
+    assert "No price data found" in event["error"]
+    streamer.unsubscribe(subscription)
+
+
+@patch("stock_app.models.price_stream_model.get_latest_price", return_value=99.0)
+def test_listeners_receive_quotes(mock_get_latest_price, streamer):
+    """Test that registered listeners are called with every polled quote."""
+    received = threading.Event()
+    quotes = []
+
+    def listener(symbol, price):
+        quotes.append((symbol, price))
+        received.set()
+
+    streamer.add_listener(listener)
+    subscription = streamer.subscribe({"IBM"})
+    assert received.wait(timeout=1.0)
+    assert quotes[0] == ("IBM", 99.0)
+    streamer.unsubscribe(subscription)
+
+
+def test_subscription_drops_oldest_when_full():
+    """Test that a full subscription queue keeps the newest events."""
+    subscription = Subscription({"AAPL"}, max_queue=2)
+    for price in (1.0, 2.0, 3.0):
+        subscription.publish({"symbol": "AAPL", "price": price})
+
+    events = subscription.events(timeout=0.01)
+    assert next(events)["price"] == 2.0
+    assert next(events)["price"] == 3.0
+    assert next(events) is None
@@ -0,0 +1,55 @@
+import pytest
+
+from stock_app.utils.rate_limiter import RateLimiter
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_time():
+    """Fixture for a manually advanced clock whose sleep advances it."""
+    return FakeTime()
+
+
+def test_burst_then_refill(fake_time):
+    """Test that the bucket allows a burst and refills at the configured rate."""
+    limiter = RateLimiter(5, per=60.0, clock=fake_time.clock, sleep=fake_time.sleep)
+    assert all(limiter.try_acquire() for _ in range(5))
+    assert not limiter.try_acquire()
+
+    fake_time.now += 12.0
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+
+
+def test_acquire_waits_for_a_token(fake_time):
+    """Test that acquire sleeps until the next token is due."""
+    limiter = RateLimiter(5, per=60.0, clock=fake_time.clock, sleep=fake_time.sleep)
+    for _ in range(5):
+        limiter.acquire()
+    assert limiter.acquire()
+    assert fake_time.now == pytest.approx(12.0)
+
+
+def test_acquire_times_out(fake_time):
+    """Test that acquire gives up after the timeout."""
+    limiter = RateLimiter(1, per=60.0, clock=fake_time.clock, sleep=fake_time.sleep)
+    limiter.acquire()
+    assert not limiter.acquire(timeout=5.0)
+
+
+def test_invalid_rate():
+    """Test that a non-positive rate is rejected."""
+    with pytest.raises(ValueError):
+        RateLimiter(0)
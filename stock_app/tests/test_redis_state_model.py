@@ -0,0 +1,255 @@
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from stock_app.models.holdings_index_model import HoldingsIndex
+from stock_app.models.portfolio_model import PortfolioModel
+from stock_app.models.price_refresh_model import PriceRefreshScheduler
+from stock_app.models.redis_state_model import PortfolioConflictError, RedisPortfolioStore, UserLoggedInError
+from stock_app.models.stock_model import Stock
+
+
+def make_stock(symbol: str, quantity: int = 10, price: float = 100.0) -> Stock:
+    return Stock(symbol, f"{symbol} Inc", price, "", "Technology", "Software", "1B", quantity)
+
+
+@pytest.fixture
+def redis():
+    """
+    Fixture for a Redis that runs the store's Lua scripts: the server at REDIS_TEST_URL,
+    whose database is flushed, or else fakeredis with its Lua runtime.
+    """
+    url = os.getenv("REDIS_TEST_URL")
+    if url:
+        from redis import Redis
+        client = Redis.from_url(url)
+        client.flushdb()
+        yield client
+        client.flushdb()
+        return
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    yield fakeredis.FakeRedis()
+
+
+@pytest.fixture
+def workers(redis):
+    """Fixture for two workers sharing one Redis, with user 7 logged in on the first."""
+    first, second = PortfolioModel(), PortfolioModel()
+    stores = RedisPortfolioStore(redis), RedisPortfolioStore(redis)
+    stores[0].attach(first, 7, lambda: login(first, 7, 1000.0))
+    return (first, stores[0]), (second, stores[1])
+
+
+def login(portfolio: PortfolioModel, user_id: int, funds: float) -> None:
+    """Loads a saved session holding 10 AAPL shares, as `login_user` would."""
+    portfolio.clear_all_stocks()
+    portfolio.userID = user_id
+    portfolio.profile_charge_funds(funds)
+    portfolio.load_stock(make_stock("AAPL"))
+
+
+def buy(portfolio: PortfolioModel, symbol: str, quantity: int, price: float) -> None:
+    """Buys through the model's own accounting without quoting upstream."""
+    with portfolio.lock:
+        portfolio._apply_buy(symbol, quantity, price, make_stock(symbol).__dict__)
+
+
+def test_other_workers_load_the_shared_portfolio(workers):
+    """Test that a worker that did not handle the login serves the logged-in portfolio."""
+    (_, _), (second, store) = workers
+    assert store.sync(second)
+    assert second.userID == 7
+    assert second.get_funds() == 1000.0
+    assert second.get_stock_holdings()["AAPL"].quantity == 10
+    assert [entry.action for entry in second.get_journal()] == ["deposit"]
+
+
+def test_updates_commit_changed_positions_and_journal(workers, redis):
+    """Test that a trade commits only the positions it changed, and other workers pick it up."""
+    (first, store), (second, other_store) = workers
+    store.update(first, lambda: buy(first, "MSFT", 2, 50.0))
+
+    assert set(redis.hkeys("portfolio:7:positions")) == {b"AAPL", b"MSFT"}
+    assert redis.hget("portfolio:7", "version") == b"2"
+    assert redis.llen("portfolio:7:journal") == 2
+
+    other_store.sync(second)
+    assert second.get_funds() == 900.0
+    assert list(second.get_stock_holdings()["MSFT"].lots) == [[2, 50.0]]
+    # Reads on an unchanged version do not reload.
+    assert other_store.sync(second)
+
+
+def test_conflicting_update_is_reloaded_and_run_again(workers):
+    """Test that a trade that lost the race to another worker runs again on the new state."""
+    (first, store), (second, other_store) = workers
+    other_store.sync(second)
+    calls = []
+
+    def sell_while_other_worker_deposits():
+        if not calls:
+            store.update(first, lambda: first.profile_charge_funds(500.0))
+        calls.append(True)
+        with second.lock:
+            second._apply_sell("AAPL", 4, 120.0)
+
+    other_store.update(second, sell_while_other_worker_deposits)
+
+    assert len(calls) == 2
+    store.sync(first)
+    assert first.get_funds() == 1000.0 + 500.0 + 480.0
+    assert first.get_stock_holdings()["AAPL"].quantity == 6
+    assert [entry.action for entry in first.get_journal()] == ["deposit", "deposit", "sell"]
+
+
+def test_quotes_are_fetched_once_before_the_version_is_read(workers):
+    """Test that a trade quotes outside the lock, and a retry applies the same quote again."""
+    (first, store), (second, other_store) = workers
+    other_store.sync(second)
+    quotes, applied = [], []
+
+    def quote():
+        assert not other_store._write_lock.locked()
+        # A change committed while the quote is in flight does not conflict.
+        store.update(first, lambda: first.profile_charge_funds(1.0))
+        quotes.append(120.0)
+        return 120.0
+
+    def sell(price):
+        if not applied:
+            store.update(first, lambda: first.profile_charge_funds(500.0))
+        applied.append(price)
+        with second.lock:
+            second._apply_sell("AAPL", 4, price)
+
+    other_store.update(second, sell, quote)
+
+    assert quotes == [120.0] and applied == [120.0, 120.0]
+    store.sync(first)
+    assert first.get_funds() == 1000.0 + 1.0 + 500.0 + 480.0
+
+
+def test_update_gives_up_after_retries(workers, redis):
+    """Test that an update that keeps conflicting is dropped and the shared state reloaded."""
+    (first, store), (second, _) = workers
+    impatient = RedisPortfolioStore(redis, retries=1)
+    impatient.sync(second)
+
+    def deposit_while_other_worker_deposits():
+        store.update(first, lambda: first.profile_charge_funds(1.0))
+        second.profile_charge_funds(100.0)
+
+    with pytest.raises(PortfolioConflictError):
+        impatient.update(second, deposit_while_other_worker_deposits)
+    assert second.get_funds() == 1002.0
+
+
+def test_clear_replaces_the_shared_journal(workers, redis):
+    """Test that clearing the portfolio also clears the journal the other workers load."""
+    (first, store), _ = workers
+    store.update(first, first.clear_all_stocks)
+    assert not redis.exists("portfolio:7:journal", "portfolio:7:positions")
+    assert redis.hget("portfolio:7", "funds") == b"0.0"
+
+
+def test_release_saves_then_stops_sharing(workers, redis):
+    """Test that logging out saves the current state and other workers then drop the portfolio."""
+    (first, store), (second, other_store) = workers
+    other_store.sync(second)
+    saved = []
+
+    store.release(first, 7, lambda: saved.append(first.get_funds()))
+
+    assert saved == [1000.0]
+    assert redis.keys("portfolio:*") == []
+    assert not other_store.sync(second)
+    assert second.userID is None and second.get_stock_holdings() == {}
+
+
+def test_login_on_another_worker_adopts_the_shared_portfolio(workers):
+    """Test that logging in while another worker shares the portfolio keeps the shared state."""
+    (first, store), (second, other_store) = workers
+    store.update(first, lambda: first.profile_charge_funds(5.0))
+
+    other_store.attach(second, 7, lambda: login(second, 7, 1.0))
+    assert second.get_funds() == 1005.0
+
+
+def test_login_is_refused_while_another_user_is_logged_in(workers, redis):
+    """Test that another user cannot take over the shared portfolio, even on another worker."""
+    (first, _), (second, other_store) = workers
+    loaded = []
+
+    with pytest.raises(UserLoggedInError, match="User ID 7"):
+        other_store.attach(second, 8, lambda: loaded.append(8))
+    assert loaded == [] and redis.get("portfolio:active") == b"7"
+
+    # User 7 logs in again on another worker between the check and the publish.
+    redis.delete("portfolio:active")
+
+    def load_while_user_7_logs_in():
+        redis.set("portfolio:active", 7)
+        login(second, 8, 1.0)
+
+    with pytest.raises(UserLoggedInError):
+        other_store.attach(second, 8, load_while_user_7_logs_in)
+    assert second.userID == 7 and second.get_funds() == 1000.0
+
+
+def test_logout_of_another_user_saves_nothing(workers, redis):
+    """Test that logging out a user who is not logged in never saves the shared portfolio as theirs."""
+    (first, store), _ = workers
+    saved = []
+    with pytest.raises(ValueError, match="User ID 8 is not logged in"):
+        store.release(first, 8, lambda: saved.append(first.get_funds()))
+    assert saved == [] and redis.get("portfolio:active") == b"7"
+
+
+def test_price_updates_are_shared(workers):
+    """Test that a price update is committed like a trade, so every worker serves it."""
+    (first, store), (second, other_store) = workers
+    store.update(first, lambda price: first.update_latest_price("AAPL", price), lambda: 123.0)
+    other_store.sync(second)
+    assert second.get_stock_holdings()["AAPL"].current_price == 123.0
+
+
+def test_refreshed_prices_are_shared(workers):
+    """Test that quotes applied through the store reach the portfolio every worker serves."""
+    (first, store), (second, other_store) = workers
+    scheduler = PriceRefreshScheduler(
+        MagicMock(), HoldingsIndex(),
+        apply_quote=lambda symbol, price: store.update(first, lambda: first.apply_price(symbol, price)))
+
+    scheduler.record_quote("AAPL", 200.0)
+    store.sync(first)
+    other_store.sync(second)
+    assert first.get_stock_holdings()["AAPL"].current_price == 200.0
+    assert second.get_stock_holdings()["AAPL"].current_price == 200.0
+
+
+def test_one_worker_leads_a_role(redis):
+    """Test that one worker holds a role until its lease lapses, then another takes over."""
+    first, second = RedisPortfolioStore(redis), RedisPortfolioStore(redis)
+    assert first.lead("price-refresh", 60)
+    assert first.lead("price-refresh", 60)
+    assert not second.lead("price-refresh", 60)
+
+    redis.delete("portfolio:lease:price-refresh")
+    assert second.lead("price-refresh", 60)
+    assert not first.lead("price-refresh", 60)
+
+
+def test_compacted_journal_replaces_the_shared_one(workers, redis):
+    """Test that the shared journal stays within the limit once the model compacts it."""
+    (first, store), (second, other_store) = workers
+    first.journal_limit = 4
+    for _ in range(6):
+        store.update(first, lambda: first.profile_charge_funds(1.0))
+
+    assert len(first.get_journal()) <= 4
+    assert redis.llen("portfolio:7:journal") == len(first.get_journal())
+    other_store.sync(second)
+    assert second.get_journal() == first.get_journal()
+    assert second.get_funds() == 1006.0
@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from stock_app.models.portfolio_model import PortfolioModel
+from stock_app.models.risk_model import (RiskSimulator, covariance_factor, log_returns, parse_shocks,
+                                         portfolio_risk, simulate_shard, value_at_risk)
+from stock_app.models.stock_model import Stock, daily_bar_columns
+
+
+@pytest.fixture
+def returns():
+    """Fixture for 250 days of correlated returns of two symbols."""
+    rng = np.random.default_rng(3)
+    common = rng.normal(0, 0.01, (250, 1))
+    return common + rng.normal(0, 0.005, (250, 2))
+
+
+def test_log_returns():
+    """Test daily log returns and the lookback window."""
+    closes = np.array([[100.0], [110.0], [99.0]])
+    assert log_returns(closes)[:, 0] == pytest.approx([np.log(1.1), np.log(0.9)])
+    assert log_returns(closes, lookback=1)[:, 0] == pytest.approx([np.log(0.9)])
+
+
+def test_covariance_factor_handles_singular_covariance():
+    """Test that the factor reproduces the covariance even when it is singular."""
+    base = np.random.default_rng(0).normal(size=(50, 1))
+    returns = np.hstack([base, base])
+    mean, factor = covariance_factor(returns)
+    assert factor @ factor.T == pytest.approx(np.cov(returns, rowvar=False))
+
+
+def test_bootstrap_resamples_historical_days(returns):
+    """Test that bootstrapped one-day P&Ls are drawn from the historical ones."""
+    values = np.array([1000.0, 500.0])
+    pnl = simulate_shard(returns, values, "bootstrap", 500, 1, np.random.SeedSequence(1))
+    historical = np.expm1(returns) @ values
+    assert np.isin(pnl, historical).all()
+
+
+def test_simulation_is_reproducible_and_shard_independent(returns, monkeypatch):
+    """Test that a seed fixes the result whatever the sharding and worker count."""
+    values = np.array([1000.0, 500.0])
+    simulator = RiskSimulator(workers=1)
+    first = simulator.simulate(returns, values, "normal", 3000, 5, seed=42)
+    assert np.array_equal(first, simulator.simulate(returns, values, "normal", 3000, 5, seed=42))
+
+    pooled = RiskSimulator(workers=2, min_parallel_paths=1)
+    monkeypatch.setattr("stock_app.models.risk_model.SHARD_ELEMENTS", 1000)
+    serial = simulator.simulate(returns, values, "bootstrap", 3000, 5, seed=7)
+    try:
+        assert np.array_equal(pooled.simulate(returns, values, "bootstrap", 3000, 5, seed=7), serial)
+    finally:
+        pooled.shutdown()
+
+
+def test_simulation_rejects_invalid_input(returns):
+    """Test validation of the method, path count and history."""
+    simulator = RiskSimulator()
+    with pytest.raises(ValueError, match="Unknown method"):
+        simulator.simulate(returns, np.ones(2), method="garch")
+    with pytest.raises(ValueError, match="Paths and horizon"):
+        simulator.simulate(returns, np.ones(2), paths=0)
+    with pytest.raises(ValueError, match="two daily returns"):
+        simulator.simulate(returns[:1], np.ones(2))
+
+
+def test_value_at_risk():
+    """Test VaR as the loss quantile and expected shortfall as the mean loss beyond it."""
+    pnl = np.arange(-50.0, 50.0)
+    var, shortfall = value_at_risk(pnl, 0.95)
+    assert var == pytest.approx(-np.quantile(pnl, 0.05))
+    assert shortfall == pytest.approx(-np.mean(pnl[pnl <= -var]))
+    assert shortfall >= var
+
+
+def test_parse_shocks():
+    """Test parsing what-if shocks and rejecting malformed ones."""
+    assert parse_shocks("aapl:-0.2, MSFT:0.1") == {"AAPL": -0.2, "MSFT": 0.1}
+    assert parse_shocks(None) == {}
+    for text in ("AAPL", "AAPL:down", ":0.1", "AAPL:-1.5"):
+        with pytest.raises(ValueError, match="Invalid shock"):
+            parse_shocks(text)
+
+
+def test_portfolio_risk():
+    """Test risk figures for current holdings, valued at their current price, with a shock."""
+    portfolio = PortfolioModel(funds=0.0, userid=1)
+    portfolio.load_stock(Stock(symbol="AAPL", name="Apple Inc.", current_price=20.0, quantity=10,
+                               description="", sector="", industry="", market_cap=""))
+    closes = {f"2024-01-{day:02d}": 10.0 + (day % 3) for day in range(1, 31)}
+    store = MagicMock()
+    store.load_many.return_value = ({"AAPL": daily_bar_columns("AAPL", {
+        date: {"1. open": c, "2. high": c, "3. low": c, "4. close": c} for date, c in closes.items()})}, {})
+
+    risk = portfolio_risk(portfolio, store, RiskSimulator(), paths=2000, seed=1, shocks={"AAPL": -0.5})
+
+    assert risk["symbols"] == ["AAPL"]
+    assert risk["value"] == 200.0
+    assert 0 < risk["var"] <= risk["expected_shortfall"] < 200.0
+    assert risk["var_pct"] == pytest.approx(risk["var"] / 200.0)
+    assert risk["scenario_pnl"] == -100.0
+
+    with pytest.raises(ValueError, match="not held"):
+        portfolio_risk(portfolio, store, RiskSimulator(), shocks={"MSFT": -0.1})
+    with pytest.raises(ValueError, match="Confidence"):
+        portfolio_risk(portfolio, store, RiskSimulator(), confidence=1.0)
+
+
+def test_portfolio_risk_of_lower_case_holding():
+    """Test that a holding bought under a lower-case symbol matches its upper-case history and shocks."""
+    portfolio = PortfolioModel(funds=0.0, userid=1)
+    portfolio.load_stock(Stock(symbol="aapl", name="Apple Inc.", current_price=20.0, quantity=10,
+                               description="", sector="", industry="", market_cap=""))
+    closes = {f"2024-01-{day:02d}": 10.0 + (day % 3) for day in range(1, 31)}
+    store = MagicMock()
+    store.load_many.return_value = ({"AAPL": daily_bar_columns("AAPL", {
+        date: {"1. open": c, "2. high": c, "3. low": c, "4. close": c} for date, c in closes.items()})}, {})
+
+    risk = portfolio_risk(portfolio, store, RiskSimulator(), paths=500, seed=1, shocks=parse_shocks("AAPL:-0.5"))
+
+    assert risk["symbols"] == ["AAPL"] and risk["value"] == 200.0
+    assert risk["scenario_pnl"] == -100.0
+    assert portfolio_risk(portfolio, store, RiskSimulator(), paths=500, seed=1, shocks={"aapl": -0.5}) == risk
+
+
+def test_portfolio_risk_without_holdings():
+    """Test that an empty portfolio carries no risk and loads no history."""
+    store = MagicMock()
+    risk = portfolio_risk(PortfolioModel(funds=100.0, userid=1), store, RiskSimulator())
+    assert risk["var"] == 0.0 and risk["symbols"] == []
+    store.load_many.assert_not_called()
@@ -0,0 +1,107 @@
+import pytest
+
+from stock_app.models.session_analytics_model import SessionAnalytics
+
+mongomock = pytest.importorskip("mongomock")
+
+
+class Clock:
+    """A settable clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def position(quantity: int, price: float) -> dict:
+    return {"quantity": quantity, "current_price": price}
+
+
+@pytest.fixture
+def collection():
+    """
+    Fixture for a sessions collection of three saved sessions; the last one was saved before
+    `held_symbols` and `updated_at` were written, and holds a symbol bought in lower case too.
+    """
+    collection = mongomock.MongoClient().db.sessions
+    collection.insert_many([
+        {"user_id": 7, "funds": 100.0, "stock_holdings": {"AAPL": position(4, 150.0), "IBM": position(2, 100.0)},
+         "held_symbols": ["AAPL", "IBM"], "updated_at": 500.0},
+        {"user_id": 3, "funds": 200.0, "stock_holdings": {"AAPL": position(6, 150.0), "MSFT": position(0, 400.0)},
+         "held_symbols": ["AAPL"], "updated_at": 400.0},
+        {"user_id": 9, "funds": 0.0, "stock_holdings": {"aapl": position(1, 150.0), "AAPL": position(1, 150.0)}},
+    ])
+    return collection
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def analytics(collection, clock):
+    """Fixture for analytics checking for session changes every 60 seconds."""
+    return SessionAnalytics(collection, refresh_interval=60, clock=clock)
+
+
+def test_summary_runs_in_mongo(analytics):
+    """Test that the summary pipeline totals the sessions and ranks symbols by holders."""
+    assert analytics.summary(top=5) == {
+        "users": 3, "funds": 300.0, "holdings_value": 2000.0, "aum": 2300.0,
+        "top_symbols": [{"symbol": "AAPL", "holders": 3, "shares": 12, "value": 1800.0},
+                        {"symbol": "IBM", "holders": 1, "shares": 2, "value": 200.0}],
+    }
+    assert analytics.summary(top=1)["top_symbols"] == [{"symbol": "AAPL", "holders": 3, "shares": 12, "value": 1800.0}]
+
+
+def test_summary_of_no_sessions(clock):
+    """Test that an empty collection reports zero totals."""
+    analytics = SessionAnalytics(mongomock.MongoClient().db.sessions, clock=clock)
+    assert analytics.summary() == {"users": 0, "funds": 0.0, "holdings_value": 0.0, "aum": 0.0, "top_symbols": []}
+
+
+def test_results_are_reused_until_sessions_change(analytics, collection, clock, mocker):
+    """Test that results are served from cache within the interval and while the watermark holds."""
+    aggregate = mocker.spy(collection, "aggregate")
+    watermark = mocker.spy(collection, "find_one")
+    analytics.summary()
+    analytics.summary()
+    assert watermark.call_count == 1
+
+    clock.now += 61
+    analytics.summary()
+    assert watermark.call_count == 2
+    assert aggregate.call_count == 1
+
+    clock.now += 61
+    collection.update_one({"user_id": 3}, {"$set": {"funds": 250.0, "updated_at": 1100.0}})
+    assert analytics.summary()["funds"] == 350.0
+    assert aggregate.call_count == 2
+    assert analytics.stats() == {"cached_results": 1, "computed": 2}
+
+
+def test_holders_use_the_held_symbols_index(analytics, collection):
+    """Test that holders are found by the indexed held_symbols field, whatever case is asked for."""
+    assert analytics.holders("aapl", limit=2) == {"symbol": "AAPL", "count": 3, "user_ids": [3, 7]}
+    assert analytics.holders("MSFT") == {"symbol": "MSFT", "count": 0, "user_ids": []}
+    assert "held_symbols_1_user_id_1" in collection.index_information()
+
+    with pytest.raises(ValueError, match="limit"):
+        analytics.holders("AAPL", limit=0)
+
+
+def test_prepare_creates_indexes_and_backfills_once(analytics, collection, mocker):
+    """Test that indexes and the upper-case held_symbols backfill are set up on first use only."""
+    backfill = mocker.spy(collection, "update_many")
+    analytics.summary()
+    analytics.holders("AAPL")
+
+    indexes = [index["key"] for index in collection.index_information().values()]
+    assert [("held_symbols", 1), ("user_id", 1)] in indexes
+    assert [("updated_at", -1)] in indexes
+    assert backfill.call_count == 1
+    backfilled = collection.find_one({"user_id": 9})
+    assert backfilled["held_symbols"] == ["AAPL"] and "updated_at" in backfilled
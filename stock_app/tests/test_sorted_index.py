@@ -0,0 +1,61 @@
+from stock_app.utils.sorted_index import SortedIndex
+
+
+def test_range_is_inclusive_and_ordered():
+    """Test that range scans return items with keys within both bounds, in key order."""
+    index = SortedIndex()
+    for key, item in ((3.0, "C"), (1.0, "A"), (2.0, "B"), (2.0, "AA"), (5.0, "E")):
+        index.add(key, item)
+
+    assert index.range() == ["A", "AA", "B", "C", "E"]
+    assert index.range(2.0, 3.0) == ["AA", "B", "C"]
+    assert index.range(low=2.5) == ["C", "E"]
+    assert index.range(high=2.0) == ["A", "AA", "B"]
+    assert index.range(4.0, 3.0) == []
+
+
+def test_add_moves_item_and_remove_drops_it():
+    """Test that re-adding an item re-keys it and removing it leaves the rest in order."""
+    index = SortedIndex()
+    index.add(1.0, "A")
+    index.add(2.0, "B")
+    index.add(3.0, "A")
+    assert index.range() == ["B", "A"]
+    assert len(index) == 2
+
+    index.remove("B")
+    index.remove("MISSING")
+    assert index.range() == ["A"]
+    assert "B" not in index and "A" in index
+
+
+def test_page_walks_both_directions_from_a_cursor():
+    """Test that pages continue after the last entry, forwards and backwards."""
+    index = SortedIndex()
+    for key, item in ((1.0, "A"), (2.0, "B"), (2.0, "C"), (3.0, "D")):
+        index.add(key, item)
+
+    assert index.page(2) == [(1.0, "A"), (2.0, "B")]
+    assert index.page(2, after=(2.0, "B")) == [(2.0, "C"), (3.0, "D")]
+    assert index.page(2, reverse=True) == [(3.0, "D"), (2.0, "C")]
+    assert index.page(5, after=(2.0, "C"), reverse=True) == [(2.0, "B"), (1.0, "A")]
+    # A cursor entry that no longer exists still marks the position.
+    assert index.page(5, after=(2.5, "X")) == [(3.0, "D")]
+
+
+
+def test_small_chunks_split_and_empty():
+    """Test that ranges and pages cross chunk boundaries as chunks split and empty out."""
+    index = SortedIndex(load=2)
+    for number in range(20):
+        index.add(float(number % 7), f"S{number:02d}")
+    expected = sorted((float(number % 7), f"S{number:02d}") for number in range(20))
+    assert index.range() == [item for _, item in expected]
+    assert index.range(2.0, 4.0) == [item for key, item in expected if 2.0 <= key <= 4.0]
+
+    for number in range(0, 20, 2):
+        index.remove(f"S{number:02d}")
+    remaining = [entry for entry in expected if int(entry[1][1:]) % 2]
+    assert index.page(4, after=remaining[2]) == remaining[3:7]
+    assert index.page(4, after=remaining[6], reverse=True) == remaining[5:1:-1]
+    assert len(index) == 10
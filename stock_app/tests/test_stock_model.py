@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import MagicMock, patch
-from stock_app.models.stock_model import Stock, lookup_stock, get_latest_price, stock_historical_data
+from stock_app.models.stock_model import (Stock, UnknownSymbolError, daily_bar_columns, fetch_daily_bars,
+                                          get_latest_price, iter_historical_data, lookup_stock, parse_market_cap,
+                                          stock_historical_data)
 
 # Patch the Alpha Vantage API initialization to use a mock API key
 @pytest.fixture(autouse=True)
@@ -49,6 +51,7 @@ def test_lookup_stock(mock_alpha_vantage_timeseries, mock_alpha_vantage_fundamen
     assert result["sector"] == "Technology"
     assert result["industry"] == "Consumer Electronics"
     assert result["market_cap"] == "2500000000000"
+    assert result["market_cap_value"] == 2.5e12
 
 @patch("stock_app.models.stock_model.FundamentalData.get_company_overview", return_value=None)
 @patch("stock_app.models.stock_model.TimeSeries.get_quote_endpoint", return_value=(None, None))
@@ -58,6 +61,28 @@ def test_lookup_stock_no_data(mock_get_company_overview, mock_get_quote_endpoint
         lookup_stock("INVALID", mock_alpha_vantage_timeseries, mock_get_company_overview)
 
 
+@pytest.mark.parametrize("market_cap, value", [
+    ("2500000000000", 2.5e12), ("2.5T", 2.5e12), ("750M", 750e6), ("1,200", 1200.0),
+    ("None", None), ("-", None), ("", None), (None, None), ("-5", None), ("nan", None),
+])
+def test_parse_market_cap(market_cap, value):
+    """Test that market caps are parsed into dollars and missing or invalid ones become None."""
+    assert parse_market_cap(market_cap) == value
+
+def test_stock_market_cap_value():
+    """Test that a stock parses its market cap once at construction."""
+    stock = Stock(symbol="AAPL", name="Apple Inc.", current_price=1.0, description="", sector="",
+                  industry="", market_cap="3000000000000", quantity=0)
+    assert stock.market_cap_value == 3e12
+
+def test_fifo_sale_pops_closed_lots():
+    """Test that a FIFO sale pops the lots it closes off the front and leaves the rest open."""
+    stock = Stock(symbol="AAPL", name="Apple Inc.", current_price=1.0, description="", sector="",
+                  industry="", market_cap="", quantity=1000, lots=[[1, float(price)] for price in range(1000)])
+    assert stock.remove_shares(998, 1000.0) == 998 * 1000.0 - sum(range(998))
+    assert list(stock.lots) == [[1, 998.0], [1, 999.0]]
+    assert stock.cost_basis == 998.0 + 999.0
+
 def test_get_latest_price(mock_alpha_vantage_timeseries):
     """Test retrieving the latest stock price."""
     symbol = "AAPL"
@@ -76,6 +101,25 @@ def test_get_latest_price_no_data(mock_get_quote_endpoint, mock_alpha_vantage_ti
     with pytest.raises(ValueError, match="No price data found for symbol"):
         get_latest_price("INVALID", mock_alpha_vantage_timeseries)
 
+def test_get_latest_price_unknown_symbol(mock_alpha_vantage_timeseries):
+    """Test that an empty quote for an unknown symbol raises UnknownSymbolError instead of returning a price."""
+    mock_alpha_vantage_timeseries.get_quote_endpoint.return_value = ({}, None)
+    with pytest.raises(UnknownSymbolError, match="No price data found for symbol"):
+        get_latest_price("INVALID", mock_alpha_vantage_timeseries)
+
+def test_fetch_daily_bars_unknown_symbol(mock_alpha_vantage_timeseries):
+    """Test that only the API's invalid-call error marks a symbol unknown, not other API errors."""
+    mock_alpha_vantage_timeseries.get_daily.side_effect = ValueError(
+        "Error Message: Invalid API call. Please retry or visit the documentation for TIME_SERIES_DAILY.")
+    with pytest.raises(UnknownSymbolError, match="No historical data found for symbol"):
+        fetch_daily_bars("INVALID", mock_alpha_vantage_timeseries, "compact")
+
+    mock_alpha_vantage_timeseries.get_daily.side_effect = ValueError(
+        "Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day.")
+    with pytest.raises(ValueError) as error:
+        fetch_daily_bars("AAPL", mock_alpha_vantage_timeseries, "compact")
+    assert not isinstance(error.value, UnknownSymbolError)
+
 def test_stock_historical_data(mock_alpha_vantage_timeseries):
     """Test retrieving historical price data."""
     symbol = "AAPL"
@@ -111,3 +155,26 @@ def test_stock_historical_data_no_data(mock_get_daily_adjusted, mock_alpha_vanta
     """Test error handling when no historical data is found."""
     with pytest.raises(ValueError, match="No historical data found for symbol"):
         stock_historical_data("INVALID", mock_alpha_vantage_timeseries, size="compact")
+
+def test_iter_historical_data_is_lazy(mock_alpha_vantage_timeseries):
+    """Test that the upstream call is made eagerly and rows are parsed on iteration."""
+    mock_alpha_vantage_timeseries.get_daily.return_value = ({
+        "2024-12-02": {"1. open": "1.0", "2. high": "2.0", "3. low": "0.5", "4. close": "1.5"},
+        "2024-12-01": {"1. open": "bad", "2. high": "2.0", "3. low": "0.5", "4. close": "1.5"},
+    }, {})
+    rows = iter_historical_data("AAPL", mock_alpha_vantage_timeseries, size="compact")
+    mock_alpha_vantage_timeseries.get_daily.assert_called_once()
+
+    assert next(rows) == {"date": "2024-12-02", "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5}
+    with pytest.raises(ValueError):
+        next(rows)
+
+def test_daily_bar_columns():
+    """Test parsing a raw series into columns."""
+    history = daily_bar_columns("AAPL", {
+        "2024-12-02": {"1. open": "1.0", "2. high": "2.0", "3. low": "0.5", "4. close": "1.5"},
+        "2024-12-01": {"1. open": "3.0", "2. high": "4.0", "3. low": "2.5", "4. close": "3.5"},
+    })
+    assert len(history) == 2
+    assert history.date == ["2024-12-02", "2024-12-01"]
+    assert list(history.close) == [1.5, 3.5]
@@ -0,0 +1,131 @@
+import pytest
+from unittest.mock import MagicMock
+
+from stock_app.models.stock_model import UnknownSymbolError
+from stock_app.models.symbol_index_model import SymbolGuard, SymbolIndex, tokenize
+from stock_app.utils.cache import NegativeCache
+
+
+@pytest.fixture
+def index():
+    """Fixture for an index with a few listings."""
+    index = SymbolIndex()
+    index.add("AAPL", "Apple Inc", "NASDAQ")
+    index.add("AAP", "Advance Auto Parts Inc", "NYSE")
+    index.add("APLE", "Apple Hospitality REIT Inc", "NYSE")
+    index.add("MSFT", "Microsoft Corporation", "NASDAQ")
+    return index
+
+
+def test_tokenize():
+    """Test that names are split into lowercase words."""
+    assert tokenize("Berkshire Hathaway Inc. (Class B)") == ["berkshire", "hathaway", "inc", "class", "b"]
+
+
+def test_search_symbol_prefix_ranks_shortest_first(index):
+    """Test that symbol prefix matches come first, shortest and exact symbols leading."""
+    assert [result["symbol"] for result in index.search("aap")] == ["AAP", "AAPL"]
+    assert index.search("msft") == [{"symbol": "MSFT", "name": "Microsoft Corporation", "exchange": "NASDAQ"}]
+
+
+def test_search_name_tokens(index):
+    """Test that names match by word prefixes, after symbol matches and without duplicates."""
+    assert [result["symbol"] for result in index.search("micro")] == ["MSFT"]
+    assert [result["symbol"] for result in index.search("appl")] == ["AAPL", "APLE"]
+    assert [result["symbol"] for result in index.search("ap")] == ["APLE", "AAPL"]
+
+
+def test_search_intersects_query_words(index):
+    """Test that every word of a query must match a word of the name."""
+    assert [result["symbol"] for result in index.search("apple hosp")] == ["APLE"]
+    assert [result["symbol"] for result in index.search("Inc apple")] == ["AAPL", "APLE"]
+    assert index.search("apple corp") == []
+
+
+def test_search_limit(index):
+    """Test that results stop at the limit and an empty query finds nothing."""
+    assert len(index.search("inc", limit=2)) == 2
+    assert index.search("a", limit=0) == []
+    assert index.search("  ") == []
+
+
+def test_add_rename_replaces_name_tokens(index):
+    """Test that renaming a listing drops the words of its old name."""
+    index.add("MSFT", "Macrohard Corporation")
+    assert index.search("micro") == []
+    assert index.search("macro")[0] == {"symbol": "MSFT", "name": "Macrohard Corporation", "exchange": "NASDAQ"}
+    assert [result["symbol"] for result in index.search("corp")] == ["MSFT"]
+    assert len(index) == 4
+
+
+def test_exists_and_completeness(index, tmp_path):
+    """Test that unknown symbols are only reported as such once a listing is loaded."""
+    assert index.exists("aapl") is True
+    assert index.exists("ZZZZ") is None
+
+    listing = tmp_path / "listing.csv"
+    listing.write_text("symbol,name,exchange,assetType,ipoDate,delistingDate,status\n"
+                       "IBM,International Business Machines Corp,NYSE,Stock,1962-01-02,null,Active\n"
+                       "OLD,Delisted Co,NYSE,Stock,1990-01-02,2001-01-02,Delisted\n")
+    assert index.load_listing(str(listing)) == 1
+    assert index.complete
+    assert index.exists("IBM") is True
+    assert index.exists("OLD") is False
+    assert index.exists("ZZZZ") is False
+    assert index.search("busi")[0]["exchange"] == "NYSE"
+
+
+def test_load_listing_requires_columns(tmp_path):
+    """Test that a listing without symbol and name columns is rejected."""
+    listing = tmp_path / "listing.csv"
+    listing.write_text("ticker,company\nIBM,IBM\n")
+    index = SymbolIndex()
+    with pytest.raises(ValueError, match="symbol and name"):
+        index.load_listing(str(listing))
+    assert not index.complete
+
+
+def test_suggest(index):
+    """Test that suggestions come from the longest indexed prefix of the symbol."""
+    assert index.suggest("AAPX") == ["AAP", "AAPL"]
+    assert index.suggest("MSFTT") == ["MSFT"]
+    assert index.suggest("ZZZ") == []
+
+
+@pytest.fixture
+def guard(index):
+    """Fixture for a guard over the index with a fixed clock."""
+    return SymbolGuard(index, NegativeCache(ttl=60, clock=lambda: 1000.0))
+
+
+def test_guard_rejects_malformed_and_unlisted(guard, index):
+    """Test that malformed symbols are always rejected and unlisted ones once the listing is complete."""
+    assert guard.check("brk.b") is None
+    assert guard.check("AAPL; DROP") == "Invalid symbol: AAPL; DROP"
+    assert guard.check("ZZZZ") is None
+
+    index.complete = True
+    assert guard.check("ZZZZ") == "Unknown symbol: ZZZZ"
+    assert guard.check("aapl") is None
+    assert guard.stats()["saved_by_reason"] == {"malformed": 1, "unlisted": 1, "recently_unknown": 0}
+
+
+def test_guard_remembers_unknown_symbols(guard):
+    """Test that a symbol the API did not know is rejected without calling it again."""
+    loader = MagicMock(side_effect=UnknownSymbolError("No price data found for symbol QQQZ"))
+    with pytest.raises(UnknownSymbolError):
+        guard.guarded("qqqz", loader)()
+
+    assert guard.check("QQQZ") == "Unknown symbol: QQQZ"
+    assert guard.check("QQQZ") == "Unknown symbol: QQQZ"
+    loader.assert_called_once()
+    assert guard.stats() == {"saved_calls": 2, "saved_by_reason": {"malformed": 0, "unlisted": 0, "recently_unknown": 2},
+                             "unknown_reported": 1, "unknown_remembered": 1}
+
+
+def test_guard_ignores_other_failures(guard):
+    """Test that errors other than an unknown symbol, such as rate limits, are not remembered."""
+    with pytest.raises(ValueError):
+        guard.guarded("AAPL", MagicMock(side_effect=ValueError("rate limited")))()
+    assert guard.check("AAPL") is None
+    assert guard.stats()["unknown_reported"] == 0